@@ -0,0 +1,539 @@
+"""
+NodeSense Array-Backed Graph
+Alternative storage engine for the knowledge graph (GRAPH_ENGINE=arrays).
+
+ArrayGraph is an nx.Graph whose edge attributes live in parallel typed
+arrays rather than in one dict per edge. Node IDs are interned to integers
+and every edge is a row of the columns
+
+    src, dst (interned node IDs) │ base_weight │ weight │ last_active │ created
+
+The adjacency still maps node → neighbour → attributes, so NetworkX
+algorithms and every GraphService method work unchanged; the attributes are
+just a small EdgeRow view onto the edge's row. Full-graph passes (decay
+sweeps, mass and score rebuilds) read the columns as NumPy arrays instead
+of visiting each edge in Python. Rows of removed edges are reused.
+
+Only the attributes listed in COLUMNS are columnar. Anything else set on an
+edge is kept in a per-row overflow dict, so arbitrary attributes still work.
+
+frozen_view() gives a read-only copy for snapshots that shares the columns
+rather than copying each edge out: they become copy-on-write, so the first
+change after a view copies them (one memcpy each) and the view keeps the
+values it was taken with.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Iterable, Iterator
+
+import networkx as nx
+import numpy as np
+
+COLUMNS = ("base_weight", "weight", "last_active", "created")
+
+
+def _clear_cache(graph: nx.Graph) -> None:
+    """
+    Drop NetworkX's cached conversions of ``graph`` after a mutation, as
+    nx.Graph's own methods do. NetworkX keeps them in the graph's
+    ``__networkx_cache__`` dict; versions without one cache nothing.
+    """
+    cache = getattr(graph, "__networkx_cache__", None)
+    if cache:
+        cache.clear()
+
+
+class EdgeRow(MutableMapping):
+    """Dict-like view of one edge's attributes in an ArrayGraph."""
+
+    __slots__ = ("_g", "_row")
+
+    def __init__(self, graph: ArrayGraph, row: int):
+        self._g = graph
+        self._row = row
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def __getitem__(self, key: str) -> Any:
+        g = self._g
+        bit = g._col_bit.get(key)
+        if bit is not None:
+            if g._present[self._row] & bit:
+                return g._cols[key][self._row]
+            raise KeyError(key)
+        extra = g._extra.get(self._row)
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        g = self._g
+        bit = g._col_bit.get(key)
+        if bit is not None:
+            if g._present[self._row] & bit:
+                return g._cols[key][self._row]
+            return default
+        extra = g._extra.get(self._row)
+        return extra.get(key, default) if extra else default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        g = self._g
+        if g._shared:
+            g._unshare()
+        bit = g._col_bit.get(key)
+        if bit is not None:
+            g._cols[key][self._row] = value
+            g._present[self._row] |= bit
+        else:
+            g._extra.setdefault(self._row, {})[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        g = self._g
+        if g._shared:
+            g._unshare()
+        bit = g._col_bit.get(key)
+        if bit is not None:
+            if not g._present[self._row] & bit:
+                raise KeyError(key)
+            g._present[self._row] &= ~bit
+        else:
+            extra = g._extra.get(self._row, {})
+            del extra[key]
+            if not extra:
+                g._extra.pop(self._row, None)
+
+    def __contains__(self, key: object) -> bool:
+        g = self._g
+        bit = g._col_bit.get(key)
+        if bit is not None:
+            return bool(g._present[self._row] & bit)
+        return key in g._extra.get(self._row, ())
+
+    def __iter__(self) -> Iterator[str]:
+        g = self._g
+        present = g._present[self._row]
+        for key, bit in g._col_bit.items():
+            if present & bit:
+                yield key
+        yield from g._extra.get(self._row, ())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> dict:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _RowAdjacency(Mapping):
+    """
+    A node's neighbours in a frozen view: neighbour → row, handing out an
+    EdgeRow onto the view's columns on lookup.
+    """
+
+    __slots__ = ("_g", "_rows")
+
+    def __init__(self, graph: ArrayGraph, rows: dict[Any, int]):
+        self._g = graph
+        self._rows = rows
+
+    def __getitem__(self, v: Any) -> EdgeRow:
+        return EdgeRow(self._g, self._rows[v])
+
+    def __contains__(self, v: object) -> bool:
+        return v in self._rows
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _ViewAdjacency(Mapping):
+    """A frozen view's adjacency: node → _RowAdjacency over its row dict."""
+
+    __slots__ = ("_g", "_rows")
+
+    def __init__(self, graph: ArrayGraph, rows: dict[Any, dict[Any, int]]):
+        self._g = graph
+        self._rows = rows
+
+    def __getitem__(self, n: Any) -> _RowAdjacency:
+        return _RowAdjacency(self._g, self._rows[n])
+
+    def __contains__(self, n: object) -> bool:
+        return n in self._rows
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class ArrayGraph(nx.Graph):
+    """nx.Graph with interned node IDs and columnar edge attributes."""
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        # Edge storage must exist before nx.Graph converts incoming data
+        self._col_bit: dict[str, int] = {key: 1 << i for i, key in enumerate(COLUMNS)}
+        self._cols: dict[str, array] = {key: array("d") for key in COLUMNS}
+        self._present = array("B")
+        self._src = array("q")
+        self._dst = array("q")
+        self._extra: dict[int, dict] = {}
+        self._free_rows: list[int] = []
+        # Node interning: node → int, int → node (None once freed)
+        self._ids: dict[Any, int] = {}
+        self._names: list[Any] = []
+        self._free_ids: list[int] = []
+        # Storage is shared with a frozen view (copy before writing) / this
+        # is a frozen view (never written)
+        self._shared = False
+        self._view = False
+        super().__init__(incoming_graph_data, **attr)
+
+    @classmethod
+    def from_columns(
+        cls,
+        nodes: list[tuple[Any, dict]],
+        src: np.ndarray,
+        dst: np.ndarray,
+        columns: dict[str, np.ndarray],
+    ) -> ArrayGraph:
+        """
+        Build a graph in bulk from (node, attrs) pairs and edge columns, as
+        read from a columnar snapshot: ``src``/``dst`` index into ``nodes``
+        and are used as the interned IDs, and each column array is copied
+        in whole. Only the adjacency is filled edge by edge.
+        """
+        g = cls()
+        names = [n for n, _ in nodes]
+        g._node.update((n, attrs) for n, attrs in nodes)
+        g._names = names
+        g._ids = {n: i for i, n in enumerate(names)}
+        g._src.frombytes(np.ascontiguousarray(src, dtype=np.int64).tobytes())
+        g._dst.frombytes(np.ascontiguousarray(dst, dtype=np.int64).tobytes())
+        full = 0
+        for key, values in columns.items():
+            g._cols[key].frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+            full |= g._col_bit[key]
+        n_rows = len(g._src)
+        for key, col in g._cols.items():
+            if key not in columns:
+                col.frombytes(bytes(8 * n_rows))
+        g._present.frombytes(bytes([full]) * n_rows)
+
+        adj = {n: {} for n in names}
+        for row, (u, v) in enumerate(zip(src.tolist(), dst.tolist())):
+            u, v = names[u], names[v]
+            adj[u][v] = adj[v][u] = EdgeRow(g, row)
+        g._adj.update(adj)
+        return g
+
+    # ── Interning / rows ──────────────────────────────────────────────────
+
+    def _intern(self, n: Any) -> int:
+        i = self._ids.get(n)
+        if i is None:
+            if self._shared:
+                self._unshare()
+            if self._free_ids:
+                i = self._free_ids.pop()
+                self._names[i] = n
+            else:
+                i = len(self._names)
+                self._names.append(n)
+            self._ids[n] = i
+        return i
+
+    def _release(self, n: Any) -> None:
+        if self._shared:
+            self._unshare()
+        i = self._ids.pop(n, None)
+        if i is not None:
+            self._names[i] = None
+            self._free_ids.append(i)
+
+    def _new_row(self, u: Any, v: Any) -> EdgeRow:
+        src, dst = self._intern(u), self._intern(v)
+        if self._shared:
+            self._unshare()
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._src[row] = src
+            self._dst[row] = dst
+            self._present[row] = 0
+        else:
+            row = len(self._src)
+            self._src.append(src)
+            self._dst.append(dst)
+            self._present.append(0)
+            for col in self._cols.values():
+                col.append(0.0)
+        return EdgeRow(self, row)
+
+    def _free_row(self, data: EdgeRow) -> None:
+        if self._shared:
+            self._unshare()
+        row = data._row
+        self._src[row] = -1
+        self._dst[row] = -1
+        self._present[row] = 0
+        self._extra.pop(row, None)
+        self._free_rows.append(row)
+
+    def _ensure_node(self, n: Any) -> None:
+        if n not in self._node:
+            if n is None:
+                raise ValueError("None cannot be a node")
+            self._adj[n] = self.adjlist_inner_dict_factory()
+            self._node[n] = self.node_attr_dict_factory()
+
+    # ── nx.Graph mutation overrides (keep rows in step with the adjacency) ─
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        u, v = u_of_edge, v_of_edge
+        self._ensure_node(u)
+        self._ensure_node(v)
+        datadict = self._adj[u].get(v)
+        if datadict is None:
+            datadict = self._new_row(u, v)
+            self._adj[u][v] = datadict
+            self._adj[v][u] = datadict
+        datadict.update(attr)
+        _clear_cache(self)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        for e in ebunch_to_add:
+            ne = len(e)
+            if ne == 3:
+                u, v, dd = e
+            elif ne == 2:
+                u, v = e
+                dd = {}
+            else:
+                raise nx.NetworkXError(f"Edge tuple {e} must be a 2-tuple or 3-tuple.")
+            self._ensure_node(u)
+            self._ensure_node(v)
+            datadict = self._adj[u].get(v)
+            if datadict is None:
+                datadict = self._new_row(u, v)
+                self._adj[u][v] = datadict
+                self._adj[v][u] = datadict
+            datadict.update(attr)
+            datadict.update(dd)
+        _clear_cache(self)
+
+    def remove_edge(self, u, v):
+        try:
+            data = self._adj[u].pop(v)
+            if u != v:
+                del self._adj[v][u]
+        except KeyError as err:
+            raise nx.NetworkXError(f"The edge {u}-{v} is not in the graph") from err
+        self._free_row(data)
+        _clear_cache(self)
+
+    def remove_edges_from(self, ebunch):
+        adj = self._adj
+        for e in ebunch:
+            u, v = e[:2]
+            if u in adj and v in adj[u]:
+                data = adj[u].pop(v)
+                if u != v:
+                    del adj[v][u]
+                self._free_row(data)
+        _clear_cache(self)
+
+    def remove_node(self, n):
+        if n not in self._node:
+            raise nx.NetworkXError(f"The node {n} is not in the graph.")
+        self.remove_nodes_from([n])
+
+    def remove_nodes_from(self, nodes):
+        adj = self._adj
+        for n in nodes:
+            if n not in self._node:
+                continue
+            del self._node[n]
+            for u, data in list(adj[n].items()):
+                if u != n:
+                    del adj[u][n]
+                self._free_row(data)
+            del adj[n]
+            self._release(n)
+        _clear_cache(self)
+
+    def clear(self):
+        super().clear()
+        self._reset_storage()
+
+    def clear_edges(self):
+        super().clear_edges()
+        self._reset_storage()
+
+    def _reset_storage(self) -> None:
+        self._cols = {key: array("d") for key in COLUMNS}
+        self._present = array("B")
+        self._src = array("q")
+        self._dst = array("q")
+        self._extra = {}
+        self._free_rows = []
+        self._ids = {}
+        self._names = []
+        self._free_ids = []
+        self._shared = False
+
+    # ── Frozen views ──────────────────────────────────────────────────────
+
+    def _unshare(self) -> None:
+        """Copy the storage a frozen view shares before changing it."""
+        if self._view:
+            raise nx.NetworkXError("Frozen graph can't be modified")
+        self._cols = {key: col[:] for key, col in self._cols.items()}
+        self._present = self._present[:]
+        self._src = self._src[:]
+        self._dst = self._dst[:]
+        self._extra = {row: dict(attrs) for row, attrs in self._extra.items()}
+        self._ids = dict(self._ids)
+        self._names = self._names[:]
+        self._shared = False
+
+    def frozen_view(
+        self, base: nx.Graph | None = None, changed: set | None = None
+    ) -> ArrayGraph:
+        """
+        Read-only copy sharing this graph's columns (copy-on-write, see the
+        module docstring). Node attribute dicts are copied; the adjacency
+        maps node → neighbour → row, building EdgeRows as they are read.
+
+        Given the previous view ``base`` and ``changed``, which must hold
+        both endpoints of every edge added, updated or removed since it,
+        only changed nodes are copied and the rest share ``base``'s dicts.
+        """
+        view = ArrayGraph()
+        view.graph.update(self.graph)
+        view._cols, view._present = self._cols, self._present
+        view._src, view._dst = self._src, self._dst
+        view._extra, view._ids, view._names = self._extra, self._ids, self._names
+        view._shared = view._view = True
+        self._shared = True
+
+        live_node, live_adj = self._node, self._adj
+        if isinstance(base, ArrayGraph) and base._view and changed is not None:
+            node = dict(base._node)
+            rows = dict(base._adj._rows)
+            for n in changed:
+                if n in live_node:
+                    node[n] = dict(live_node[n])
+                    rows[n] = {v: d._row for v, d in live_adj[n].items()}
+                else:
+                    node.pop(n, None)
+                    rows.pop(n, None)
+        else:
+            node = {n: dict(d) for n, d in live_node.items()}
+            rows = {
+                n: {v: d._row for v, d in nbrs.items()} for n, nbrs in live_adj.items()
+            }
+        view._node = node
+        view._adj = _ViewAdjacency(view, rows)
+        return view
+
+    # ── Columnar access ───────────────────────────────────────────────────
+
+    def edge_rows(self) -> np.ndarray:
+        """Row indices of all live edges."""
+        return np.flatnonzero(np.frombuffer(self._src, dtype=np.int64) >= 0)
+
+    def column(self, key: str, rows: np.ndarray, default: float) -> np.ndarray:
+        """Values of a columnar attribute for ``rows`` (``default`` where unset)."""
+        values = np.frombuffer(self._cols[key], dtype=np.float64)[rows]
+        present = np.frombuffer(self._present, dtype=np.uint8)[rows] & self._col_bit[key]
+        if not present.all():
+            values = np.where(present != 0, values, default)
+        return values
+
+    def set_column(self, key: str, rows: np.ndarray, values: np.ndarray) -> None:
+        """Assign a columnar attribute for ``rows``."""
+        if self._shared:
+            self._unshare()
+        col = np.frombuffer(self._cols[key], dtype=np.float64)
+        col[rows] = values
+        present = np.frombuffer(self._present, dtype=np.uint8)
+        present[rows] |= self._col_bit[key]
+        del col, present  # release the buffers so the arrays can grow again
+
+    def endpoints(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Interned (src, dst) IDs for ``rows``."""
+        return (
+            np.frombuffer(self._src, dtype=np.int64)[rows],
+            np.frombuffer(self._dst, dtype=np.int64)[rows],
+        )
+
+    def weighted_degrees(self, weight: str = "weight") -> dict[Any, float]:
+        """Every node's degree(weight=``weight``), summed over the columns in one pass."""
+        rows = self.edge_rows()
+        src, dst = self.endpoints(rows)
+        values = self.column(weight, rows, 1.0)
+        totals = np.bincount(src, values, self.id_count) + np.bincount(dst, values, self.id_count)
+        ids = np.union1d(src, dst)
+        degree = dict.fromkeys(self._node, 0.0)
+        degree.update(zip(self.node_names(ids.tolist()), totals[ids].tolist()))
+        return degree
+
+    def as_networkx(self, weight: str = "weight") -> nx.Graph:
+        """
+        A plain nx.Graph with the same nodes (sharing their attribute dicts)
+        and adjacency order, whose edges carry only ``weight``. For
+        algorithms such as louvain_communities that read one attribute many
+        times and build scratch graphs of their input's class.
+        """
+        values = self._cols[weight].tolist()
+        present = self._present.tolist()
+        bit = self._col_bit[weight]
+        g = nx.Graph()
+        g.graph = self.graph
+        g._node = self._node
+        adj = {n: {} for n in self._adj}
+        for u, nbrs in self._adj.items():
+            adj_u = adj[u]
+            for v, d in nbrs.items():
+                if v not in adj_u:
+                    row = d._row
+                    adj_u[v] = adj[v][u] = (
+                        {weight: values[row]} if present[row] & bit else {}
+                    )
+        g._adj = adj
+        return g
+
+    def node_id(self, n: Any) -> int | None:
+        """Interned ID of a node that has (or had) edges."""
+        return self._ids.get(n)
+
+    def node_names(self, ids: Iterable[int]) -> list[Any]:
+        names = self._names
+        return [names[i] for i in ids]
+
+    @property
+    def id_count(self) -> int:
+        """Upper bound of interned node IDs (for sizing per-node arrays)."""
+        return len(self._names)
+
+    def nbytes(self) -> int:
+        """Bytes held by the columnar edge storage."""
+        return sum(
+            col.itemsize * len(col)
+            for col in (*self._cols.values(), self._present, self._src, self._dst)
+        )
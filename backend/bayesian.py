@@ -9,11 +9,75 @@ Mathematical foundations documented in /MATH.md
 from __future__ import annotations
 
 import math
-from typing import Any
+import time
+from typing import Any, Hashable, Mapping
 
 import networkx as nx
+import numpy as np
+from scipy import sparse
 
 from config import settings
+from graph_service import decayed_weight
+
+
+class _SparseGraphIndex:
+    """
+    Array view of the graph used by the vectorized inference path:
+      - node → row index map
+      - membership vector (node → community index, −1 if unassigned)
+      - symmetric CSR adjacency holding decayed edge weights
+      - one-hot community indicator matrix P (N × C)
+      - per-community prior mass (internal edge weight), via one segmented
+        reduction over the edge list
+    """
+
+    def __init__(self, graph: nx.Graph, communities: list[set], now: float):
+        nodes = list(graph.nodes)
+        self.index: dict[str, int] = {n: i for i, n in enumerate(nodes)}
+        n_nodes = len(nodes)
+        n_communities = len(communities)
+
+        self.membership = np.full(n_nodes, -1, dtype=np.int64)
+        for c, community in enumerate(communities):
+            for n in community:
+                i = self.index.get(n)
+                if i is not None:
+                    self.membership[i] = c
+
+        n_edges = graph.number_of_edges()
+        src = np.empty(n_edges, dtype=np.int64)
+        dst = np.empty(n_edges, dtype=np.int64)
+        base = np.empty(n_edges, dtype=np.float64)
+        last_active = np.empty(n_edges, dtype=np.float64)
+        for e, (u, v, data) in enumerate(graph.edges(data=True)):
+            src[e] = self.index[u]
+            dst[e] = self.index[v]
+            base[e] = data.get("base_weight", 1.0)
+            last_active[e] = data.get("last_active", now)
+
+        # Vectorized form of graph_service.decayed_weight
+        hours = np.maximum(0.0, now - last_active) / 3600.0
+        weights = base * np.exp(-settings.DECAY_RATE * hours)
+
+        self.adjacency = sparse.csr_array(
+            (
+                np.concatenate([weights, weights]),
+                (np.concatenate([src, dst]), np.concatenate([dst, src])),
+            ),
+            shape=(n_nodes, n_nodes),
+        )
+
+        assigned = np.flatnonzero(self.membership >= 0)
+        self.indicator = sparse.csr_array(
+            (np.ones(len(assigned)), (assigned, self.membership[assigned])),
+            shape=(n_nodes, n_communities),
+        )
+
+        src_c = self.membership[src]
+        internal = (src_c >= 0) & (src_c == self.membership[dst])
+        self.community_weight = np.bincount(
+            src_c[internal], weights=weights[internal], minlength=n_communities
+        )
 
 
 class BayesianTaskInferrer:
@@ -30,18 +94,39 @@ class BayesianTaskInferrer:
     where α is the Laplace smoothing constant and Z is the normalization factor.
     """
 
+    # Likelihood credit for an evidence keyword that is itself in the community
+    DIRECT_MEMBERSHIP_WEIGHT = 3.0
+
     def __init__(self, smoothing: float | None = None):
         self.alpha = smoothing if smoothing is not None else settings.LAPLACE_SMOOTHING
+        self._index: _SparseGraphIndex | None = None
+        self._index_key: Hashable | None = None
 
     def compute_posteriors(
         self,
         current_keywords: list[str],
         communities: list[set],
         graph: nx.Graph,
+        cache_key: Hashable | None = None,
+        community_weights: list[float] | None = None,
+        node_community: Mapping[str, int] | None = None,
     ) -> dict[int, float]:
         """
         Compute posterior probability for each community being the "active task".
 
+        ``community_weights`` are precomputed decayed internal edge weights
+        per community (GraphService.community_weights()); when given, the
+        prior term is read in O(C) instead of being summed from the graph,
+        and the vectorized path reads likelihoods from the evidence
+        keywords' own edges (O(degree), see _evidence_terms). Pass the
+        partition's ``node_community`` map (GraphService.node_community)
+        too, or it is rebuilt from ``communities``.
+
+        Otherwise the vectorized path builds a sparse index of the whole
+        graph. ``cache_key`` identifies the (graph, partition) state — e.g.
+        ``(gs.version, gs.partition_version)``. When it matches the previous
+        call, that index is reused.
+
         Returns dict mapping community_index → posterior_probability.
         All values sum to 1.0.
         """
@@ -51,19 +136,63 @@ class BayesianTaskInferrer:
         kw_ids = {f"kw:{kw.lower().strip()}" for kw in current_keywords if kw.strip()}
         n_communities = len(communities)
 
+        if settings.BAYES_VECTORIZED and community_weights is not None:
+            if node_community is None:
+                node_community = {
+                    n: c for c, community in enumerate(communities) for n in community
+                }
+            priors = []
+            likelihoods = self._evidence_terms(kw_ids, n_communities, graph, node_community)
+        elif settings.BAYES_VECTORIZED:
+            priors, likelihoods = self._vectorized_terms(
+                kw_ids, communities, graph, cache_key
+            )
+        else:
+            priors, likelihoods = self._python_terms(
+                kw_ids, communities, graph, community_weights is None
+            )
+
+        if community_weights is not None:
+            priors = [w + self.alpha for w in community_weights]
+
+        prior_total = sum(priors)
+        priors = [p / prior_total for p in priors]
+
+        likelihood_total = sum(likelihoods)
+        likelihoods = [l / likelihood_total for l in likelihoods]
+
+        # ── Posteriors: Bayes' rule ──────────────────────────────────────
+        unnormalized = [
+            likelihoods[i] * priors[i] for i in range(n_communities)
+        ]
+        z = sum(unnormalized)
+        if z == 0:
+            # Uniform fallback
+            return {i: 1.0 / n_communities for i in range(n_communities)}
+
+        posteriors = {i: unnormalized[i] / z for i in range(n_communities)}
+        return posteriors
+
+    def _python_terms(
+        self,
+        kw_ids: set[str],
+        communities: list[set],
+        graph: nx.Graph,
+        with_priors: bool = True,
+    ) -> tuple[list[float], list[float]]:
+        """Unnormalized smoothed priors and likelihoods, one community at a time."""
+        now = time.time()
+
         # ── Priors: P(Task_i) ─────────────────────────────────────────────
         priors: list[float] = []
-        for community in communities:
+        for community in communities if with_priors else []:
             # Sum of decayed edge weights within the community
             subgraph = graph.subgraph(community)
             community_weight = sum(
-                data.get("weight", 1.0) for _, _, data in subgraph.edges(data=True)
+                decayed_weight(data, now) for _, _, data in subgraph.edges(data=True)
             )
             priors.append(community_weight + self.alpha)
 
-        prior_total = sum(priors)
-        priors = [p / prior_total for p in priors]
-
         # ── Likelihoods: P(Evidence | Task_i) ────────────────────────────
         likelihoods: list[float] = []
         for community in communities:
@@ -71,30 +200,93 @@ class BayesianTaskInferrer:
             for kw_id in kw_ids:
                 if kw_id in community:
                     # Direct membership: strong signal
-                    overlap_score += 3.0
+                    overlap_score += self.DIRECT_MEMBERSHIP_WEIGHT
                 else:
                     # Check if any keyword neighbor is in the community
                     if kw_id in graph:
-                        for neighbor in graph.neighbors(kw_id):
+                        for neighbor, data in graph[kw_id].items():
                             if neighbor in community:
-                                edge_w = graph.edges[kw_id, neighbor].get("weight", 1.0)
-                                overlap_score += edge_w
+                                overlap_score += decayed_weight(data, now)
             likelihoods.append(overlap_score + self.alpha)
 
-        likelihood_total = sum(likelihoods)
-        likelihoods = [l / likelihood_total for l in likelihoods]
+        return priors, likelihoods
 
-        # ── Posteriors: Bayes' rule ──────────────────────────────────────
-        unnormalized = [
-            likelihoods[i] * priors[i] for i in range(n_communities)
-        ]
-        z = sum(unnormalized)
-        if z == 0:
-            # Uniform fallback
-            return {i: 1.0 / n_communities for i in range(n_communities)}
+    def _evidence_terms(
+        self,
+        kw_ids: set[str],
+        n_communities: int,
+        graph: nx.Graph,
+        node_community: Mapping[str, int],
+    ) -> list[float]:
+        """
+        Same likelihoods as _python_terms, from the evidence keywords' own
+        edges only: each keyword's decayed edge weights are summed per
+        neighbour community in one bincount. O(Σ degree + C), independent
+        of the graph's size.
+        """
+        now = time.time()
+        overlap = np.zeros(n_communities)
+        for kw_id in kw_ids:
+            if kw_id not in graph:
+                continue
+            nbrs = graph[kw_id]
+            k = len(nbrs)
+            comms = np.fromiter(
+                (node_community.get(n, -1) for n in nbrs), dtype=np.int64, count=k
+            )
+            base = np.fromiter(
+                (d.get("base_weight", 1.0) for d in nbrs.values()), dtype=np.float64, count=k
+            )
+            last_active = np.fromiter(
+                (d.get("last_active", now) for d in nbrs.values()), dtype=np.float64, count=k
+            )
+            # Vectorized form of graph_service.decayed_weight
+            hours = np.maximum(0.0, now - last_active) / 3600.0
+            weights = base * np.exp(-settings.DECAY_RATE * hours)
+            assigned = comms >= 0
+            row = np.bincount(
+                comms[assigned], weights=weights[assigned], minlength=n_communities
+            )
+            # A keyword inside community c scores a flat bonus for c instead
+            own = node_community.get(kw_id)
+            if own is not None:
+                row[own] = self.DIRECT_MEMBERSHIP_WEIGHT
+            overlap += row
+        return (overlap + self.alpha).tolist()
 
-        posteriors = {i: unnormalized[i] / z for i in range(n_communities)}
-        return posteriors
+    def _vectorized_terms(
+        self,
+        kw_ids: set[str],
+        communities: list[set],
+        graph: nx.Graph,
+        cache_key: Hashable | None,
+    ) -> tuple[list[float], list[float]]:
+        """
+        Same terms as _python_terms, computed over a sparse index of the
+        whole graph (used when no running community weights are given):
+        priors are one segmented reduction over the edge list, likelihoods
+        are one sparse product (evidence rows of A) × P, so inference is
+        O(nnz) instead of O(C·E) Python-level iteration.
+        """
+        if cache_key is None or cache_key != self._index_key or self._index is None:
+            self._index = _SparseGraphIndex(graph, communities, time.time())
+            self._index_key = cache_key
+        idx = self._index
+
+        priors = idx.community_weight + self.alpha
+
+        rows = np.array(
+            [idx.index[k] for k in kw_ids if k in idx.index], dtype=np.int64
+        )
+        # Neighbor-weight mass from each evidence keyword into each community
+        overlap = (idx.adjacency[rows] @ idx.indicator).toarray()
+        # A keyword inside community c scores a flat bonus for c instead
+        own = idx.membership[rows]
+        member = own >= 0
+        overlap[np.flatnonzero(member), own[member]] = self.DIRECT_MEMBERSHIP_WEIGHT
+        likelihoods = overlap.sum(axis=0) + self.alpha
+
+        return priors.tolist(), likelihoods.tolist()
 
     def get_active_context(
         self,
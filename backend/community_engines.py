@@ -0,0 +1,320 @@
+"""
+NodeSense Community Detection Engines
+Strategies for the full community-detection pass (COMMUNITY_ENGINE).
+
+GraphService keeps the previous partition and re-optimizes only touched
+nodes between full passes (COMMUNITY_INCREMENTAL). That incremental layer
+works on top of any engine here. An engine only decides how a partition is
+built from scratch:
+
+- louvain: NetworkX Louvain, the default. Best modularity, slowest.
+- leiden: Louvain followed by a Leiden-style refinement. Communities that
+  fell apart are split into connected pieces, then one local-moving sweep
+  lets boundary nodes settle. Slightly slower than Louvain, and it never
+  returns a disconnected community.
+- label_propagation: fast asynchronous label propagation (FLPA: only nodes
+  whose neighbourhood changed are revisited). Near-linear time and several
+  times cheaper than Louvain on large graphs, at some cost in modularity.
+  It ignores the resolution parameter.
+- auto: Louvain up to COMMUNITY_AUTO_NODES nodes, label propagation beyond.
+
+Run ``python community_engines.py`` to compare modularity and wall time
+across graph sizes.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Any, Callable, Iterable, Mapping
+
+import networkx as nx
+from networkx.algorithms.community import (
+    fast_label_propagation_communities,
+    louvain_communities,
+)
+
+from config import settings
+
+
+class CommunityEngine(ABC):
+    """Builds a community partition of a weighted graph from scratch."""
+
+    name = ""
+
+    def resolve(self, graph: nx.Graph) -> CommunityEngine:
+        """The engine that will actually handle ``graph`` (see AutoEngine)."""
+        return self
+
+    @abstractmethod
+    def detect(self, graph: nx.Graph, resolution: float, seed: int) -> list[set]:
+        """Partition ``graph`` into communities (sets of node IDs)."""
+
+
+class LouvainEngine(CommunityEngine):
+    name = "louvain"
+
+    def detect(self, graph: nx.Graph, resolution: float, seed: int) -> list[set]:
+        return list(
+            louvain_communities(graph, weight="weight", resolution=resolution, seed=seed)
+        )
+
+
+class LeidenEngine(CommunityEngine):
+    """Louvain plus a Leiden-style refinement (connected, locally optimal)."""
+
+    name = "leiden"
+
+    def detect(self, graph: nx.Graph, resolution: float, seed: int) -> list[set]:
+        communities = split_disconnected(
+            graph,
+            louvain_communities(graph, weight="weight", resolution=resolution, seed=seed),
+        )
+        node_community = {n: idx for idx, c in enumerate(communities) for n in c}
+        nodes = list(graph.nodes)
+        random.Random(seed).shuffle(nodes)
+        local_moving(graph, node_community, resolution, nodes)
+
+        grouped: dict[int, set] = defaultdict(set)
+        for n, c in node_community.items():
+            grouped[c].add(n)
+        return split_disconnected(graph, [grouped[c] for c in sorted(grouped)])
+
+
+class LabelPropagationEngine(CommunityEngine):
+    name = "label_propagation"
+
+    def detect(self, graph: nx.Graph, resolution: float, seed: int) -> list[set]:
+        return list(
+            fast_label_propagation_communities(graph, weight="weight", seed=seed)
+        )
+
+
+class AutoEngine(CommunityEngine):
+    """Louvain on small graphs, label propagation past ``max_nodes``."""
+
+    name = "auto"
+
+    def __init__(self, max_nodes: int | None = None):
+        self.max_nodes = (
+            max_nodes if max_nodes is not None else settings.COMMUNITY_AUTO_NODES
+        )
+        self._small = LouvainEngine()
+        self._large = LabelPropagationEngine()
+
+    def resolve(self, graph: nx.Graph) -> CommunityEngine:
+        if graph.number_of_nodes() > self.max_nodes:
+            return self._large
+        return self._small
+
+    def detect(self, graph: nx.Graph, resolution: float, seed: int) -> list[set]:
+        return self.resolve(graph).detect(graph, resolution, seed)
+
+
+ENGINES: dict[str, type[CommunityEngine]] = {
+    "louvain": LouvainEngine,
+    "leiden": LeidenEngine,
+    "label_propagation": LabelPropagationEngine,
+    "auto": AutoEngine,
+}
+
+
+def get_engine(name: str | None = None) -> CommunityEngine:
+    """Engine for a COMMUNITY_ENGINE name."""
+    name = name or settings.COMMUNITY_ENGINE
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown community engine {name!r} (expected one of {', '.join(ENGINES)})"
+        ) from None
+
+
+# ── Shared Steps ──────────────────────────────────────────────────────────
+
+
+def split_disconnected(graph: nx.Graph, communities: Iterable[set]) -> list[set]:
+    """Split every community into its connected components."""
+    out: list[set] = []
+    for community in communities:
+        if len(community) < 2:
+            out.append(set(community))
+            continue
+        out.extend(set(c) for c in nx.connected_components(graph.subgraph(community)))
+    return out
+
+
+def _edge_weight(data: dict) -> float:
+    return data.get("weight", 1.0)
+
+
+def local_moving(
+    graph: nx.Graph,
+    node_community: dict,
+    resolution: float,
+    nodes: Iterable,
+    *,
+    degree: Mapping[Any, float] | None = None,
+    community_degree: defaultdict[int, float] | None = None,
+    edge_weight: Callable[[dict], float] = _edge_weight,
+    requeue: bool = False,
+    budget: int | None = None,
+    on_move: Callable[[Any, int], None] | None = None,
+) -> int:
+    """
+    Louvain's local-moving step over ``nodes``: each node joins the
+    neighbouring community with the best modularity gain. Updates
+    ``node_community`` in place and returns how many moves were made.
+
+    By default this is one sweep using the graph's weighted degrees.
+    GraphService's incremental pass instead supplies its running totals:
+    ``degree`` (nodes outside it take no part), ``community_degree``
+    (Σ_tot per community, updated in place) and ``edge_weight``. With
+    ``requeue`` a node that moves queues its neighbours for another look,
+    for at most ``budget`` evaluations; ``on_move(node, old community)`` is
+    called for every move.
+    """
+    if degree is None:
+        degree = dict(graph.degree(weight="weight"))
+    if community_degree is None:
+        community_degree = defaultdict(float)
+        for n, c in node_community.items():
+            community_degree[c] += degree.get(n, 0.0)
+    two_m = sum(community_degree.values()) or 1.0
+
+    queue = deque(n for n in nodes if n in degree)
+    queued = set(queue)
+    moves = 0
+    # Each move only increases modularity, so requeueing terminates on its
+    # own; the budget just bounds pathological oscillation.
+    while queue and (budget is None or budget > 0):
+        if budget is not None:
+            budget -= 1
+        n = queue.popleft()
+        queued.discard(n)
+
+        k = degree[n]
+        own = node_community[n]
+        links: dict[int, float] = defaultdict(float)
+        for neighbor, data in graph[n].items():
+            if neighbor != n and neighbor in degree:
+                links[node_community[neighbor]] += edge_weight(data)
+
+        # ΔQ ∝ k_i,in − γ·Σ_tot·k_i / 2m, evaluated with n removed from its community
+        community_degree[own] -= k
+        best = own
+        best_gain = links.get(own, 0.0) - resolution * community_degree[own] * k / two_m
+        for c, w in links.items():
+            gain = w - resolution * community_degree[c] * k / two_m
+            if gain > best_gain:
+                best, best_gain = c, gain
+        community_degree[best] += k
+
+        if best != own:
+            node_community[n] = best
+            moves += 1
+            if on_move is not None:
+                on_move(n, own)
+            if requeue:
+                for neighbor in graph.neighbors(n):
+                    if neighbor not in queued and neighbor in degree:
+                        queue.append(neighbor)
+                        queued.add(neighbor)
+    return moves
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────
+
+
+def browsing_graph(pages: int, seed: int = 0) -> nx.Graph:
+    """
+    A synthetic graph shaped like NodeSense's: pages linked to ~6 keywords,
+    plus weighted keyword co-occurrence edges. Topics are not cleanly
+    separable, or every engine would find the same partition: neighbouring
+    topics share vocabulary, some of a page's keywords come from a second
+    topic, generic keywords appear across all of them, and a few topics
+    are much more popular than the rest.
+    """
+    rng = random.Random(seed)
+    topics = max(2, pages // 40)
+    # Each topic draws from 25 keywords on a ring, 3 of them shared with the next
+    ring = topics * 22
+    vocab = [[f"kw:t{(t * 22 + j) % ring}" for j in range(25)] for t in range(topics)]
+    generic = [f"kw:g{j}" for j in range(40)]
+    generic_weights = [1 / (j + 1) for j in range(40)]
+    topic_weights = [1 / math.sqrt(t + 1) for t in range(topics)]
+    g = nx.Graph()
+    for p in range(pages):
+        topic, other = rng.choices(range(topics), topic_weights, k=2)
+        kws: set[str] = set()
+        while len(kws) < 6:
+            kws.add(rng.choice(vocab[other if rng.random() < 0.1 else topic]))
+        if rng.random() < 0.3:
+            kws.add(rng.choices(generic, generic_weights)[0])
+        page = f"page:{p}"
+        g.add_node(page, type="page")
+        for kw in kws:
+            g.add_node(kw, type="keyword")
+            g.add_edge(page, kw, weight=1.0)
+        ordered = sorted(kws)
+        for i, u in enumerate(ordered):
+            for v in ordered[i + 1 :]:
+                if g.has_edge(u, v):
+                    g[u][v]["weight"] += 1.0
+                else:
+                    g.add_edge(u, v, weight=1.0)
+    return g
+
+
+def benchmark(sizes: list[int], engines: list[str], repeat: int = 3) -> list[dict]:
+    """Best-of-``repeat`` wall time and modularity per engine and graph size."""
+    import time
+
+    from networkx.algorithms.community import modularity
+
+    rows = []
+    for pages in sizes:
+        graph = browsing_graph(pages)
+        for name in engines:
+            engine = get_engine(name)
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                communities = engine.detect(graph, 1.0, 42)
+                best = min(best, time.perf_counter() - t0)
+            rows.append(
+                {
+                    "nodes": graph.number_of_nodes(),
+                    "edges": graph.number_of_edges(),
+                    "engine": engine.resolve(graph).name if name == "auto" else name,
+                    "communities": len(communities),
+                    "modularity": modularity(graph, communities, weight="weight"),
+                    "seconds": best,
+                }
+            )
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark community engines")
+    parser.add_argument(
+        "--pages", default="250,1000,4000,10000",
+        help="comma-separated page counts (one synthetic graph each)",
+    )
+    parser.add_argument("--engines", default=",".join(n for n in ENGINES if n != "auto"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7} {'edges':>8}  {'engine':<18} {'comms':>5} {'Q':>7} {'ms':>9}")
+    for row in benchmark(
+        [int(x) for x in args.pages.split(",")], args.engines.split(","), args.repeat
+    ):
+        print(
+            f"{row['nodes']:>7} {row['edges']:>8}  {row['engine']:<18}"
+            f" {row['communities']:>5} {row['modularity']:>7.4f}"
+            f" {row['seconds'] * 1000:>9.1f}"
+        )
@@ -16,21 +16,83 @@ class Settings:
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
-    # Server
+    # Server (BACKEND_WORKERS > 1 needs STATE_BACKEND=sqlite)
     BACKEND_HOST: str = os.getenv("BACKEND_HOST", "0.0.0.0")
     BACKEND_PORT: int = int(os.getenv("BACKEND_PORT", "8000"))
+    BACKEND_WORKERS: int = int(os.getenv("BACKEND_WORKERS", "1"))
+    # "memory" (one process owns the graph) or "sqlite" (workers share a
+    # mutation log at <GRAPH_PERSIST_PATH>.log.db and replicate from it)
+    STATE_BACKEND: str = os.getenv("STATE_BACKEND", "memory")
 
     # Graph parameters
     MAX_GRAPH_NODES: int = int(os.getenv("MAX_GRAPH_NODES", "500"))
+    # Once over MAX_GRAPH_NODES, prune down to this fraction of it (hysteresis)
+    PRUNE_LOW_WATERMARK: float = float(os.getenv("PRUNE_LOW_WATERMARK", "0.9"))
+    # Keyword co-occurrence edges per page: "all" pairs, a sliding "window"
+    # of COOCCURRENCE_LIMIT following keywords, or "topk" (every keyword
+    # linked to the COOCCURRENCE_LIMIT most salient ones)
+    COOCCURRENCE_MODE: str = os.getenv("COOCCURRENCE_MODE", "all")
+    COOCCURRENCE_LIMIT: int = int(os.getenv("COOCCURRENCE_LIMIT", "8"))
     GRAPH_PERSIST_PATH: str = os.getenv("GRAPH_PERSIST_PATH", "graph.pkl")
+    # Graph storage: "networkx" (dict per edge) or "arrays" (interned node IDs,
+    # edge attributes in typed columns; vectorized decay / rebuild passes)
+    GRAPH_ENGINE: str = os.getenv("GRAPH_ENGINE", "networkx")
+    # Write-ahead log of page visits (<GRAPH_PERSIST_PATH>.wal), compacted
+    # into a fresh snapshot every GRAPH_SNAPSHOT_INTERVAL records (written on
+    # a background thread)
+    GRAPH_WAL_ENABLED: bool = os.getenv("GRAPH_WAL_ENABLED", "true").lower() == "true"
+    GRAPH_WAL_FSYNC: bool = os.getenv("GRAPH_WAL_FSYNC", "false").lower() == "true"
+    GRAPH_SNAPSHOT_INTERVAL: int = int(os.getenv("GRAPH_SNAPSHOT_INTERVAL", "200"))
+    # "columnar" (mmap-loaded arrays) or "pickle"; either loads
+    GRAPH_SNAPSHOT_FORMAT: str = os.getenv("GRAPH_SNAPSHOT_FORMAT", "columnar")
+    # Published graph versions /api/graph/delta can diff against; older
+    # cursors get a full resync
+    GRAPH_DELTA_HISTORY: int = int(os.getenv("GRAPH_DELTA_HISTORY", "100"))
+    # Page summaries / snippets live outside the graph, keyed by URL
+    CONTENT_STORE_PATH: str = os.getenv("CONTENT_STORE_PATH", "page_content.db")
+    CONTENT_CACHE_SIZE: int = int(os.getenv("CONTENT_CACHE_SIZE", "256"))
+
+    # Tenants (one graph per session ID / X-Session-Id header); idle tenants
+    # beyond MAX_TENANTS or TENANT_IDLE_TIMEOUT seconds are saved and unloaded
+    TENANT_DATA_DIR: str = os.getenv("TENANT_DATA_DIR", "tenants")
+    MAX_TENANTS: int = int(os.getenv("MAX_TENANTS", "8"))
+    TENANT_IDLE_TIMEOUT: float = float(os.getenv("TENANT_IDLE_TIMEOUT", "1800"))
 
     # Bayesian inference
     DECAY_RATE: float = float(os.getenv("DECAY_RATE", "0.01"))  # per hour
+    # Seconds between bulk decay sweeps (weights are decayed lazily on read)
+    DECAY_SWEEP_INTERVAL: float = float(os.getenv("DECAY_SWEEP_INTERVAL", "900"))
     LAPLACE_SMOOTHING: float = float(os.getenv("LAPLACE_SMOOTHING", "0.1"))
+    # NumPy/SciPy-sparse posterior computation (pure-Python path when false)
+    BAYES_VECTORIZED: bool = os.getenv("BAYES_VECTORIZED", "true").lower() == "true"
 
     # Community detection
     COMMUNITY_RESOLUTION: float = float(os.getenv("COMMUNITY_RESOLUTION", "1.0"))
     COMMUNITY_SEED: int = int(os.getenv("COMMUNITY_SEED", "42"))
+    # Full-pass engine: louvain | leiden | label_propagation | auto (Louvain up
+    # to COMMUNITY_AUTO_NODES nodes, label propagation beyond)
+    COMMUNITY_ENGINE: str = os.getenv("COMMUNITY_ENGINE", "louvain")
+    COMMUNITY_AUTO_NODES: int = int(os.getenv("COMMUNITY_AUTO_NODES", "3000"))
+    # Incremental mode re-optimizes only the nodes touched since the last run;
+    # a full Louvain pass runs every N visits or when modularity drifts too far.
+    COMMUNITY_INCREMENTAL: bool = os.getenv("COMMUNITY_INCREMENTAL", "true").lower() == "true"
+    COMMUNITY_FULL_RECOMPUTE_VISITS: int = int(os.getenv("COMMUNITY_FULL_RECOMPUTE_VISITS", "25"))
+    COMMUNITY_MODULARITY_DRIFT: float = float(os.getenv("COMMUNITY_MODULARITY_DRIFT", "0.05"))
+    # "full" clusters the whole page + keyword graph; "keywords" clusters only
+    # the keyword co-occurrence graph and attaches each page afterwards
+    COMMUNITY_PROJECTION: str = os.getenv("COMMUNITY_PROJECTION", "full")
+
+    # Page visits arriving within this window are coalesced into one
+    # pipeline run (extract + graph update per visit, inference once)
+    ANALYZE_BATCH_WINDOW_MS: float = float(os.getenv("ANALYZE_BATCH_WINDOW_MS", "50"))
+    ANALYZE_BATCH_MAX: int = int(os.getenv("ANALYZE_BATCH_MAX", "64"))
+    # Time budgets (0 = none). Past ANALYZE_DEADLINE_MS /api/analyze answers
+    # with the last context while the run finishes in the background; stages
+    # that would overrun theirs degrade (reuse the previous partition / the
+    # last cached enrichment) instead of waiting.
+    ANALYZE_DEADLINE_MS: float = float(os.getenv("ANALYZE_DEADLINE_MS", "1500"))
+    COMMUNITY_DEADLINE_MS: float = float(os.getenv("COMMUNITY_DEADLINE_MS", "500"))
+    ENRICH_DEADLINE_MS: float = float(os.getenv("ENRICH_DEADLINE_MS", "200"))
 
     # Content processing
     MAX_CONTENT_LENGTH: int = int(os.getenv("MAX_CONTENT_LENGTH", "8000"))
@@ -0,0 +1 @@
+"""pytest: being here puts backend/ on sys.path, so tests import its modules directly."""
@@ -0,0 +1,162 @@
+"""
+NodeSense Page Content Store
+Keeps large page text (summaries, content snippets) out of the graph.
+
+Page nodes only carry their URL, which is the key into this store. Text
+lives in a local SQLite file with a small in-process LRU cache in front of
+it, so graph copies, serialization and snapshots stay proportional to
+topology rather than to how much text the user has read.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from config import settings
+
+_EMPTY = {"summary": "", "content_snippet": ""}
+# Bound parameters per IN (...) query; older SQLite builds allow 999
+_QUERY_CHUNK = 900
+
+
+class PageContentStore:
+    """URL-keyed store for page summaries and content snippets."""
+
+    def __init__(self, path: str | None = None, cache_size: int | None = None):
+        self.path = path or settings.CONTENT_STORE_PATH
+        self.cache_size = (
+            cache_size if cache_size is not None else settings.CONTENT_CACHE_SIZE
+        )
+        self._conn: sqlite3.Connection | None = None
+        self._cache: OrderedDict[str, dict[str, str]] = OrderedDict()
+        # The graph worker writes while snapshot readers look up text
+        self._lock = threading.RLock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database lazily so importing the app touches no files."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY,"
+                " summary TEXT NOT NULL DEFAULT '',"
+                " content_snippet TEXT NOT NULL DEFAULT '')"
+            )
+        return self._conn
+
+    def _remember(self, url: str, entry: dict[str, str]) -> None:
+        self._cache[url] = entry
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    # ── Reads ─────────────────────────────────────────────────────────────
+
+    def get(self, url: str) -> dict[str, str]:
+        """Return {"summary", "content_snippet"} for a URL (empty if unknown)."""
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None:
+                self._cache.move_to_end(url)
+                return entry
+
+            row = self._db().execute(
+                "SELECT summary, content_snippet FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return dict(_EMPTY)
+            entry = {"summary": row[0], "content_snippet": row[1]}
+            self._remember(url, entry)
+            return entry
+
+    def get_many(self, urls: Iterable[str]) -> dict[str, dict[str, str]]:
+        """
+        get() for many URLs at once: cache hits, then one query per chunk
+        of misses. Unknown URLs are left out of the result.
+        """
+        found: dict[str, dict[str, str]] = {}
+        with self._lock:
+            missing = []
+            for url in dict.fromkeys(urls):
+                entry = self._cache.get(url)
+                if entry is not None:
+                    self._cache.move_to_end(url)
+                    found[url] = entry
+                else:
+                    missing.append(url)
+
+            db = self._db()
+            for i in range(0, len(missing), _QUERY_CHUNK):
+                chunk = missing[i:i + _QUERY_CHUNK]
+                rows = db.execute(
+                    "SELECT url, summary, content_snippet FROM pages"
+                    f" WHERE url IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for url, summary, snippet in rows:
+                    entry = {"summary": summary, "content_snippet": snippet}
+                    self._remember(url, entry)
+                    found[url] = entry
+        return found
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            if url in self._cache:
+                return True
+            row = self._db().execute(
+                "SELECT 1 FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            return row is not None
+
+    # ── Writes ────────────────────────────────────────────────────────────
+
+    def put(self, url: str, summary: str = "", content_snippet: str = "") -> None:
+        """
+        Insert or update a page's text. Empty fields leave the stored
+        value untouched, matching how add_page_visit treats revisits.
+        """
+        with self._lock:
+            if not summary and not content_snippet and url in self:
+                return
+            db = self._db()
+            db.execute(
+                "INSERT INTO pages (url, summary, content_snippet) VALUES (?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET"
+                "  summary = CASE WHEN excluded.summary != '' THEN excluded.summary ELSE summary END,"
+                "  content_snippet = CASE WHEN excluded.content_snippet != ''"
+                "   THEN excluded.content_snippet ELSE content_snippet END",
+                (url, summary, content_snippet),
+            )
+            db.commit()
+            self._cache.pop(url, None)
+
+    def delete_many(self, urls: Iterable[str]) -> None:
+        """Drop the text of pages that left the graph."""
+        urls = list(urls)
+        if not urls:
+            return
+        with self._lock:
+            db = self._db()
+            db.executemany("DELETE FROM pages WHERE url = ?", [(u,) for u in urls])
+            db.commit()
+            for u in urls:
+                self._cache.pop(u, None)
+
+    def clear(self) -> None:
+        """Remove every stored page."""
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM pages")
+            db.commit()
+            self._cache.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
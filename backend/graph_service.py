@@ -6,40 +6,777 @@ community detection, persistence, and pruning.
 
 from __future__ import annotations
 
+import asyncio
+import bisect
+import functools
+import heapq
+import json
+import logging
 import math
+import os
 import pickle
+import shutil
+import threading
 import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar
 
 import networkx as nx
-from networkx.algorithms.community import louvain_communities
+import numpy as np
 
+from array_graph import ArrayGraph
+from community_engines import get_engine, local_moving
 from config import settings
+from content_store import PageContentStore
+from graph_snapshot import TEXT_FIELDS, is_columnar, read_columnar, write_columnar
+from shared_state import SharedVisitLog
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Edges whose decayed weight falls below this are garbage-collected
+MIN_EDGE_WEIGHT = 0.01
+
+# Per-hour recency decay applied to node prune scores
+PRUNE_RECENCY_RATE = 0.005
+
+# Text of a page the content store has nothing for
+_NO_TEXT = dict.fromkeys(TEXT_FIELDS, "")
+
+
+def decayed_weight(
+    data: dict, now: float | None = None, decay_rate: float | None = None
+) -> float:
+    """
+    Exact decayed weight of an edge, derived from its stored attributes:
+        w(t) = base_weight × e^(−λ × Δt_hours)
+    """
+    lam = decay_rate if decay_rate is not None else settings.DECAY_RATE
+    now = now if now is not None else time.time()
+    hours = max(0.0, now - data.get("last_active", now)) / 3600.0
+    return data.get("base_weight", 1.0) * math.exp(-lam * hours)
+
+
+def edge_key(u: str, v: str) -> tuple[str, str]:
+    """Canonical (sorted) ID pair for an undirected edge."""
+    return (u, v) if u <= v else (v, u)
+
+
+class GraphSnapshot:
+    """
+    Immutable, versioned copy of the graph and its community partition.
+
+    GraphService's writer publishes a new snapshot after each community
+    detection (and on load / reset). Readers can hold one on any thread, for
+    as long as they like, with no locking: later writes never touch it.
+
+    ``changes`` is the change log used for deltas: one (version, node IDs,
+    edge keys) entry per published version after ``changes_floor``, listing
+    what was added, updated or removed since the previous one. ``epoch``
+    identifies the version sequence; it changes on reset and restart.
+
+    Given a ``base`` snapshot and the nodes changed since it, only those
+    nodes are copied; everything else (attribute and adjacency dicts,
+    community sets) is shared with the base, which is safe because neither
+    is ever modified once published.
+    """
+
+    def __init__(
+        self,
+        graph: nx.Graph,
+        communities: list[set],
+        community_labels: list[dict],
+        version: int,
+        partition_version: int,
+        epoch: str = "",
+        changes: tuple[tuple[int, frozenset, frozenset], ...] = (),
+        changes_floor: int = 0,
+        node_community: dict[str, int] | None = None,
+        base: GraphSnapshot | None = None,
+        changed_nodes: set[str] | None = None,
+    ):
+        if isinstance(graph, ArrayGraph):
+            # Shares the edge columns instead of copying each edge out
+            self.graph: nx.Graph = nx.freeze(
+                graph.frozen_view(base and base.graph, changed_nodes)
+            )
+        elif base is None or changed_nodes is None:
+            self.graph = nx.freeze(self._copy(graph))
+        else:
+            self.graph = nx.freeze(self._share(graph, base.graph, changed_nodes))
+        if base is None or changed_nodes is None:
+            base_sources, base_communities = (), ()
+        else:
+            base_sources, base_communities = base._sources, base.communities
+        # The writer replaces community sets rather than changing them, so an
+        # unchanged set (same object) reuses the base's frozenset
+        self._sources: tuple[set, ...] = tuple(communities)
+        self.communities: tuple[frozenset, ...] = tuple(
+            base_communities[idx]
+            if idx < len(base_sources) and base_sources[idx] is c
+            else frozenset(c)
+            for idx, c in enumerate(communities)
+        )
+        # Label dicts are likewise replaced, never modified
+        self.community_labels: tuple[dict, ...] = tuple(community_labels)
+        self.node_community: dict[str, int] = (
+            dict(node_community)
+            if node_community is not None
+            else {n: idx for idx, community in enumerate(self.communities) for n in community}
+        )
+        self.version = version
+        self.partition_version = partition_version
+        self.epoch = epoch
+        self.changes = changes
+        self.changes_floor = changes_floor
+        self.created_at = time.time()
+
+    @staticmethod
+    def _copy(graph: nx.Graph) -> nx.Graph:
+        """
+        Copy nodes and edges with their attribute dicts. Fills the adjacency
+        directly, one attribute dict per edge shared by both endpoints (as
+        nx.Graph does itself); about 3× faster than add_edges_from, which
+        matters since the writer publishes after every detection.
+        """
+        g = nx.Graph()
+        g.graph.update(graph.graph)
+        g._node.update((n, dict(d)) for n, d in graph._node.items())
+        adj = {n: {} for n in graph._adj}
+        for u, nbrs in graph._adj.items():
+            adj_u = adj[u]
+            for v, d in nbrs.items():
+                if v not in adj_u:
+                    adj_u[v] = adj[v][u] = dict(d)
+        g._adj.update(adj)
+        return g
+
+    @staticmethod
+    def _share(graph: nx.Graph, base: nx.Graph, changed: set[str]) -> nx.Graph:
+        """
+        Copy of ``graph`` that reuses ``base`` for every node outside
+        ``changed``: changed nodes get fresh attribute and adjacency dicts
+        (their edges to each other fresh edge dicts), the rest point at the
+        base's. ``changed`` must hold both endpoints of every edge added,
+        updated or removed since ``base``.
+        """
+        g = nx.Graph()
+        g.graph.update(graph.graph)
+        node, adj = dict(base._node), dict(base._adj)
+        live_node, live_adj = graph._node, graph._adj
+        for n in changed:
+            if n not in live_node:
+                node.pop(n, None)
+                adj.pop(n, None)
+                continue
+            node[n] = dict(live_node[n])
+            adj[n] = {}
+        for n in changed:
+            if n not in live_node:
+                continue
+            adj_n, base_n = adj[n], base._adj.get(n, {})
+            for v, d in live_adj[n].items():
+                if v in adj_n:
+                    continue
+                if v in changed:
+                    adj_n[v] = adj[v][n] = d.copy()
+                else:
+                    # Unchanged edge to an unchanged node: keep the base's dict
+                    adj_n[v] = base_n[v] if v in base_n else d.copy()
+        g._node.update(node)
+        g._adj.update(adj)
+        return g
+
+
+class _ScaledMasses:
+    """Read-only view of anchored node masses × a decay factor (a degree map)."""
+
+    __slots__ = ("_mass", "_factor")
+
+    def __init__(self, mass: dict[str, float], factor: float):
+        self._mass = mass
+        self._factor = factor
+
+    def __contains__(self, n: object) -> bool:
+        return n in self._mass
+
+    def __getitem__(self, n: str) -> float:
+        return self._mass[n] * self._factor
+
+    def get(self, n: str, default: float = 0.0) -> float:
+        m = self._mass.get(n)
+        return default if m is None else m * self._factor
 
 
 class GraphService:
     """Wraps a weighted NetworkX graph that models browsing-topic relationships."""
 
-    def __init__(self, persist_path: str | None = None):
+    def __init__(
+        self, persist_path: str | None = None, content_path: str | None = None
+    ):
         self.persist_path = persist_path or settings.GRAPH_PERSIST_PATH
-        self.graph: nx.Graph = nx.Graph()
+        self.graph: nx.Graph = self._new_graph()
+        # Page text lives here, keyed by URL; page nodes keep only the URL
+        self.content = PageContentStore(content_path)
         self._communities: list[set] = []
         self._community_labels: list[dict] = []
 
+        # Bumped on every graph mutation / every new partition, so derived
+        # structures (e.g. the Bayesian sparse index) know when to rebuild
+        self._version: int = 0
+        self._partition_version: int = 0
+
+        # Full-pass strategy (COMMUNITY_ENGINE); see community_engines.py
+        self.community_engine = get_engine()
+
+        # Incremental community detection bookkeeping
+        self._touched_nodes: set[str] = set()
+        self._visits_since_full: int = 0
+        self._baseline_modularity: float = 0.0
+        self._last_detection: dict[str, Any] = {}
+        # Duration of the last full pass, to tell whether one fits a deadline
+        self._full_pass_seconds: float = 0.0
+        # Background full pass (refresh_communities): nodes touched since its
+        # snapshot was taken, or None when none is running
+        self._refresh_touched: set[str] | None = None
+        self._refreshing = False
+
+        # Lazy decay bookkeeping
+        self._last_decay_sweep: float = 0.0
+        self._orphan_candidates: set[str] = set()
+
+        # Running per-community totals of internal edges and of member
+        # degree, kept current by edge upserts, pruning, sweeps and
+        # reassignment (see community_weights, _tracked_modularity)
+        self._node_community: dict[str, int] = {}
+        self._community_mass: list[float] = []
+        self._community_edges: list[int] = []
+        self._community_degree: list[float] = []
+        self._mass_epoch: float = time.time()
+        # Communities whose members or weights changed since the last
+        # detection, to be relabelled (see _drop_from_communities)
+        self._dirty_communities: set[int] = set()
+
+        # Prune scores: per-node anchored weighted degree, plus a lazy-deletion
+        # min-heap of (log score, node) entries; _score_key holds each node's
+        # live key, so heap entries that disagree with it are stale
+        self._node_mass: dict[str, float] = {}
+        self._score_key: dict[str, float] = {}
+        self._score_heap: list[tuple[float, str]] = []
+
+        # Bridge index: for each node, how many of its neighbours sit in each
+        # community (by _node_community); keywords with neighbours outside
+        # their own community, bucketed by how many other communities
+        self._neighbor_communities: dict[str, dict[int, int]] = {}
+        self._bridges: dict[str, int] = {}
+        self._bridge_buckets: dict[int, dict[str, None]] = {}
+
+        # Recency index: (last_visited, node) for every page node, kept
+        # sorted, plus each page's indexed timestamp for removal
+        self._recency: list[tuple[float, str]] = []
+        self._page_visited: dict[str, float] = {}
+
+        # Write-ahead log: every visit is appended before it is applied.
+        # Records carry a sequence number; the snapshot stores the last one
+        # it contains, so replay after a crash never applies a visit twice.
+        self.wal_path = f"{self.persist_path}.wal"
+        # WAL records a background compaction is still writing into a
+        # snapshot (see _compact); replayed before wal_path
+        self.compacting_wal_path = f"{self.wal_path}.compacting"
+        self._wal_file = None
+        self._wal_seq: int = 0
+        self._wal_records: int = 0
+        self._replaying: bool = False
+
+        # Multi-worker mode (STATE_BACKEND=sqlite): mutations go to a log
+        # shared by every worker process instead of the local WAL, and
+        # _wal_seq tracks the last shared record applied to this replica
+        self.shared: SharedVisitLog | None = (
+            SharedVisitLog(f"{self.persist_path}.log.db")
+            if settings.STATE_BACKEND == "sqlite"
+            else None
+        )
+
+        # Graph worker: NetworkX / Louvain / Bayesian work runs on this one
+        # thread (see run), off the asyncio event loop. A single worker also
+        # means graph operations submitted through it never overlap.
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph")
+        # Periodic snapshots are written on their own thread (see _compact)
+        self._saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-save")
+        self._compaction: Future | None = None
+
+        # Change tracking for /api/graph/delta: nodes and edges (sorted ID
+        # pairs) added, updated or removed since the last publish, and the
+        # published log of those sets (see publish / graph_delta)
+        self._epoch: str = uuid.uuid4().hex[:12]
+        self._changed_nodes: set[str] = set()
+        self._changed_edges: set[tuple[str, str]] = set()
+        self._changelog: tuple[tuple[int, frozenset, frozenset], ...] = ()
+        self._changelog_floor: int = 0
+        # Set when the graph was replaced or rewritten wholesale (load, reset,
+        # decay sweep): the next snapshot copies it instead of sharing
+        self._republish_graph: bool = True
+
+        # Latest published snapshot for lock-free readers (see publish)
+        self._snapshot: GraphSnapshot = GraphSnapshot(
+            nx.Graph(), [], [], 0, 0, epoch=self._epoch
+        )
+
+    @staticmethod
+    def _new_graph(data: nx.Graph | None = None) -> nx.Graph:
+        """A graph of the configured GRAPH_ENGINE, optionally copied from ``data``."""
+        if settings.GRAPH_ENGINE == "arrays":
+            return ArrayGraph(data)
+        return nx.Graph(data)
+
+    # ── Graph Worker ──────────────────────────────────────────────────────
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run fn(*args, **kwargs) on the graph worker thread and await it.
+
+        This is the single writer: async callers use it for anything that
+        mutates the graph (or reads live, unpublished state), so a slow Louvain
+        pass doesn't block other requests and graph work stays serialized in
+        submission order. Readers that can work from the last published
+        state use `snapshot` instead. fn must not call run itself.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._worker, functools.partial(fn, *args, **kwargs)
+        )
+
+    def publish(self) -> GraphSnapshot:
+        """
+        Publish the current graph + partition as the reader snapshot. Costs
+        O(changes) beyond a couple of C-level dict copies: the new snapshot
+        shares every unchanged node with the previous one.
+        """
+        changed_nodes = self._changed_nodes
+        if (changed_nodes or self._changed_edges) and self._version > self._changelog_floor:
+            entry = (self._version, frozenset(changed_nodes), frozenset(self._changed_edges))
+            log = self._changelog + (entry,)
+            excess = len(log) - max(1, settings.GRAPH_DELTA_HISTORY)
+            if excess > 0:
+                self._changelog_floor = log[excess - 1][0]
+                log = log[excess:]
+            self._changelog = log
+        if self._republish_graph:
+            shared = None
+            self._republish_graph = False
+        else:
+            shared = set(changed_nodes)
+            for u, v in self._changed_edges:
+                shared.add(u)
+                shared.add(v)
+        self._changed_nodes = set()
+        self._changed_edges = set()
+
+        self._snapshot = GraphSnapshot(
+            self.graph,
+            self._communities,
+            self._community_labels,
+            self._version,
+            self._partition_version,
+            epoch=self._epoch,
+            changes=self._changelog,
+            changes_floor=self._changelog_floor,
+            node_community=self._node_community,
+            base=self._snapshot,
+            changed_nodes=shared,
+        )
+        return self._snapshot
+
+    def _restart_changelog(self) -> None:
+        """Start a new version sequence: clients must resync in full."""
+        self._epoch = uuid.uuid4().hex[:12]
+        self._changed_nodes = set()
+        self._changed_edges = set()
+        self._changelog = ()
+        self._changelog_floor = self._version
+
+    @property
+    def snapshot(self) -> GraphSnapshot:
+        """The latest published snapshot (safe to read from any thread)."""
+        return self._snapshot
+
+    def close(self) -> None:
+        """Wait for queued graph work, then release the worker and content store."""
+        self._worker.shutdown(wait=True)
+        self._saver.shutdown(wait=True)
+        self.content.close()
+        if self.shared is not None:
+            self.shared.close()
+
+    async def aclose(self) -> None:
+        """close() for async callers: waits on a thread, not the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
     # ── Persistence ───────────────────────────────────────────────────────
 
-    def load(self) -> None:
-        """Load graph from disk (pickle). No-op if file doesn't exist."""
+    def load(self, upto: int | None = None) -> None:
+        """
+        Load the graph snapshot from disk, then replay any write-ahead-log
+        records newer than it (shared-log records only up to seq ``upto``).
+        No-op if neither exists. Safe on a live instance: everything derived
+        from the old graph is dropped first.
+
+        Columnar snapshots also restore the community partition, so startup
+        does not need a full Louvain run. Legacy pickle snapshots are still
+        accepted. Page text found in older snapshots (node attributes or a
+        text heap) is moved into the content store.
+        """
+        if self._compaction is not None:
+            # Its snapshot and the WAL it deletes must be read together
+            self._compaction.result()
         p = Path(self.persist_path)
         if p.exists():
-            with open(p, "rb") as f:
-                self.graph = pickle.load(f)
+            self._clear_derived()
+            self._partition_version += 1
+            if is_columnar(str(p)):
+                self.graph, communities, meta = read_columnar(
+                    str(p), type(self._new_graph())
+                )
+                self._wal_seq = meta.get("wal_seq", 0)
+                self._communities = communities
+                self._baseline_modularity = meta.get("baseline_modularity", 0.0)
+                self._visits_since_full = meta.get("visits_since_full", 0)
+            else:
+                with open(p, "rb") as f:
+                    self.graph = pickle.load(f)
+                self._wal_seq = self.graph.graph.get("wal_seq", 0)
+                if type(self.graph) is not type(self._new_graph()):
+                    self.graph = self._new_graph(self.graph)
+            self._migrate_page_text()
+            self._reanchor()
+            self._rebuild_recency()
+            self._version += 1
+
+        replayed = self._replay_wal()
+        if replayed:
+            logger.info("Replayed %d page visits from %s", replayed, self.wal_path)
+        if self.shared is not None:
+            replayed = self._catch_up(upto)
+            if replayed:
+                logger.info("Applied %d shared graph updates", replayed)
+        self._restart_changelog()
+        self.publish()
 
     def save(self) -> None:
-        """Persist graph to disk."""
-        with open(self.persist_path, "wb") as f:
-            pickle.dump(self.graph, f)
+        """
+        Write a full snapshot of the live graph and truncate the write-ahead
+        log (on shutdown and eviction; periodic compaction is _compact).
+
+        The snapshot is written to a temp file and renamed into place, so a
+        crash mid-save leaves the previous snapshot + WAL intact.
+        """
+        if self._compaction is not None:
+            self._compaction.result()
+        self._write_snapshot(self.graph, self._communities, self._snapshot_meta())
+        if self._wal_file is not None:
+            self._wal_file.close()
+            self._wal_file = None
+        for path in (self.compacting_wal_path, self.wal_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._wal_records = 0
+        self._truncate_shared_log(self._wal_seq)
+
+    def _compact(self) -> None:
+        """
+        Compact the WAL without blocking the graph worker: publish, move the
+        WAL aside, and write the published snapshot on the saver thread.
+        Visits keep going to a fresh WAL meanwhile; the one moved aside is
+        deleted once the snapshot holding its records is in place. At most
+        one compaction runs at a time.
+        """
+        if self._compaction is not None and not self._compaction.done():
+            return
+        snap = self.publish()
+        meta = self._snapshot_meta()
+        if self._wal_file is not None:
+            self._wal_file.close()
+            self._wal_file = None
+        if os.path.exists(self.wal_path):
+            if os.path.exists(self.compacting_wal_path):
+                # A failed compaction left its records: keep them in order
+                with open(self.compacting_wal_path, "ab") as dst, open(self.wal_path, "rb") as src:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.wal_path)
+            else:
+                os.replace(self.wal_path, self.compacting_wal_path)
+        self._wal_records = 0
+        self._compaction = self._saver.submit(self._write_compaction, snap, meta)
+
+    def _write_compaction(self, snap: GraphSnapshot, meta: dict[str, Any]) -> None:
+        """Saver thread: write a published snapshot, then drop the WAL it covers."""
+        graph = snap.graph
+        if settings.GRAPH_SNAPSHOT_FORMAT != "columnar":
+            graph = self._new_graph(graph)  # snapshots are frozen; pickle a live copy
+        try:
+            self._write_snapshot(graph, snap.communities, meta)
+        except Exception:
+            logger.exception("Background snapshot failed; keeping %s", self.compacting_wal_path)
+            return
+        if os.path.exists(self.compacting_wal_path):
+            os.remove(self.compacting_wal_path)
+        self._truncate_shared_log(meta["wal_seq"])
+
+    def _snapshot_meta(self) -> dict[str, Any]:
+        return {
+            "wal_seq": self._wal_seq,
+            "baseline_modularity": self._baseline_modularity,
+            "visits_since_full": self._visits_since_full,
+        }
+
+    def _write_snapshot(
+        self, graph: nx.Graph, communities: Iterable[set], meta: dict[str, Any]
+    ) -> None:
+        """Atomically replace the snapshot file (temp file + fsync + rename)."""
+        # Per-process, per-thread temp file: in multi-worker mode several
+        # processes may save the same snapshot path, and compactions run on
+        # each service's saver thread
+        tmp_path = f"{self.persist_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            if settings.GRAPH_SNAPSHOT_FORMAT == "columnar":
+                write_columnar(f, graph, list(communities), meta=meta)
+            else:
+                graph.graph["wal_seq"] = meta["wal_seq"]
+                pickle.dump(graph, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.persist_path)
+
+    def _truncate_shared_log(self, seq: int) -> None:
+        if self.shared is not None:
+            # Keep one interval of history so lagging workers can still
+            # catch up from the log rather than reloading the snapshot
+            self.shared.truncate(seq - settings.GRAPH_SNAPSHOT_INTERVAL)
+
+    def _append_wal(self, record: dict) -> None:
+        """Append one visit record to the WAL (one small sequential write)."""
+        self._wal_seq += 1
+        record["seq"] = self._wal_seq
+        if self._wal_file is None:
+            self._wal_file = open(self.wal_path, "a", encoding="utf-8")
+        self._wal_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._wal_file.flush()
+        if settings.GRAPH_WAL_FSYNC:
+            os.fsync(self._wal_file.fileno())
+        self._wal_records += 1
+
+    def _replay_wal(self) -> int:
+        """Re-apply WAL records newer than the loaded snapshot."""
+        return sum(
+            self._replay_wal_file(Path(path))
+            for path in (self.compacting_wal_path, self.wal_path)
+            if os.path.exists(path)
+        )
+
+    def _replay_wal_file(self, p: Path) -> int:
+        replayed = 0
+        valid_bytes = 0
+        self._replaying = True
+        try:
+            with open(p, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        # Torn final write from a crash: cut it off so new
+                        # appends start on a clean line
+                        logger.warning("Dropping truncated WAL record in %s", p)
+                        os.truncate(p, valid_bytes)
+                        break
+                    valid_bytes += len(line)
+                    self._wal_records += 1
+                    if record["seq"] <= self._wal_seq:
+                        continue
+                    self._apply_record(record)
+                    self._wal_seq = record["seq"]
+                    replayed += 1
+        finally:
+            self._replaying = False
+        return replayed
+
+    def _apply_record(self, record: dict) -> None:
+        """
+        Re-apply one logged mutation: a visit, or in the shared log also a
+        reset, decay sweep or prune that another worker decided on.
+        """
+        op = record.get("op")
+        if op == "reset":
+            self.reset()
+            return
+        if op == "decay":
+            self._sweep(record["ts"], record.get("rate"))
+            self._remove_orphans()
+            return
+        if op == "prune":
+            self._remove_nodes([n for n in record["nodes"] if n in self.graph])
+            self._remove_orphans()
+            return
+        self.add_page_visit(
+            url=record["url"],
+            title=record["title"],
+            keywords=record["keywords"],
+            timestamp=record["ts"],
+            summary=record.get("summary", ""),
+            content_snippet=record.get("snippet", ""),
+        )
+
+    # ── Shared State (multi-worker) ───────────────────────────────────────
+
+    def _catch_up(self, upto: int | None = None) -> int:
+        """
+        Apply shared-log records this replica hasn't seen (up to seq `upto`).
+        If the log has been truncated past our position, reload the shared
+        snapshot first; it may already contain records past `upto`.
+        """
+        first = self.shared.first_seq()
+        if first is not None and first > self._wal_seq + 1:
+            logger.info("Shared log moved past seq %d; reloading snapshot", self._wal_seq)
+            if os.path.exists(self.persist_path):
+                self.load(upto)  # re-enters _catch_up from the snapshot's seq
+                return 1
+
+        applied = 0
+        self._replaying = True
+        try:
+            for seq, record in self.shared.read_since(self._wal_seq, upto):
+                self._apply_record(record)
+                self._wal_seq = seq
+                applied += 1
+        finally:
+            self._replaying = False
+        return applied
+
+    def _log_shared(self, record: dict) -> bool:
+        """
+        Append a mutation this worker is about to apply to the shared log.
+        Other workers' earlier records are applied first, so every replica
+        sees the same order. False if a snapshot reloaded meanwhile already
+        holds it, i.e. there is nothing left to apply.
+        """
+        seq = self.shared.append(record)
+        self._catch_up(upto=seq - 1)
+        if self._wal_seq >= seq:
+            return False
+        self._wal_seq = seq
+        self._wal_records += 1
+        return True
+
+    def sync(self) -> int:
+        """
+        Bring this replica up to date with the shared log (called when
+        another worker has committed). Re-detects communities, which
+        publishes a fresh snapshot, if anything was applied.
+        """
+        if self.shared is None:
+            return 0
+        applied = self._catch_up()
+        if applied:
+            self.apply_temporal_decay()
+            self.detect_communities()
+        return applied
+
+    def reset(self) -> None:
+        """Clear the graph, its page content and all derived community state."""
+        if self.shared is not None and not self._replaying:
+            self._wal_seq = self.shared.append({"op": "reset"})
+        self.graph.clear()
+        self._clear_derived()
+        self._version += 1
+        self._partition_version += 1
+        # The content store is shared: only the worker that reset clears it
+        if self.shared is None or not self._replaying:
+            self.content.clear()
+        self._restart_changelog()
+        self.publish()
+
+    def _clear_derived(self) -> None:
+        """Drop the partition and every index built from the graph."""
+        self._republish_graph = True
+        self._communities = []
+        self._community_labels = []
+        self._touched_nodes.clear()
+        self._visits_since_full = 0
+        self._baseline_modularity = 0.0
+        self._last_detection = {}
+        self._last_decay_sweep = 0.0
+        self._orphan_candidates.clear()
+        self._node_community = {}
+        self._community_mass = []
+        self._community_edges = []
+        self._community_degree = []
+        self._dirty_communities = set()
+        self._node_mass = {}
+        self._score_key = {}
+        self._score_heap = []
+        self._neighbor_communities = {}
+        self._bridges = {}
+        self._bridge_buckets = {}
+        self._recency = []
+        self._page_visited = {}
+
+    def _migrate_page_text(self) -> None:
+        """Move text held on page nodes (older snapshots) into the content store."""
+        for _, data in self.graph.nodes(data=True):
+            if data.get("type") != "page":
+                continue
+            text = {f: data.pop(f, "") for f in TEXT_FIELDS}
+            if any(text.values()) and data.get("url", "") not in self.content:
+                self.content.put(data.get("url", ""), **text)
+
+    def _page_content(self, data: dict) -> dict[str, str]:
+        """A page node's summary and content_snippet, from the content store."""
+        return self.content.get(data.get("url", ""))
+
+    def _forget_pages(self, nodes: list[str]) -> None:
+        """Drop stored text and recency entries for pages about to leave the graph."""
+        pages = [n for n in nodes if self.graph.nodes[n].get("type") == "page"]
+        # Shared content store: the worker that pruned deletes for everyone
+        if self.shared is None or not self._replaying:
+            self.content.delete_many(self.graph.nodes[n].get("url", "") for n in pages)
+        for n in pages:
+            self._unindex_page(n)
+
+    # ── Recency Index ─────────────────────────────────────────────────────
+
+    def _index_page(self, n: str, ts: float) -> None:
+        """Record (or move) a page in the recency index."""
+        self._unindex_page(n)
+        bisect.insort(self._recency, (ts, n))
+        self._page_visited[n] = ts
+
+    def _unindex_page(self, n: str) -> None:
+        ts = self._page_visited.pop(n, None)
+        if ts is not None:
+            i = bisect.bisect_left(self._recency, (ts, n))
+            del self._recency[i]
+
+    def _rebuild_recency(self) -> None:
+        self._page_visited = {
+            n: data.get("last_visited", 0)
+            for n, data in self.graph.nodes(data=True)
+            if data.get("type") == "page"
+        }
+        self._recency = sorted((ts, n) for n, ts in self._page_visited.items())
+
+    def recent_pages(self, limit: int | None = None, since: float | None = None) -> list[str]:
+        """
+        Page node IDs, most recently visited first: at most ``limit`` of
+        them, and only those visited at or after ``since``. O(k) in the
+        number returned.
+        """
+        start = bisect.bisect_left(self._recency, (since,)) if since is not None else 0
+        stop = max(start, len(self._recency) - limit) if limit is not None else start
+        return [n for _, n in reversed(self._recency[stop:])]
 
     # ── Core Graph Mutations ──────────────────────────────────────────────
 
@@ -54,24 +791,34 @@ class GraphService:
     ) -> None:
         """
         Record a page visit by:
-        1. Upserting a URL node (with summary + content snippet)
+        1. Upserting a URL node (summary + content snippet go to the content store)
         2. Upserting keyword nodes (with page-context tracking)
         3. Creating/strengthening URL↔keyword edges
         4. Creating/strengthening keyword↔keyword co-occurrence edges
         5. Pruning if graph exceeds MAX_GRAPH_NODES
         """
         ts = timestamp or time.time()
+        if not self._replaying:
+            record = {
+                "url": url,
+                "title": title,
+                "keywords": keywords,
+                "ts": ts,
+                "summary": summary,
+                "snippet": content_snippet,
+            }
+            if self.shared is not None:
+                if not self._log_shared(record):
+                    return  # a reloaded snapshot already holds this visit
+            elif settings.GRAPH_WAL_ENABLED:
+                self._append_wal(record)
+        self._version += 1
 
         # --- URL node ---
         url_id = f"page:{url}"
         if self.graph.has_node(url_id):
             self.graph.nodes[url_id]["visit_count"] += 1
             self.graph.nodes[url_id]["last_visited"] = ts
-            # Update summary if a better one is provided
-            if summary:
-                self.graph.nodes[url_id]["summary"] = summary
-            if content_snippet:
-                self.graph.nodes[url_id]["content_snippet"] = content_snippet
         else:
             self.graph.add_node(
                 url_id,
@@ -81,14 +828,16 @@ class GraphService:
                 visit_count=1,
                 first_visited=ts,
                 last_visited=ts,
-                summary=summary,
-                content_snippet=content_snippet,
             )
+        self._index_page(url_id, ts)
+        # Update stored text if a (better) one is provided
+        if summary or content_snippet:
+            self.content.put(url, summary=summary, content_snippet=content_snippet)
 
-        # --- Keyword nodes + edges ---
+        # --- Keyword nodes ---
+        # Normalized and de-duplicated, keeping extraction (salience) order
         kw_ids: list[str] = []
-        for kw in keywords:
-            kw_lower = kw.lower().strip()
+        for kw_lower in dict.fromkeys(kw.lower().strip() for kw in keywords):
             if not kw_lower:
                 continue
             kw_id = f"kw:{kw_lower}"
@@ -99,11 +848,10 @@ class GraphService:
                 self.graph.nodes[kw_id]["frequency"] += 1
                 self.graph.nodes[kw_id]["last_seen"] = ts
                 # Track which pages this keyword appears on (keep latest N)
+                # (a new list, never mutated in place: snapshots share it)
                 page_refs = self.graph.nodes[kw_id].get("page_refs", [])
                 if url not in page_refs:
-                    page_refs.append(url)
-                    if len(page_refs) > 10:
-                        page_refs = page_refs[-10:]
+                    page_refs = (page_refs + [url])[-10:]
                 self.graph.nodes[kw_id]["page_refs"] = page_refs
             else:
                 self.graph.add_node(
@@ -116,139 +864,1009 @@ class GraphService:
                     page_refs=[url],
                 )
 
-            # URL ↔ keyword edge
-            self._upsert_edge(url_id, kw_id, ts)
-
-        # --- Keyword co-occurrence edges ---
-        for i in range(len(kw_ids)):
-            for j in range(i + 1, len(kw_ids)):
-                self._upsert_edge(kw_ids[i], kw_ids[j], ts)
+        # --- URL ↔ keyword and keyword co-occurrence edges ---
+        pairs = [(url_id, kw_id) for kw_id in kw_ids]
+        pairs.extend(self._cooccurrence_pairs(kw_ids))
+        self._upsert_edges(pairs, ts)
+        self._changed_nodes.add(url_id)
+        self._changed_nodes.update(kw_ids)
+        self._changed_edges.update(edge_key(u, v) for u, v in pairs)
+
+        # Remember what changed so community detection can stay local
+        self._touched_nodes.add(url_id)
+        self._touched_nodes.update(kw_ids)
+        if self._refresh_touched is not None:
+            self._refresh_touched.add(url_id)
+            self._refresh_touched.update(kw_ids)
+        self._visits_since_full += 1
+        if not kw_ids:
+            # A page without keywords has no edges; let decay collect it
+            self._orphan_candidates.add(url_id)
+
+        # --- Refresh prune scores (every changed edge touches these nodes) ---
+        self._push_score(url_id)
+        for kw_id in kw_ids:
+            self._push_score(kw_id)
 
         # --- Prune ---
         self._prune_if_needed()
 
-    def _upsert_edge(self, u: str, v: str, ts: float) -> None:
-        """Create or strengthen an edge between two nodes."""
-        if self.graph.has_edge(u, v):
-            data = self.graph.edges[u, v]
-            data["base_weight"] = data.get("base_weight", 1.0) + 1.0
-            data["last_active"] = ts
-            data["weight"] = data["base_weight"]  # will be decayed later
-        else:
-            self.graph.add_edge(
-                u, v, base_weight=1.0, weight=1.0, last_active=ts, created=ts
+        # --- Compact the WAL into a fresh snapshot periodically ---
+        if (
+            not self._replaying
+            and self._wal_records >= settings.GRAPH_SNAPSHOT_INTERVAL
+        ):
+            self._compact()
+
+    def _upsert_edges(self, pairs: list[tuple[str, str]], ts: float) -> None:
+        """
+        Create or strengthen a batch of edges stamped with the same time.
+
+        Strengthening an existing edge adds 1 to its base weight; new edges
+        start at 1. One adjacency lookup per pair, a shared decay factor,
+        and new edges are inserted together.
+        Both endpoints of every pair must already exist and pairs must be
+        distinct.
+        """
+        adj = self.graph.adj
+        node_mass = self._node_mass
+        node_community = self._node_community
+        community_mass = self._community_mass
+        community_edges = self._community_edges
+        community_degree = self._community_degree
+        # Every upserted edge ends up with last_active = ts
+        scale = math.exp(settings.DECAY_RATE * (ts - self._mass_epoch) / 3600.0)
+
+        new_edges: list[tuple[str, str]] = []
+        for u, v in pairs:
+            data = adj[u].get(v)
+            if data is None:
+                new_edges.append((u, v))
+                delta = scale
+            else:
+                old_mass = self._edge_mass(data)
+                base = data.get("base_weight", 1.0) + 1.0
+                data["base_weight"] = base
+                data["weight"] = base  # decays lazily from here
+                data["last_active"] = ts
+                delta = base * scale - old_mass
+            node_mass[u] = node_mass.get(u, 0.0) + delta
+            node_mass[v] = node_mass.get(v, 0.0) + delta
+            cu = node_community.get(u)
+            cv = node_community.get(v)
+            if cu is not None:
+                community_degree[cu] += delta
+            if cv is not None:
+                community_degree[cv] += delta
+                if cu == cv:
+                    community_mass[cu] += delta
+                    if data is None:
+                        community_edges[cu] += 1
+
+        if new_edges:
+            self.graph.add_edges_from(
+                new_edges, base_weight=1.0, weight=1.0, last_active=ts, created=ts
             )
+            for u, v in new_edges:
+                self._link_communities(u, v, +1)
+
+    @staticmethod
+    def _cooccurrence_pairs(kw_ids: list[str]) -> list[tuple[str, str]]:
+        """
+        Keyword pairs that get a co-occurrence edge for one page.
+
+        "all" links every pair (k² / 2 edges). The bounded modes assume
+        kw_ids are in salience order and cap the cost at ~k × limit:
+          - "window": each keyword links to the next `limit` keywords
+          - "topk":   each keyword links to the `limit` most salient ones
+        Both keep the page's keywords connected, so they still land in
+        one community.
+        """
+        n = len(kw_ids)
+        limit = max(1, settings.COOCCURRENCE_LIMIT)
+        mode = settings.COOCCURRENCE_MODE
+        if mode == "window":
+            return [
+                (kw_ids[i], kw_ids[j])
+                for i in range(n)
+                for j in range(i + 1, min(n, i + 1 + limit))
+            ]
+        if mode == "topk":
+            return [
+                (kw_ids[i], kw_ids[j])
+                for i in range(min(n, limit))
+                for j in range(i + 1, n)
+            ]
+        return [(kw_ids[i], kw_ids[j]) for i in range(n) for j in range(i + 1, n)]
+
+    # ── Community Weight Totals ───────────────────────────────────────────
+
+    def _edge_mass(self, data: dict) -> float:
+        """
+        Edge weight anchored at _mass_epoch. Decay is a common factor, so
+            w(t) = mass × e^(−λ × (t − epoch)_hours)
+        and running sums of mass never need rewriting as time passes.
+        """
+        hours = (data.get("last_active", self._mass_epoch) - self._mass_epoch) / 3600.0
+        return data.get("base_weight", 1.0) * math.exp(settings.DECAY_RATE * hours)
+
+    def _track_edge(self, u: str, v: str, data: dict, sign: int) -> None:
+        """Add (sign=+1) or remove (sign=−1) an edge from its community's totals."""
+        c = self._node_community.get(u)
+        if c is not None and c == self._node_community.get(v):
+            self._community_mass[c] += sign * self._edge_mass(data)
+            self._community_edges[c] += sign
+
+    def _reanchor(self) -> None:
+        """
+        Move the mass epoch to now and rebuild everything anchored to it
+        (community totals, node prune scores). Keeps the anchored exponents
+        small; runs with the O(E) decay sweep and on load.
+        """
+        self._mass_epoch = time.time()
+        self._rebuild_node_scores()
+        self._rebuild_community_weights()
+
+    def _rebuild_community_weights(self) -> None:
+        """
+        Recompute the running per-community totals from scratch (node
+        masses must be current).
+        """
+        self._node_community = {
+            n: idx
+            for idx, community in enumerate(self._communities)
+            for n in community
+            if n in self.graph
+        }
+        self._community_mass = [0.0] * len(self._communities)
+        self._community_edges = [0] * len(self._communities)
+        if isinstance(self.graph, ArrayGraph):
+            self._column_community_weights()
+        else:
+            for u, v, data in self.graph.edges(data=True):
+                self._track_edge(u, v, data, +1)
+        self._community_degree = [0.0] * len(self._communities)
+        node_mass = self._node_mass
+        for n, c in self._node_community.items():
+            self._community_degree[c] += node_mass.get(n, 0.0)
+        self._rebuild_bridges()
+        self._mark_moved()
+
+    def _mark_moved(self, nodes: Iterable[str] | None = None) -> None:
+        """
+        Record ``nodes`` (default: all) whose community index differs from
+        the published snapshot's as changed, for deltas.
+        """
+        published = self._snapshot.node_community
+        node_community = self._node_community
+        self._changed_nodes.update(
+            n
+            for n in (node_community if nodes is None else nodes)
+            if published.get(n) != node_community.get(n)
+        )
+
+    def community_weights(self, now: float | None = None) -> list[float]:
+        """
+        Decayed sum of internal edge weights for each community, aligned with
+        self.communities. O(C): read from running totals, not the graph.
+        """
+        now = now if now is not None else time.time()
+        factor = math.exp(-settings.DECAY_RATE * (now - self._mass_epoch) / 3600.0)
+        return [max(0.0, m * factor) for m in self._community_mass]
+
+    def _tracked_modularity(self, resolution: float) -> float:
+        """
+        Weighted modularity of the current partition from the running totals,
+            Q = Σ_c [ L_c / m − γ · (d_c / 2m)² ]
+        (L_c internal mass, d_c member degree, 2m = Σ d_c). The decay factor
+        is common to every term and cancels, so this is exact at any time,
+        and O(C). Every node must be assigned a community.
+        """
+        two_m = sum(self._community_degree)
+        if two_m <= 0:
+            return 0.0
+        return sum(
+            2.0 * l_c / two_m - resolution * (d_c / two_m) ** 2
+            for l_c, d_c in zip(self._community_mass, self._community_degree)
+        )
+
+    def _drop_from_communities(self, nodes: list[str]) -> None:
+        """
+        Take nodes leaving the graph out of the partition. Community sets
+        are replaced, never changed in place, so published snapshots can
+        share them.
+        """
+        leaving: dict[int, list[str]] = defaultdict(list)
+        for n in nodes:
+            c = self._node_community.pop(n, None)
+            if c is not None:
+                leaving[c].append(n)
+        for c, members in leaving.items():
+            self._communities[c] = self._communities[c].difference(members)
+            self._dirty_communities.add(c)
+
+    # ── Bridge Index ──────────────────────────────────────────────────────
+
+    def _link_communities(self, u: str, v: str, sign: int) -> None:
+        """Count edge (u, v) (sign +1) or uncount it (−1) in the bridge index."""
+        cu = self._node_community.get(u)
+        cv = self._node_community.get(v)
+        if cv is not None:
+            self._bump_neighbor_community(u, cv, sign)
+        if cu is not None:
+            self._bump_neighbor_community(v, cu, sign)
+
+    def _bump_neighbor_community(self, n: str, c: int, delta: int) -> None:
+        counts = self._neighbor_communities.setdefault(n, {})
+        k = counts.get(c, 0) + delta
+        if k > 0:
+            counts[c] = k
+        else:
+            counts.pop(c, None)
+        self._refresh_bridge(n)
+
+    def _refresh_bridge(self, n: str) -> None:
+        """Re-derive n's bridge degree (other communities among its neighbours)."""
+        counts = self._neighbor_communities.get(n)
+        degree = 0
+        if counts and self.graph.nodes[n].get("type") == "keyword":
+            degree = len(counts) - (self._node_community.get(n) in counts)
+        old = self._bridges.get(n, 0)
+        if degree == old:
+            return
+        if old:
+            bucket = self._bridge_buckets[old]
+            del bucket[n]
+            if not bucket:
+                del self._bridge_buckets[old]
+        if degree:
+            self._bridges[n] = degree
+            self._bridge_buckets.setdefault(degree, {})[n] = None
+        else:
+            del self._bridges[n]
+
+    def _drop_bridge_node(self, n: str) -> None:
+        """Forget a node that is leaving the graph (its edges already uncounted)."""
+        self._neighbor_communities.pop(n, None)
+        degree = self._bridges.pop(n, 0)
+        if degree:
+            bucket = self._bridge_buckets[degree]
+            del bucket[n]
+            if not bucket:
+                del self._bridge_buckets[degree]
+
+    def _reassign_bridges(self, previous: dict[str, int | None]) -> None:
+        """
+        Update the bridge index after nodes changed community (moved node →
+        its previous community, or None if it had none). Costs the degree of
+        each node that moved.
+        """
+        if 2 * len(previous) > len(self._node_community):
+            self._rebuild_bridges()
+            return
+        for n, old in previous.items():
+            new = self._node_community[n]
+            if new == old:
+                continue
+            for neighbor in self.graph.neighbors(n):
+                if old is not None:
+                    self._bump_neighbor_community(neighbor, old, -1)
+                self._bump_neighbor_community(neighbor, new, +1)
+            self._refresh_bridge(n)
+
+    def _rebuild_bridges(self) -> None:
+        """Recompute the bridge index from scratch (O(E))."""
+        if isinstance(self.graph, ArrayGraph):
+            counts = self._column_neighbor_communities()
+        else:
+            node_community = self._node_community
+            counts: dict[str, dict[int, int]] = {}
+            for u, v in self.graph.edges:
+                cu = node_community.get(u)
+                cv = node_community.get(v)
+                if cv is not None:
+                    counts.setdefault(u, {})
+                    counts[u][cv] = counts[u].get(cv, 0) + 1
+                if cu is not None:
+                    counts.setdefault(v, {})
+                    counts[v][cu] = counts[v].get(cu, 0) + 1
+        self._neighbor_communities = counts
+        self._bridges = {}
+        self._bridge_buckets = {}
+        for n in counts:
+            self._refresh_bridge(n)
+
+    # ── Columnar Passes (GRAPH_ENGINE=arrays) ─────────────────────────────
+
+    # Full-graph passes over an ArrayGraph's edge columns with NumPy, each
+    # equivalent to the per-edge Python loop it replaces.
+
+    def _column_masses(self, rows: np.ndarray) -> np.ndarray:
+        """_edge_mass for each of ``rows``."""
+        g = self.graph
+        hours = (g.column("last_active", rows, self._mass_epoch) - self._mass_epoch) / 3600.0
+        return g.column("base_weight", rows, 1.0) * np.exp(settings.DECAY_RATE * hours)
+
+    def _column_communities(self) -> np.ndarray:
+        """Community index per interned node ID (−1 = unassigned)."""
+        g = self.graph
+        community = np.full(g.id_count, -1, dtype=np.int64)
+        for n, c in self._node_community.items():
+            i = g.node_id(n)
+            if i is not None:
+                community[i] = c
+        return community
+
+    def _column_node_masses(self) -> dict[str, float]:
+        g = self.graph
+        rows = g.edge_rows()
+        src, dst = g.endpoints(rows)
+        mass = self._column_masses(rows)
+        totals = np.bincount(src, mass, g.id_count) + np.bincount(dst, mass, g.id_count)
+        ids = np.union1d(src, dst)
+        return dict(zip(g.node_names(ids.tolist()), totals[ids].tolist()))
+
+    def _column_community_weights(self) -> None:
+        g = self.graph
+        rows = g.edge_rows()
+        src, dst = g.endpoints(rows)
+        community = self._column_communities()
+        cu, cv = community[src], community[dst]
+        internal = (cu == cv) & (cu >= 0)
+        n_communities = len(self._communities)
+        c = cu[internal]
+        self._community_mass = np.bincount(
+            c, self._column_masses(rows[internal]), n_communities
+        ).tolist()
+        self._community_edges = np.bincount(c, minlength=n_communities).tolist()
+
+    def _column_neighbor_communities(self) -> dict[str, dict[int, int]]:
+        g = self.graph
+        rows = g.edge_rows()
+        src, dst = g.endpoints(rows)
+        community = self._column_communities()
+        # (node, community of neighbour) for both directions of every edge
+        nodes = np.concatenate((src, dst))
+        communities = np.concatenate((community[dst], community[src]))
+        assigned = communities >= 0
+        pairs, n_links = np.unique(
+            np.stack((nodes[assigned], communities[assigned])), axis=1, return_counts=True
+        )
+        counts: dict[str, dict[int, int]] = {}
+        names = g.node_names(pairs[0].tolist())
+        for n, c, k in zip(names, pairs[1].tolist(), n_links.tolist()):
+            counts.setdefault(n, {})[c] = k
+        return counts
+
+    def _sweep_columns(self, now: float, decay_rate: float | None) -> list[tuple[str, str]]:
+        """Decay sweep: re-materialize every weight, return edges below MIN_EDGE_WEIGHT."""
+        g = self.graph
+        lam = decay_rate if decay_rate is not None else settings.DECAY_RATE
+        rows = g.edge_rows()
+        hours = np.maximum(0.0, now - g.column("last_active", rows, now)) / 3600.0
+        decayed = g.column("base_weight", rows, 1.0) * np.exp(-lam * hours)
+        g.set_column("weight", rows, decayed)
+        src, dst = g.endpoints(rows[decayed < MIN_EDGE_WEIGHT])
+        return list(zip(g.node_names(src.tolist()), g.node_names(dst.tolist())))
 
     # ── Temporal Decay ────────────────────────────────────────────────────
 
-    def apply_temporal_decay(self, decay_rate: float | None = None) -> int:
+    def edge_weight(self, u: str, v: str, now: float | None = None) -> float:
+        """Exact decayed weight of edge (u, v), computed on read."""
+        return decayed_weight(self.graph.edges[u, v], now)
+
+    def apply_temporal_decay(
+        self, decay_rate: float | None = None, force: bool = False
+    ) -> int:
         """
-        Apply exponential decay to all edge weights:
+        Lazy exponential decay:
             w(t) = base_weight × e^(−λ × Δt_hours)
 
-        Returns the number of edges removed (weight < 0.01).
+        Decay is a pure function of each edge's base_weight and last_active,
+        so it is evaluated on read (decayed_weight / edge_weight) rather than
+        rewritten on every visit. The cached ``weight`` attribute that NetworkX
+        algorithms consume is re-materialized by a bulk sweep that runs at
+        most every DECAY_SWEEP_INTERVAL seconds (or when ``force`` is set);
+        the sweep also garbage-collects edges below MIN_EDGE_WEIGHT.
+
+        Between sweeps this only drops nodes that were orphaned by edge or
+        node removal, so per-visit cost no longer grows with graph size.
+
+        Returns the number of edges removed.
         """
-        lam = decay_rate if decay_rate is not None else settings.DECAY_RATE
         now = time.time()
+        removed = 0
+
+        if force or now - self._last_decay_sweep >= settings.DECAY_SWEEP_INTERVAL:
+            # Shared log: every replica sweeps at the same point in the log
+            if self.shared is not None and not self._log_shared(
+                {"op": "decay", "ts": now, "rate": decay_rate}
+            ):
+                return 0
+            removed = self._sweep(now, decay_rate)
+        elif self.shared is not None:
+            # Replicas drop orphans only along with a logged sweep or prune,
+            # so they all drop the same ones
+            return 0
+        self._remove_orphans()
+        return removed
+
+    def _sweep(self, now: float, decay_rate: float | None) -> int:
+        """Re-materialize every edge weight at ``now``; drop edges below MIN_EDGE_WEIGHT."""
         to_remove: list[tuple[str, str]] = []
-
-        for u, v, data in self.graph.edges(data=True):
-            hours = (now - data.get("last_active", now)) / 3600.0
-            decayed = data.get("base_weight", 1.0) * math.exp(-lam * hours)
-            data["weight"] = decayed
-            if decayed < 0.01:
-                to_remove.append((u, v))
+        if isinstance(self.graph, ArrayGraph):
+            to_remove = self._sweep_columns(now, decay_rate)
+        else:
+            for u, v, data in self.graph.edges(data=True):
+                decayed = decayed_weight(data, now, decay_rate)
+                data["weight"] = decayed
+                if decayed < MIN_EDGE_WEIGHT:
+                    to_remove.append((u, v))
 
         for u, v in to_remove:
-            self.graph.remove_edge(u, v)
-
-        # Remove orphan nodes (no edges)
-        orphans = [n for n in self.graph.nodes if self.graph.degree(n) == 0]
-        self.graph.remove_nodes_from(orphans)
-
+            self._link_communities(u, v, -1)
+        self.graph.remove_edges_from(to_remove)
+        for u, v in to_remove:
+            self._orphan_candidates.add(u)
+            self._orphan_candidates.add(v)
+            self._changed_edges.add(edge_key(u, v))
+        self._last_decay_sweep = now
+        self._version += 1
+        self._republish_graph = True  # every weight was rewritten
+        self._reanchor()
         return len(to_remove)
 
+    def _remove_orphans(self) -> None:
+        """Remove nodes left without edges among those that may have lost some."""
+        orphans = [
+            n
+            for n in self._orphan_candidates
+            if n in self.graph and self.graph.degree(n) == 0
+        ]
+        if orphans:
+            self._forget_pages(orphans)
+            self.graph.remove_nodes_from(orphans)
+            self._changed_nodes.update(orphans)
+            self._drop_from_communities(orphans)
+            for n in orphans:
+                self._drop_bridge_node(n)
+                self._node_mass.pop(n, None)
+                self._score_key.pop(n, None)
+            self._version += 1
+        self._orphan_candidates.clear()
+
     # ── Community Detection ───────────────────────────────────────────────
 
     def detect_communities(
         self,
         resolution: float | None = None,
         seed: int | None = None,
+        full: bool = False,
+        deadline: float | None = None,
+        defer: bool = False,
     ) -> list[set]:
         """
-        Run Louvain community detection on the current graph.
+        Run community detection on the current graph.
+
+        In incremental mode the previous partition is kept and only the nodes
+        touched since the last run are re-optimized (see _incremental_partition).
+        A full Louvain recompute runs when there is no previous partition,
+        after COMMUNITY_FULL_RECOMPUTE_VISITS visits, when modularity drifts more
+        than COMMUNITY_MODULARITY_DRIFT below the last full run, or when
+        ``full`` is set.
+
+        With a ``deadline`` (epoch seconds) that the last full pass's duration
+        says would be missed, a due full pass is skipped: the incremental
+        result is kept even if modularity drifted, and ``last_detection`` is
+        marked ``degraded``. The full pass stays due; see refresh_communities.
+
+        With ``defer`` a full pass that is only due on schedule (visit count
+        or drift) is left to the caller to run in the background the same
+        way: the incremental result is kept and ``last_detection`` is marked
+        ``refresh_due``. A pass is still run here when there is no usable
+        partition or ``full`` is set.
+
         Returns list of sets (each set = node IDs in that community).
-        Caches result in self._communities.
+        Caches result in self._communities and publishes a new snapshot.
         """
         if self.graph.number_of_nodes() < 2:
             self._communities = (
                 [set(self.graph.nodes)] if self.graph.number_of_nodes() == 1 else []
             )
             self._community_labels = self._label_communities(self._communities)
+            self._touched_nodes.clear()
+            self._dirty_communities = set()
+            self._last_detection = {"mode": "trivial", "modularity": 0.0}
+            self._partition_version += 1
+            self._rebuild_community_weights()
+            self.publish()
             return self._communities
 
         res = resolution if resolution is not None else settings.COMMUNITY_RESOLUTION
         s = seed if seed is not None else settings.COMMUNITY_SEED
 
+        required = (
+            full
+            or not settings.COMMUNITY_INCREMENTAL
+            or not self._communities
+            or sum(self._community_degree) <= 0
+        )
+        scheduled = self._visits_since_full >= settings.COMMUNITY_FULL_RECOMPUTE_VISITS
+        needs_full = required or scheduled
+
+        # Out of time for a full pass: keep the previous partition instead
+        over_budget = (
+            deadline is not None
+            and not full
+            and bool(self._communities)
+            and time.time() + self._full_pass_seconds >= deadline
+        )
+        # Scheduled, not required: the caller runs it in the background
+        deferred = defer and not required
+        degraded = False
+        if needs_full and (deferred or over_budget):
+            needs_full = False
+            degraded = not deferred
+
+        if not needs_full:
+            # Applied in place; a full pass below replaces it if it drifted
+            dirty = self._incremental_partition(res)
+            q = self._tracked_modularity(res)
+            drifted = q < self._baseline_modularity - settings.COMMUNITY_MODULARITY_DRIFT
+            if not drifted or over_budget or deferred:
+                degraded = degraded or (drifted and not deferred)
+                self._relabel(dirty)
+                self._last_detection = {
+                    "mode": "incremental",
+                    "modularity": round(q, 4),
+                    "touched_nodes": len(self._touched_nodes),
+                }
+                if degraded:
+                    self._last_detection["degraded"] = True
+                elif deferred and (scheduled or drifted):
+                    self._last_detection["refresh_due"] = True
+            else:
+                needs_full = True
+
+        if needs_full:
+            started = time.perf_counter()
+            try:
+                self._communities, engine = self._partition(self.graph, res, s)
+            except Exception:
+                # Fallback: treat entire graph as one community
+                logger.warning(
+                    "Community detection (%s) failed; using a single community",
+                    self.community_engine.name,
+                    exc_info=True,
+                )
+                self._communities = [set(self.graph.nodes)]
+                engine = "fallback"
+            self._visits_since_full = 0
+            self._full_pass_seconds = time.perf_counter() - started
+            self._rebuild_community_weights()
+            self._baseline_modularity = self._tracked_modularity(res)
+            self._community_labels = self._label_communities(self._communities)
+            self._last_detection = {
+                "mode": "full",
+                "engine": engine,
+                "modularity": round(self._baseline_modularity, 4),
+            }
+
+        self._touched_nodes.clear()
+        self._dirty_communities = set()
+        self._partition_version += 1
+        self.publish()
+        return self._communities
+
+    async def refresh_communities(self) -> bool:
+        """
+        Run a full pass without holding up the graph worker, e.g. after
+        detect_communities skipped one to meet a deadline. The engine runs on
+        another thread against the published snapshot; the worker then
+        adopts its partition and folds in what changed since with an
+        incremental pass. Returns False if one is already running, or the
+        graph was reset or reloaded meanwhile.
+        """
+        if self._refreshing:
+            return False
+        self._refreshing = True
         try:
-            self._communities = list(
-                louvain_communities(self.graph, weight="weight", resolution=res, seed=s)
+            snap = await self.run(self._begin_refresh)
+            res = settings.COMMUNITY_RESOLUTION
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(None, self._partition_snapshot, snap, res)
+            except Exception:
+                logger.warning("Background community detection failed", exc_info=True)
+                result = None
+            return await self.run(self._adopt_partition, result, snap.epoch)
+        finally:
+            self._refreshing = False
+
+    def _begin_refresh(self) -> GraphSnapshot:
+        """Worker half: start tracking what changes after the snapshot."""
+        self._refresh_touched = set(self._changed_nodes)
+        return self._snapshot
+
+    def _partition_snapshot(
+        self, snap: GraphSnapshot, resolution: float
+    ) -> tuple[list[set], str, float]:
+        """Off-worker half: (communities, engine name, seconds taken) of a snapshot."""
+        started = time.perf_counter()
+        communities, engine = self._partition(
+            snap.graph, resolution, settings.COMMUNITY_SEED
+        )
+        return communities, engine, time.perf_counter() - started
+
+    def _adopt_partition(
+        self, result: tuple[list[set], str, float] | None, epoch: str
+    ) -> bool:
+        """Worker half: install a background partition and catch it up."""
+        touched, self._refresh_touched = self._refresh_touched or set(), None
+        if result is None or epoch != self._epoch:
+            return False
+        communities, engine, seconds = result
+        graph = self.graph
+        self._communities = [
+            c for c in ({n for n in community if n in graph} for community in communities) if c
+        ]
+        # Nodes added since the snapshot start as singletons (they are touched)
+        assigned = set().union(*self._communities)
+        self._communities.extend({n} for n in graph if n not in assigned)
+        self._rebuild_community_weights()
+        # Indices now mean different communities: the catch-up pass below
+        # only relabels the ones it changes
+        self._community_labels = self._label_communities(self._communities)
+        self._touched_nodes.update(n for n in touched if n in graph)
+        # Baseline on the live graph: the snapshot's may be well out of date
+        self._baseline_modularity = self._tracked_modularity(settings.COMMUNITY_RESOLUTION)
+        self._visits_since_full = 0
+        self._full_pass_seconds = seconds
+        # Fold in later changes incrementally. A deadline that has already
+        # passed rules out another full pass here on the worker.
+        self.detect_communities(deadline=time.time())
+        if self._last_detection.get("mode") == "incremental":
+            self._last_detection = {
+                **self._last_detection, "mode": "background", "engine": engine
+            }
+        return True
+
+    def _incremental_partition(self, resolution: float) -> set[int]:
+        """
+        Louvain local-moving phase seeded from the previous partition,
+        applied in place.
+
+        New nodes start as singletons and only touched nodes are queued for
+        re-evaluation. A node that changes community enqueues its
+        neighbours, and degrees and community totals are read from the
+        running masses (decayed to now), so the work stays proportional to
+        the region of the graph that actually changed. Community indices of
+        surviving communities are preserved so task labels do not reshuffle
+        between visits; only if one empties are all indices renumbered.
+
+        With COMMUNITY_PROJECTION=keywords only keyword ↔ keyword edges take
+        part in local moving (their degrees are recomputed, which costs a
+        pass over the keyword edges); touched pages, and pages next to a
+        keyword that moved, are then re-attached (see _attach_nodes).
+
+        The running totals and bridge index are updated along the moved
+        nodes' edges. Returns the communities whose members or weights
+        changed.
+        """
+        graph = self.graph
+        node_community = self._node_community
+        touched = [n for n in self._touched_nodes if n in graph]
+
+        # Moved node → its community before this run (None for new nodes)
+        previous: dict[str, int | None] = {}
+        n_old = len(self._communities)
+        next_idx = n_old
+        for n in touched:
+            if n not in node_community:
+                node_community[n] = next_idx
+                previous[n] = None
+                next_idx += 1
+
+        # Nodes that take part in local moving, with their weighted degree
+        if settings.COMMUNITY_PROJECTION == "keywords":
+            degree = self._keyword_degrees(graph)
+            community_degree: dict[int, float] = defaultdict(float)
+            for n, c in node_community.items():
+                community_degree[c] += degree.get(n, 0.0)
+
+            def edge_weight(data: dict) -> float:
+                return data.get("weight", 1.0)
+        else:
+            factor = math.exp(
+                -settings.DECAY_RATE * (time.time() - self._mass_epoch) / 3600.0
             )
-        except Exception:
-            # Fallback: treat entire graph as one community
-            self._communities = [set(self.graph.nodes)]
+            degree = _ScaledMasses(self._node_mass, factor)
+            community_degree = defaultdict(
+                float, {c: d * factor for c, d in enumerate(self._community_degree)}
+            )
+            for n in previous:
+                community_degree[node_community[n]] = degree.get(n, 0.0)
+
+            def edge_weight(data: dict) -> float:
+                return self._edge_mass(data) * factor
+        local_moving(
+            graph,
+            node_community,
+            resolution,
+            touched,
+            degree=degree,
+            community_degree=community_degree,
+            edge_weight=edge_weight,
+            requeue=True,
+            budget=2 * graph.number_of_nodes(),
+            on_move=previous.setdefault,
+        )
 
-        self._community_labels = self._label_communities(self._communities)
-        return self._communities
+        if settings.COMMUNITY_PROJECTION == "keywords":
+            pending = set(touched) | set(previous)
+            for n in previous:
+                if n in degree:
+                    pending.update(graph.neighbors(n))
+            pending = [n for n in pending if n not in degree]
+            before = {n: node_community[n] for n in pending}
+            for n in self._attach_nodes(graph, node_community, pending, degree):
+                previous.setdefault(n, before[n])
 
-    def _label_communities(self, communities: list[set]) -> list[dict]:
+        return self._apply_moves(previous, touched, n_old, next_idx)
+
+    def _apply_moves(
+        self,
+        previous: dict[str, int | None],
+        touched: list[str],
+        n_old: int,
+        n_total: int,
+    ) -> set[int]:
         """
-        For each community, pick a human-readable label from the most
-        central keyword node and extract top keywords.
+        Second half of _incremental_partition: carry community sets, running
+        totals and bridges across the moves in ``previous`` (node_community
+        already holds the new assignment; indices n_old..n_total-1 are new
+        singletons). Returns the communities that changed.
         """
-        labels: list[dict] = []
-        for community in communities:
-            kw_nodes = [
-                n for n in community if self.graph.nodes[n].get("type") == "keyword"
-            ]
-            if not kw_nodes:
-                # Use page title of the most connected page node
-                page_nodes = [
-                    n for n in community if self.graph.nodes[n].get("type") == "page"
-                ]
-                if page_nodes:
-                    best = max(page_nodes, key=lambda n: self.graph.degree(n))
-                    labels.append(
-                        {
-                            "label": self.graph.nodes[best].get("title", best),
-                            "keywords": [],
-                            "size": len(community),
-                        }
-                    )
-                else:
-                    labels.append(
-                        {"label": "Unknown", "keywords": [], "size": len(community)}
-                    )
+        graph = self.graph
+        node_community = self._node_community
+        node_mass = self._node_mass
+        grow = n_total - n_old
+        communities = self._communities + [set() for _ in range(grow)]
+        mass = self._community_mass + [0.0] * grow
+        edges = self._community_edges + [0] * grow
+        degree = self._community_degree + [0.0] * grow
+
+        # Sets are copied before they change: snapshots share them
+        copied: set[int] = set(range(n_old, n_total))
+
+        def members(c: int) -> set:
+            if c not in copied:
+                communities[c] = set(communities[c])
+                copied.add(c)
+            return communities[c]
+
+        # Each edge of a moved node once: untrack it under the old
+        # assignment (if it was tracked), track it under the new one
+        done: set[str] = set()
+        for n, old in previous.items():
+            new = node_community[n]
+            if new == old:
                 continue
+            if old is not None:
+                members(old).discard(n)
+                degree[old] -= node_mass.get(n, 0.0)
+            members(new).add(n)
+            degree[new] += node_mass.get(n, 0.0)
+            for neighbor, data in graph[n].items():
+                if neighbor in done:
+                    continue
+                w = self._edge_mass(data)
+                neighbor_old = previous.get(neighbor, node_community.get(neighbor))
+                if old is not None and old == neighbor_old:
+                    mass[old] -= w
+                    edges[old] -= 1
+                if new == node_community[neighbor]:
+                    mass[new] += w
+                    edges[new] += 1
+            done.add(n)
+
+        dirty = copied | self._dirty_communities
+        dirty.update(node_community[n] for n in touched)
+        labels = self._community_labels + [{}] * grow
+
+        # Drop emptied communities, renumbering what comes after them
+        keep = [c for c in range(n_total) if communities[c]]
+        old_emptied = n_old > 0 and (len(keep) < n_old or keep[n_old - 1] != n_old - 1)
+        if len(keep) < n_total:
+            remap = {c: idx for idx, c in enumerate(keep)}
+            if old_emptied:
+                # An existing community emptied: every index may shift
+                for n, c in node_community.items():
+                    node_community[n] = remap[c]
+            else:
+                for n in previous:
+                    node_community[n] = remap[node_community[n]]
+            communities = [communities[c] for c in keep]
+            mass = [mass[c] for c in keep]
+            edges = [edges[c] for c in keep]
+            degree = [degree[c] for c in keep]
+            labels = [labels[c] for c in keep]
+            dirty = {remap[c] for c in dirty if c in remap}
+
+        self._communities = communities
+        self._community_mass = mass
+        self._community_edges = edges
+        self._community_degree = degree
+        self._community_labels = labels
+        if old_emptied:
+            self._rebuild_bridges()
+            self._mark_moved()
+        else:
+            self._reassign_bridges(previous)
+            self._mark_moved(previous)
+        return dirty
 
-            # Rank keyword nodes by weighted degree within the community subgraph
-            subgraph = self.graph.subgraph(community)
-            ranked = sorted(
-                kw_nodes, key=lambda n: subgraph.degree(n, weight="weight"), reverse=True
-            )
-            top_kws = [
-                self.graph.nodes[n].get("label", n.replace("kw:", ""))
-                for n in ranked[:5]
-            ]
+    # ── Keyword Projection (COMMUNITY_PROJECTION=keywords) ────────────────
+
+    @staticmethod
+    def _keyword_degrees(graph: nx.Graph) -> dict[str, float]:
+        """
+        Weighted degree of each keyword over keyword ↔ keyword edges only.
+        Keywords without a keyword neighbour are left out.
+        """
+        nodes = graph.nodes
+        degree: dict[str, float] = {}
+        for n, data in nodes.items():
+            if data.get("type") != "keyword":
+                continue
+            k = 0.0
+            linked = False
+            for neighbor, edge in graph[n].items():
+                if neighbor != n and nodes[neighbor].get("type") == "keyword":
+                    k += edge.get("weight", 1.0)
+                    linked = True
+            if linked:
+                degree[n] = k
+        return degree
+
+    def _partition(
+        self, graph: nx.Graph, resolution: float, seed: int
+    ) -> tuple[list[set], str]:
+        """
+        Full partition of ``graph`` (the live graph, or a snapshot's) by the
+        configured engine and projection, and the engine's name.
+        """
+        if settings.COMMUNITY_PROJECTION == "keywords":
+            return self._keyword_communities(graph, resolution, seed)
+        if isinstance(graph, ArrayGraph):
+            graph = graph.as_networkx()
+        return self._cluster(graph, resolution, seed)
+
+    def _cluster(self, graph: nx.Graph, resolution: float, seed: int) -> tuple[list[set], str]:
+        """Full partition of ``graph`` by the configured engine, and its name."""
+        engine = self.community_engine.resolve(graph)
+        return engine.detect(graph, resolution, seed), engine.name
+
+    def _keyword_communities(
+        self, graph: nx.Graph, resolution: float, seed: int
+    ) -> tuple[list[set], str]:
+        """
+        The configured engine on the keyword co-occurrence graph alone, then
+        every other node joins a community through _attach_nodes. Pages are
+        most of the vertices but only matter for labels and context, so the
+        engine gets a much smaller input.
+        """
+        degree = self._keyword_degrees(graph)
+        projection = nx.Graph()
+        for u in degree:
+            for v, data in graph[u].items():
+                if v in degree and u < v:
+                    projection.add_edge(u, v, weight=data.get("weight", 1.0))
+
+        node_community: dict[str, int] = {}
+        engine = self.community_engine.resolve(projection).name
+        if projection.number_of_edges():
+            found, engine = self._cluster(projection, resolution, seed)
+            for idx, community in enumerate(found):
+                for n in community:
+                    node_community[n] = idx
+        next_idx = len(set(node_community.values()))
+        rest = []
+        for n in graph.nodes:
+            if n not in node_community:
+                node_community[n] = next_idx
+                next_idx += 1
+                rest.append(n)
+        self._attach_nodes(graph, node_community, rest, degree)
+
+        grouped: dict[int, set] = defaultdict(set)
+        for n, c in node_community.items():
+            grouped[c].add(n)
+        return [grouped[c] for c in sorted(grouped)], engine
+
+    @staticmethod
+    def _attach_nodes(
+        graph: nx.Graph,
+        node_community: dict[str, int],
+        nodes: list[str],
+        clustered: dict[str, float],
+    ) -> set[str]:
+        """
+        Move each of ``nodes`` into the community holding most of its edge
+        weight, in one pass over their edges. Pages count only edges to
+        ``clustered`` keywords. Keywords outside the projection (no keyword
+        neighbour) go last and follow their pages. A node with no such edge
+        keeps its community. Returns the nodes that moved.
+        """
+        nodes_data = graph.nodes
+        moved: set[str] = set()
+        ordered = sorted(nodes, key=lambda n: nodes_data[n].get("type") != "page")
+        for n in ordered:
+            links: dict[int, float] = defaultdict(float)
+            for neighbor, data in graph[n].items():
+                if neighbor in clustered or nodes_data[neighbor].get("type") == "page":
+                    links[node_community[neighbor]] += data.get("weight", 1.0)
+            if not links:
+                continue
+            best = max(links, key=lambda c: (links[c], -c))
+            if best != node_community[n]:
+                node_community[n] = best
+                moved.add(n)
+        return moved
+
+    def _label_communities(self, communities: list[set]) -> list[dict]:
+        """Labels for every community (see _label_community)."""
+        return [self._label_community(community) for community in communities]
 
-            labels.append(
-                {
-                    "label": top_kws[0] if top_kws else "Unknown",
-                    "keywords": top_kws,
+    def _relabel(self, dirty: set[int]) -> None:
+        """Recompute the labels of the communities that changed."""
+        labels = list(self._community_labels)
+        for c in dirty:
+            labels[c] = self._label_community(self._communities[c])
+        self._community_labels = labels
+
+    def _label_community(self, community: set) -> dict:
+        """
+        Pick a human-readable label for a community from its most central
+        keyword node and extract top keywords.
+        """
+        kw_nodes = [
+            n for n in community if self.graph.nodes[n].get("type") == "keyword"
+        ]
+        if not kw_nodes:
+            # Use page title of the most connected page node
+            page_nodes = [
+                n for n in community if self.graph.nodes[n].get("type") == "page"
+            ]
+            if page_nodes:
+                best = max(page_nodes, key=lambda n: self.graph.degree(n))
+                return {
+                    "label": self.graph.nodes[best].get("title", best),
+                    "keywords": [],
                     "size": len(community),
                 }
-            )
-        return labels
+            return {"label": "Unknown", "keywords": [], "size": len(community)}
+
+        # Rank keyword nodes by weighted degree within the community
+        # (walks adjacency directly; a subgraph view is far slower)
+        ranked = sorted(
+            kw_nodes,
+            key=lambda n: sum(
+                d.get("weight", 1.0)
+                for nbr, d in self.graph[n].items()
+                if nbr in community
+            ),
+            reverse=True,
+        )
+        top_kws = [
+            self.graph.nodes[n].get("label", n.replace("kw:", ""))
+            for n in ranked[:5]
+        ]
+        return {
+            "label": top_kws[0] if top_kws else "Unknown",
+            "keywords": top_kws,
+            "size": len(community),
+        }
 
     @property
     def communities(self) -> list[set]:
@@ -258,6 +1876,26 @@ class GraphService:
     def community_labels(self) -> list[dict]:
         return self._community_labels
 
+    @property
+    def version(self) -> int:
+        """Graph mutation counter."""
+        return self._version
+
+    @property
+    def partition_version(self) -> int:
+        """Incremented each time the community partition is recomputed."""
+        return self._partition_version
+
+    @property
+    def node_community(self) -> dict[str, int]:
+        """Node → index in self.communities, kept current with the partition."""
+        return self._node_community
+
+    @property
+    def last_detection(self) -> dict[str, Any]:
+        """Mode and modularity of the most recent detect_communities() run."""
+        return self._last_detection
+
     # ── Querying ──────────────────────────────────────────────────────────
 
     def get_subgraph_for_keywords(self, keywords: list[str], hops: int = 1) -> nx.Graph:
@@ -309,11 +1947,12 @@ class GraphService:
 
         pages = []
         for node_id, data in page_nodes[:max_p]:
+            text = self._page_content(data)
             pages.append({
                 "url": data.get("url", node_id.replace("page:", "")),
                 "title": data.get("title", ""),
-                "summary": data.get("summary", ""),
-                "content_snippet": data.get("content_snippet", ""),
+                "summary": text["summary"],
+                "content_snippet": text["content_snippet"],
                 "visit_count": data.get("visit_count", 1),
                 "last_visited": data.get("last_visited", 0),
             })
@@ -321,6 +1960,7 @@ class GraphService:
         # --- Keyword relationships (top weighted edges within community) ---
         subgraph = self.graph.subgraph(community)
         kw_edges = []
+        now = time.time()
         for u, v, d in subgraph.edges(data=True):
             u_type = self.graph.nodes[u].get("type", "")
             v_type = self.graph.nodes[v].get("type", "")
@@ -328,7 +1968,7 @@ class GraphService:
                 kw_edges.append({
                     "from": self.graph.nodes[u].get("label", u),
                     "to": self.graph.nodes[v].get("label", v),
-                    "weight": round(d.get("weight", 1.0), 2),
+                    "weight": round(decayed_weight(d, now), 2),
                 })
         kw_edges.sort(key=lambda x: x["weight"], reverse=True)
 
@@ -344,7 +1984,8 @@ class GraphService:
             "stats": {
                 "total_pages": len(page_nodes),
                 "total_keywords": len(kw_nodes),
-                "total_edges": subgraph.number_of_edges(),
+                "total_edges": self._community_edges[community_idx],
+                "total_weight": round(self.community_weights()[community_idx], 2),
             },
         }
 
@@ -357,18 +1998,12 @@ class GraphService:
         title, url, summary, and associated keywords.
         """
         max_p = max_pages or settings.MAX_TRAJECTORY_PAGES
-        page_nodes = []
-        for n, data in self.graph.nodes(data=True):
-            if data.get("type") == "page":
-                page_nodes.append((n, data))
-
-        page_nodes.sort(
-            key=lambda x: x[1].get("last_visited", 0), reverse=True
-        )
+        # Walk the recency index instead of scanning and sorting all pages
+        page_nodes = [(n, self.graph.nodes[n]) for n in self.recent_pages(max_p)]
 
         trajectory = []
         now = time.time()
-        for node_id, data in page_nodes[:max_p]:
+        for node_id, data in page_nodes:
             # Get keywords connected to this page
             connected_kws = []
             if node_id in self.graph:
@@ -380,12 +2015,13 @@ class GraphService:
 
             last_visited = data.get("last_visited", now)
             minutes_ago = max(0, (now - last_visited) / 60.0)
+            text = self._page_content(data)
 
             trajectory.append({
                 "url": data.get("url", node_id.replace("page:", "")),
                 "title": data.get("title", ""),
-                "summary": data.get("summary", ""),
-                "content_snippet": data.get("content_snippet", ""),
+                "summary": text["summary"],
+                "content_snippet": text["content_snippet"],
                 "keywords": connected_kws[:8],
                 "minutes_ago": round(minutes_ago, 1),
                 "visit_count": data.get("visit_count", 1),
@@ -393,44 +2029,30 @@ class GraphService:
 
         return trajectory
 
-    def get_cross_community_bridges(self) -> list[dict[str, Any]]:
+    def get_cross_community_bridges(self, limit: int = 10) -> list[dict[str, Any]]:
         """
         Find keyword nodes that bridge multiple communities.
         These represent conceptual connections between task clusters.
+
+        Read from the bridge index, most bridged communities first, so this
+        costs O(limit) rather than a scan of the graph.
         """
         if len(self._communities) < 2:
             return []
 
-        # Build node → community index mapping
-        node_community: dict[str, int] = {}
-        for idx, community in enumerate(self._communities):
-            for n in community:
-                node_community[n] = idx
-
         bridges: list[dict[str, Any]] = []
-        for n in self.graph.nodes:
-            if self.graph.nodes[n].get("type") != "keyword":
-                continue
-            # Find which communities this keyword's neighbors belong to
-            neighbor_communities: set[int] = set()
-            for neighbor in self.graph.neighbors(n):
-                if neighbor in node_community:
-                    neighbor_communities.add(node_community[neighbor])
-
-            own_community = node_community.get(n, -1)
-            neighbor_communities.discard(own_community)
-
-            if neighbor_communities:
-                # This keyword bridges its own community to others
-                bridge_labels = []
-                for c_idx in neighbor_communities:
-                    if c_idx < len(self._community_labels):
-                        bridge_labels.append(
-                            self._community_labels[c_idx].get("label", f"Task {c_idx}")
-                        )
+        for edge_count in sorted(self._bridge_buckets, reverse=True):
+            for n in self._bridge_buckets[edge_count]:
+                own_community = self._node_community.get(n, -1)
+                # Communities this keyword's neighbours belong to, besides its own
+                bridge_labels = [
+                    self._community_labels[c_idx].get("label", f"Task {c_idx}")
+                    for c_idx in sorted(self._neighbor_communities[n])
+                    if c_idx != own_community and c_idx < len(self._community_labels)
+                ]
 
                 own_label = ""
-                if own_community >= 0 and own_community < len(self._community_labels):
+                if 0 <= own_community < len(self._community_labels):
                     own_label = self._community_labels[own_community].get(
                         "label", f"Task {own_community}"
                     )
@@ -439,12 +2061,11 @@ class GraphService:
                     "keyword": self.graph.nodes[n].get("label", n),
                     "from_community": own_label,
                     "bridges_to": bridge_labels,
-                    "edge_count": len(neighbor_communities),
+                    "edge_count": edge_count,
                 })
-
-        # Sort by number of bridges (most connected concepts first)
-        bridges.sort(key=lambda x: x["edge_count"], reverse=True)
-        return bridges[:10]
+                if len(bridges) >= limit:
+                    return bridges
+        return bridges
 
     def find_community_for_keywords(self, keywords: list[str]) -> int | None:
         """
@@ -468,68 +2089,381 @@ class GraphService:
 
     # ── Stats / Serialization ─────────────────────────────────────────────
 
-    def get_stats(self) -> dict[str, Any]:
+    # Both read the published snapshot, so they are safe off the graph worker.
+
+    def get_stats(self, snapshot: GraphSnapshot | None = None) -> dict[str, Any]:
         """Return high-level graph statistics."""
+        snap = snapshot or self._snapshot
+        graph = snap.graph
+        degree = self._weighted_degree(graph)
         kw_nodes = [
-            (n, self.graph.degree(n, weight="weight"))
-            for n in self.graph.nodes
-            if self.graph.nodes[n].get("type") == "keyword"
+            (n, degree[n])
+            for n in graph.nodes
+            if graph.nodes[n].get("type") == "keyword"
         ]
         kw_nodes.sort(key=lambda x: x[1], reverse=True)
         top_kws = [
-            self.graph.nodes[n].get("label", n) for n, _ in kw_nodes[:10]
+            graph.nodes[n].get("label", n) for n, _ in kw_nodes[:10]
         ]
 
         return {
-            "node_count": self.graph.number_of_nodes(),
-            "edge_count": self.graph.number_of_edges(),
-            "community_count": len(self._communities),
+            "node_count": graph.number_of_nodes(),
+            "edge_count": graph.number_of_edges(),
+            "community_count": len(snap.communities),
             "top_keywords": top_kws,
+            "version": snap.version,
+            "partition_version": snap.partition_version,
         }
 
-    def to_serializable(self) -> dict:
-        """Convert graph to a JSON-serializable dict for the frontend."""
-        # Build community index for each node
-        node_community = {}
-        for idx, community in enumerate(self._communities):
-            for n in community:
-                node_community[n] = idx
-
-        nodes = []
-        for n, data in self.graph.nodes(data=True):
-            node_data = {"id": n, "community": node_community.get(n, -1)}
-            for k, v in data.items():
-                node_data[k] = v
-            nodes.append(node_data)
+    def to_serializable(
+        self,
+        fields: list[str] | None = None,
+        edge_fields: list[str] | None = None,
+        node_types: list[str] | None = None,
+        community: int | None = None,
+        top: int | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+        include_edges: bool = True,
+    ) -> dict:
+        """
+        Convert graph to a JSON-serializable dict for the frontend.
+
+        With no arguments: every node and edge with all attributes. Otherwise
+          fields, edge_fields  attributes to include ("id", "source" and
+                               "target" always are); page text is only
+                               fetched from the content store if asked for
+          node_types, community, top
+                               keep nodes of these types / this community /
+                               the N with the highest weighted degree
+          limit, cursor        page through the kept nodes in ID order;
+                               ``next_cursor`` continues from this page
+        Only edges between kept nodes are included, each on the page that
+        holds its lower-ID endpoint.
+        """
+        snap = self._snapshot
+        graph = snap.graph
+        keep = self._select_nodes(snap, node_types, community, top)
+        next_cursor = None
+        if limit is not None or cursor is not None:
+            ordered = sorted(keep if keep is not None else graph)
+            start = bisect.bisect_right(ordered, cursor) if cursor else 0
+            end = start + limit if limit is not None else len(ordered)
+            page = ordered[start:end]
+            if end < len(ordered) and page:
+                next_cursor = page[-1]
+        elif keep is not None:
+            page = [n for n in graph if n in keep]
+        else:
+            page = None
 
+        now = time.time()
+        selected = page if page is not None else graph
+        node_out = self._node_projector(snap, fields, selected)
+        edge_out = self._edge_projector(edge_fields, now)
+        nodes = [node_out(n) for n in selected]
         edges = []
-        for u, v, data in self.graph.edges(data=True):
+        if include_edges and page is None:
+            edges = [edge_out(u, v, data) for u, v, data in graph.edges(data=True)]
+        elif include_edges:
+            adj = graph.adj
+            for u in page:
+                for v, data in adj[u].items():
+                    if u < v and (keep is None or v in keep):
+                        edges.append(edge_out(u, v, data))
+
+        stats = self.get_stats(snap)
+        return {
+            **stats,
+            "epoch": snap.epoch,
+            "nodes": nodes,
+            "edges": edges,
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def _select_nodes(
+        snap: GraphSnapshot,
+        node_types: list[str] | None,
+        community: int | None,
+        top: int | None,
+    ) -> set[str] | None:
+        """Node IDs passing the filters, or None if there are no filters."""
+        if node_types is None and community is None and top is None:
+            return None
+        graph = snap.graph
+        nodes = graph.nodes
+        if community is not None:
+            if community >= 0:
+                candidates = (
+                    snap.communities[community] if community < len(snap.communities) else ()
+                )
+            else:
+                candidates = [n for n in graph if n not in snap.node_community]
+        else:
+            candidates = graph
+        if node_types is not None:
+            candidates = [n for n in candidates if nodes[n].get("type") in node_types]
+        if top is not None:
+            degree = GraphService._weighted_degree(graph)
+            candidates = heapq.nlargest(top, candidates, key=degree.__getitem__)
+        return set(candidates)
+
+    @staticmethod
+    def _weighted_degree(graph: nx.Graph) -> Mapping[str, float]:
+        """Weighted degree by node; summed from the columns for an ArrayGraph."""
+        if isinstance(graph, ArrayGraph):
+            return graph.weighted_degrees()
+        return graph.degree(weight="weight")
+
+    def _node_projector(
+        self, snap: GraphSnapshot, fields: list[str] | None, selected: Iterable[str]
+    ) -> Callable[[str], dict]:
+        """
+        Serializer for the ``selected`` nodes. Page text they need is read
+        from the content store up front, in one batch.
+        """
+        text = TEXT_FIELDS if fields is None else [f for f in fields if f in TEXT_FIELDS]
+        texts = self._page_texts(snap, selected) if text else {}
+        if fields is None:
+            return functools.partial(self._serialize_node, snap, texts)
+        attrs = [f for f in fields if f not in TEXT_FIELDS and f not in ("id", "community")]
+        with_community = "community" in fields
+        nodes = snap.graph.nodes
+
+        def project(n: str) -> dict:
+            data = nodes[n]
+            node_data = {"id": n}
+            if with_community:
+                node_data["community"] = snap.node_community.get(n, -1)
+            for f in attrs:
+                if f in data:
+                    node_data[f] = data[f]
+            if text and data.get("type") == "page":
+                content = texts.get(data.get("url", ""), _NO_TEXT)
+                for f in text:
+                    node_data[f] = content[f]
+            return node_data
+
+        return project
+
+    def _page_texts(
+        self, snap: GraphSnapshot, nodes: Iterable[str]
+    ) -> dict[str, dict[str, str]]:
+        """Stored text of the page nodes among ``nodes``, by URL."""
+        data = snap.graph.nodes
+        return self.content.get_many(
+            data[n].get("url", "") for n in nodes if data[n].get("type") == "page"
+        )
+
+    def _edge_projector(
+        self, fields: list[str] | None, now: float
+    ) -> Callable[[str, str, dict], dict]:
+        if fields is None:
+            return lambda u, v, data: self._serialize_edge(u, v, data, now)
+        attrs = [f for f in fields if f not in ("source", "target", "weight")]
+        with_weight = "weight" in fields
+
+        def project(u: str, v: str, data: dict) -> dict:
             edge_data = {"source": u, "target": v}
-            for k, val in data.items():
-                edge_data[k] = val
-            edges.append(edge_data)
+            for f in attrs:
+                if f in data:
+                    edge_data[f] = data[f]
+            if with_weight:
+                edge_data["weight"] = decayed_weight(data, now)
+            return edge_data
+
+        return project
+
+    def graph_delta(
+        self,
+        since: int,
+        epoch: str | None = None,
+        fields: list[str] | None = None,
+        edge_fields: list[str] | None = None,
+    ) -> dict:
+        """
+        Nodes and edges added, updated or removed after version ``since``,
+        projected to ``fields`` / ``edge_fields`` as in to_serializable.
 
-        stats = self.get_stats()
-        return {**stats, "nodes": nodes, "edges": edges}
+        Built from the published change log, so the cost is proportional to
+        what changed rather than to the graph. Falls back to the full graph
+        (``full`` = True) when the cursor is from another epoch, older than
+        the retained history, or when the delta would not be smaller.
+        """
+        snap = self._snapshot
+        resync = (
+            (epoch is not None and epoch != snap.epoch)
+            or since < snap.changes_floor
+            or since > snap.version
+        )
+        changed_nodes: set[str] = set()
+        changed_edges: set[tuple[str, str]] = set()
+        if not resync:
+            for version, nodes, edges in reversed(snap.changes):
+                if version <= since:
+                    break
+                changed_nodes |= nodes
+                changed_edges |= edges
+            graph = snap.graph
+            resync = (
+                len(changed_nodes) + len(changed_edges)
+                >= graph.number_of_nodes() + graph.number_of_edges()
+                > 0
+            )
+        if resync:
+            full = self.to_serializable(fields=fields, edge_fields=edge_fields)
+            return {**full, "full": True, "since": since}
+
+        graph = snap.graph
+        present = [n for n in changed_nodes if n in graph]
+        removed_nodes = [n for n in changed_nodes if n not in graph]
+        node_out = self._node_projector(snap, fields, present)
+        nodes = [node_out(n) for n in present]
+        edge_out = self._edge_projector(edge_fields, time.time())
+        edges, removed_edges = [], []
+        for u, v in changed_edges:
+            data = graph.adj.get(u, {}).get(v)
+            if data is not None:
+                edges.append(edge_out(u, v, data))
+            else:
+                removed_edges.append([u, v])
+
+        stats = self.get_stats(snap)
+        return {
+            **stats,
+            "epoch": snap.epoch,
+            "full": False,
+            "since": since,
+            "nodes": nodes,
+            "edges": edges,
+            "removed_nodes": removed_nodes,
+            "removed_edges": removed_edges,
+        }
+
+    @staticmethod
+    def _serialize_node(
+        snap: GraphSnapshot, texts: dict[str, dict[str, str]], n: str
+    ) -> dict:
+        data = snap.graph.nodes[n]
+        node_data = {"id": n, "community": snap.node_community.get(n, -1)}
+        node_data.update(data)
+        if data.get("type") == "page":
+            node_data.update(texts.get(data.get("url", ""), _NO_TEXT))
+        return node_data
+
+    @staticmethod
+    def _serialize_edge(u: str, v: str, data: dict, now: float) -> dict:
+        edge_data = {"source": u, "target": v}
+        edge_data.update(data)
+        edge_data["weight"] = decayed_weight(data, now)
+        return edge_data
 
     # ── Pruning ───────────────────────────────────────────────────────────
 
+    def _score_of(self, n: str) -> float:
+        """
+        Log of a node's prune score, weighted degree × recency:
+            log(Σ anchored edge mass) + r × (last_seen − epoch)_hours
+        Decay and recency both scale every node by the same factor of
+        "now", so this key orders nodes correctly without ever being
+        recomputed just because time passed.
+        """
+        mass = self._node_mass.get(n, 0.0)
+        if mass <= 0.0:
+            return -math.inf
+        data = self.graph.nodes[n]
+        last = data.get("last_visited", data.get("last_seen", self._mass_epoch))
+        return math.log(mass) + PRUNE_RECENCY_RATE * (last - self._mass_epoch) / 3600.0
+
+    def _push_score(self, n: str) -> None:
+        """Record a node's current score; older heap entries become stale."""
+        key = self._score_of(n)
+        self._score_key[n] = key
+        heapq.heappush(self._score_heap, (key, n))
+
+    def _rebuild_node_scores(self) -> None:
+        """Recompute anchored node masses and the score heap from scratch."""
+        self._node_mass = dict.fromkeys(self.graph.nodes, 0.0)
+        if isinstance(self.graph, ArrayGraph):
+            self._node_mass.update(self._column_node_masses())
+        else:
+            for u, v, data in self.graph.edges(data=True):
+                mass = self._edge_mass(data)
+                self._node_mass[u] += mass
+                self._node_mass[v] += mass
+        self._score_key = {n: self._score_of(n) for n in self.graph.nodes}
+        self._score_heap = [(key, n) for n, key in self._score_key.items()]
+        heapq.heapify(self._score_heap)
+
+    def _pop_lowest(self, k: int) -> list[str]:
+        """Pop the k lowest-scoring live nodes off the score heap."""
+        victims: list[str] = []
+        while self._score_heap and len(victims) < k:
+            key, n = heapq.heappop(self._score_heap)
+            if self._score_key.get(n) == key:
+                del self._score_key[n]
+                victims.append(n)
+        return victims
+
     def _prune_if_needed(self) -> None:
-        """Remove lowest-value nodes if graph exceeds MAX_GRAPH_NODES."""
+        """
+        Remove lowest-value nodes once the graph exceeds MAX_GRAPH_NODES.
+
+        Score = weighted degree × recency, kept current in a min-heap, so
+        pruning pops k nodes instead of scoring and sorting the whole graph.
+        It prunes down to PRUNE_LOW_WATERMARK × MAX_GRAPH_NODES, so the next
+        visits at capacity don't each pay for pruning again.
+
+        With the shared log, the worker that prunes logs the nodes it picked
+        and every replica removes exactly those (see _apply_record), rather
+        than each pruning on its own.
+        """
+        if self.shared is not None and self._replaying:
+            return
         max_nodes = settings.MAX_GRAPH_NODES
-        if self.graph.number_of_nodes() <= max_nodes:
+        n_nodes = self.graph.number_of_nodes()
+        if n_nodes <= max_nodes:
             return
 
-        # Score = weighted degree × recency
-        now = time.time()
-        scores: list[tuple[str, float]] = []
-        for n, data in self.graph.nodes(data=True):
-            deg = self.graph.degree(n, weight="weight")
-            last = data.get("last_visited", data.get("last_seen", now))
-            hours_ago = (now - last) / 3600.0
-            recency = math.exp(-0.005 * hours_ago)
-            scores.append((n, deg * recency))
-
-        scores.sort(key=lambda x: x[1])
-        to_remove = [n for n, _ in scores[: self.graph.number_of_nodes() - max_nodes]]
+        target = min(max_nodes, int(max_nodes * settings.PRUNE_LOW_WATERMARK))
+        to_remove = self._pop_lowest(n_nodes - target)
+        if self.shared is None:
+            self._remove_nodes(to_remove)
+        elif self._log_shared({"op": "prune", "nodes": to_remove}):
+            self._remove_nodes([n for n in to_remove if n in self.graph])
+            self._remove_orphans()
+
+    def _remove_nodes(self, to_remove: list[str]) -> None:
+        """Remove pruned nodes with their edges, keeping every index in step."""
+        removing = set(to_remove)
+
+        affected: set[str] = set()
+        for u, v, data in self.graph.edges(to_remove, data=True):
+            self._track_edge(u, v, data, -1)
+            self._link_communities(u, v, -1)
+            self._changed_edges.add(edge_key(u, v))
+            mass = self._edge_mass(data)
+            for n in (u, v):
+                c = self._node_community.get(n)
+                if c is not None:
+                    self._community_degree[c] -= mass
+                if n not in removing:
+                    self._node_mass[n] -= mass
+                    affected.add(n)
+        self._drop_from_communities(to_remove)
+        for n in to_remove:
+            self._orphan_candidates.update(self.graph.neighbors(n))
+            self._drop_bridge_node(n)
+            self._node_mass.pop(n, None)
+            self._score_key.pop(n, None)
+        self._forget_pages(to_remove)
         self.graph.remove_nodes_from(to_remove)
+        self._changed_nodes.update(to_remove)
+
+        for n in affected:
+            self._push_score(n)
+        # Drop stale entries once they outnumber live ones
+        if len(self._score_heap) > 2 * len(self._score_key) + 64:
+            self._score_heap = [(key, n) for n, key in self._score_key.items()]
+            heapq.heapify(self._score_heap)
@@ -0,0 +1,224 @@
+"""
+NodeSense Graph Snapshot Format
+Compact columnar on-disk layout for the knowledge graph, loaded via mmap.
+
+File layout (all sections 8-byte aligned):
+
+    MAGIC (8 bytes) │ header length (uint64) │ header JSON
+    edges       — structured NumPy array (src, dst, base_weight, weight,
+                  last_active, created), one row per undirected edge
+    membership  — int32 community index per node (−1 = unassigned)
+    text heap   — page text of older snapshots (now always empty)
+
+The header holds node IDs with their attributes, section offsets and
+service metadata (WAL sequence number, detection state). Page text lives in
+GraphService's content store, not in snapshots. Snapshots written before
+that kept it in the heap, addressed by each page node's ``text_ref`` of
+(offset, length) pairs; read_columnar hands it back as node attributes so
+the service can move it into the store.
+
+The edge section is turned straight into the requested graph class's
+storage: an ArrayGraph's columns are filled from it in bulk.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+from collections import defaultdict
+from typing import Any, BinaryIO
+
+import networkx as nx
+import numpy as np
+
+from array_graph import ArrayGraph
+
+MAGIC = b"NSGRAPH1"
+
+# Page-node attributes older snapshots kept in the text heap
+TEXT_FIELDS = ("summary", "content_snippet")
+
+EDGE_DTYPE = np.dtype(
+    [
+        ("src", "<u4"),
+        ("dst", "<u4"),
+        ("base_weight", "<f8"),
+        ("weight", "<f8"),
+        ("last_active", "<f8"),
+        ("created", "<f8"),
+    ]
+)
+
+
+def _pad(n: int) -> int:
+    return (-n) % 8
+
+
+def is_columnar(path: str) -> bool:
+    """True if the file at ``path`` is a columnar snapshot."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_columnar(
+    f: BinaryIO,
+    graph: nx.Graph,
+    communities: list[set],
+    meta: dict[str, Any],
+) -> None:
+    """Serialize ``graph`` and its community partition to the binary file ``f``."""
+    nodes = list(graph.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    node_entries = [[n, data] for n, data in graph.nodes(data=True)]
+
+    if isinstance(graph, ArrayGraph):
+        edges = _array_graph_edges(graph, index)
+    else:
+        edges = np.empty(graph.number_of_edges(), dtype=EDGE_DTYPE)
+        for e, (u, v, data) in enumerate(graph.edges(data=True)):
+            edges[e] = (
+                index[u],
+                index[v],
+                data.get("base_weight", 1.0),
+                data.get("weight", 1.0),
+                data.get("last_active", 0.0),
+                data.get("created", 0.0),
+            )
+
+    membership = np.full(len(nodes), -1, dtype="<i4")
+    for c, community in enumerate(communities):
+        for n in community:
+            i = index.get(n)
+            if i is not None:
+                membership[i] = c
+
+    # Section offsets depend on the header length, which depends on the
+    # offsets; iterate until the layout is stable (usually two passes).
+    sections = {
+        "edges": edges.tobytes(),
+        "membership": membership.tobytes(),
+        "heap": b"",
+    }
+    header: dict[str, Any] = {
+        "meta": meta,
+        "nodes": node_entries,
+        "edge_count": len(edges),
+        "sections": {name: [0, len(blob)] for name, blob in sections.items()},
+    }
+    while True:
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        offset = len(MAGIC) + 8 + len(header_bytes)
+        offset += _pad(offset)
+        layout = {}
+        for name, blob in sections.items():
+            layout[name] = [offset, len(blob)]
+            offset += len(blob) + _pad(len(blob))
+        if layout == header["sections"]:
+            break
+        header["sections"] = layout
+
+    f.write(MAGIC)
+    f.write(len(header_bytes).to_bytes(8, "little"))
+    f.write(header_bytes)
+    f.write(b"\0" * _pad(f.tell()))
+    for name, blob in sections.items():
+        f.write(blob)
+        f.write(b"\0" * _pad(len(blob)))
+
+
+def _array_graph_edges(graph: ArrayGraph, index: dict) -> np.ndarray:
+    """The edge section straight from an ArrayGraph's columns (row order)."""
+    position = np.zeros(graph.id_count, dtype=np.int64)
+    for n, i in index.items():
+        node_id = graph.node_id(n)
+        if node_id is not None:
+            position[node_id] = i
+    rows = graph.edge_rows()
+    src, dst = graph.endpoints(rows)
+    edges = np.empty(len(rows), dtype=EDGE_DTYPE)
+    edges["src"] = position[src]
+    edges["dst"] = position[dst]
+    edges["base_weight"] = graph.column("base_weight", rows, 1.0)
+    edges["weight"] = graph.column("weight", rows, 1.0)
+    edges["last_active"] = graph.column("last_active", rows, 0.0)
+    edges["created"] = graph.column("created", rows, 0.0)
+    return edges
+
+
+def read_columnar(
+    path: str, graph_class: type[nx.Graph] = nx.Graph
+) -> tuple[nx.Graph, list[set], dict[str, Any]]:
+    """
+    Map a columnar snapshot and rebuild it as a ``graph_class`` (nx.Graph or
+    ArrayGraph). Returns (graph, communities, meta).
+
+    Text from an older snapshot's heap is set on its page nodes under
+    TEXT_FIELDS, replacing their ``text_ref``.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        header_len = int.from_bytes(mm[len(MAGIC) : len(MAGIC) + 8], "little")
+        start = len(MAGIC) + 8
+        header = json.loads(mm[start : start + header_len])
+        sections = header["sections"]
+
+        heap_off, _ = sections["heap"]
+        node_entries = header["nodes"]
+        for _, attrs in node_entries:
+            for field, (offset, length) in attrs.pop("text_ref", {}).items():
+                offset += heap_off
+                attrs[field] = mm[offset : offset + length].decode("utf-8")
+
+        edge_off, _ = sections["edges"]
+        edges = np.frombuffer(
+            mm, dtype=EDGE_DTYPE, count=header["edge_count"], offset=edge_off
+        ).copy()
+        mem_off, _ = sections["membership"]
+        membership = np.frombuffer(
+            mm, dtype="<i4", count=len(node_entries), offset=mem_off
+        ).tolist()
+    finally:
+        mm.close()
+
+    if issubclass(graph_class, ArrayGraph):
+        graph = graph_class.from_columns(
+            node_entries,
+            edges["src"],
+            edges["dst"],
+            {key: edges[key] for key in ("base_weight", "weight", "last_active", "created")},
+        )
+    else:
+        graph = _build_graph(graph_class, node_entries, edges)
+
+    ids = [n for n, _ in node_entries]
+    grouped: dict[int, set] = defaultdict(set)
+    for i, c in enumerate(membership):
+        if c >= 0:
+            grouped[c].add(ids[i])
+    communities = [grouped[c] for c in sorted(grouped)]
+
+    return graph, communities, header["meta"]
+
+
+def _build_graph(
+    graph_class: type[nx.Graph], node_entries: list, edges: np.ndarray
+) -> nx.Graph:
+    """
+    A dict-per-edge graph from the edge section, filling the adjacency
+    directly rather than through add_edges_from (same order and layout).
+    """
+    graph = graph_class()
+    graph._node.update((n, attrs) for n, attrs in node_entries)
+    ids = [n for n, _ in node_entries]
+    adj = {n: {} for n in ids}
+    for src, dst, base_weight, weight, last_active, created in edges.tolist():
+        u, v = ids[src], ids[dst]
+        adj[u][v] = adj[v][u] = {
+            "base_weight": base_weight,
+            "weight": weight,
+            "last_active": last_active,
+            "created": created,
+        }
+    graph._adj.update(adj)
+    return graph
@@ -15,10 +15,12 @@ cross-community bridges) for LLM consumption.
 
 from __future__ import annotations
 
+import asyncio
+import itertools
 import time
 import logging
 from collections import deque
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 from typing_extensions import TypedDict
 
 from langgraph.graph import StateGraph, START, END
@@ -30,6 +32,19 @@ import llm_service
 
 logger = logging.getLogger(__name__)
 
+EMPTY_CONTEXT: dict[str, Any] = {
+    "task_label": "Exploring",
+    "keywords": [],
+    "confidence": 0.0,
+    "all_tasks": [],
+}
+
+
+def _log_task_failure(task: asyncio.Task) -> None:
+    """Done-callback for background tasks: log instead of dropping errors."""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background task failed: %s", task.exception())
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  Shared State Types
@@ -44,6 +59,12 @@ class PageAnalysisState(TypedDict, total=False):
     title: str
     content: str
     timestamp: float
+    # Earlier visits coalesced into this run (same fields as above, plus
+    # optional keywords/summary); applied to the graph before this one
+    batch: list[dict[str, Any]]
+    # End-to-end deadline (epoch seconds) from ANALYZE_DEADLINE_MS, if any
+    deadline: float
+    run_id: str
 
     # ── intermediate ──
     keywords: list[str]
@@ -87,19 +108,37 @@ class NodeSenseWorkflows:
     def __init__(self, graph_service: GraphService):
         self.gs = graph_service
         self.inferrer = BayesianTaskInferrer()
-        self._cached_context: dict[str, Any] = {
-            "task_label": "Exploring",
-            "keywords": [],
-            "confidence": 0.0,
-            "all_tasks": [],
-        }
+        self._cached_context: dict[str, Any] = dict(EMPTY_CONTEXT)
+
+        # GraphRAG enrichment for one (graph version, partition version):
+        # trajectory, bridges and per-community context are reused until the
+        # graph changes. Only touched on the graph worker (see _enrich_context).
+        self._enrichment: dict[str, Any] | None = None
+        self.enrichment_hits = 0
+        self.enrichment_misses = 0
+        # Pieces the last enrichment took from an older cache (deadline)
+        self.last_enrichment_stale: list[str] = []
+
+        # Background full community pass after a degraded detection
+        self._refresh_task: asyncio.Task | None = None
 
         # ── Pipeline event tracking ──────────────────────────────────────
         # Each pipeline run is a dict with:
-        #   id, url, title, started_at, completed_at, steps: [...]
+        #   id, url, title, started_at, completed_at, steps: [...],
+        #   degraded: [step names], deadline_exceeded
         # Each step: {name, status, started_at, completed_at, duration_ms, output_preview}
         self._pipeline_runs: deque[dict] = deque(maxlen=self.MAX_PIPELINE_HISTORY)
         self._current_run: Optional[dict] = None
+        self._run_ids = itertools.count(1)
+        # Runs not finished yet (run ID → task), and the callbacks to fire
+        # once a run's visits are in the graph (see analyze_batch)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._on_written: dict[str, Callable[[dict[str, Any]], None]] = {}
+        # Context update listeners, e.g. WebSocket connections (see subscribe)
+        self._subscribers: set[asyncio.Queue] = set()
+        # One analysis run at a time: runs share _current_run and the
+        # cached context, and each one's graph steps must not interleave
+        self._analysis_lock = asyncio.Lock()
 
         # Build & compile
         self.analyze_graph = self._build_analysis_workflow()
@@ -107,16 +146,26 @@ class NodeSenseWorkflows:
 
     # ── Pipeline Event Helpers ────────────────────────────────────────────
 
-    def _start_pipeline_run(self, url: str, title: str) -> None:
+    def _start_pipeline_run(
+        self,
+        url: str,
+        title: str,
+        batch_size: int = 1,
+        deadline: float | None = None,
+        run_id: str | None = None,
+    ) -> None:
         """Begin tracking a new pipeline run."""
         self._current_run = {
-            "id": f"run_{int(time.time() * 1000)}",
+            "id": run_id or self._new_run_id(),
             "url": url,
             "title": title,
+            "batch_size": batch_size,
             "started_at": time.time(),
             "completed_at": None,
             "status": "running",
             "steps": [],
+            "deadline": deadline,
+            "degraded": [],
         }
 
     def _start_step(self, name: str, label: str) -> dict:
@@ -139,6 +188,8 @@ class NodeSenseWorkflows:
         step["completed_at"] = time.time()
         step["duration_ms"] = round((step["completed_at"] - step["started_at"]) * 1000, 1)
         step["status"] = status
+        if status == "degraded" and self._current_run:
+            self._current_run["degraded"].append(step["name"])
         if output_preview is not None:
             # Truncate large outputs for the preview
             if isinstance(output_preview, str) and len(output_preview) > 500:
@@ -153,9 +204,43 @@ class NodeSenseWorkflows:
             self._current_run["duration_ms"] = round(
                 (self._current_run["completed_at"] - self._current_run["started_at"]) * 1000, 1
             )
+            # Past its deadline the caller was answered before the run finished
+            deadline = self._current_run["deadline"]
+            self._current_run["deadline_exceeded"] = (
+                deadline is not None and self._current_run["completed_at"] > deadline
+            )
             self._pipeline_runs.append(self._current_run)
             self._current_run = None
 
+    def _new_run_id(self) -> str:
+        return f"run_{int(time.time() * 1000)}_{next(self._run_ids)}"
+
+    @staticmethod
+    def _stage_deadline(run_deadline: float | None, budget_ms: float) -> float | None:
+        """The earlier of the run's deadline and ``budget_ms`` from now."""
+        deadlines = [run_deadline] if run_deadline is not None else []
+        if budget_ms > 0:
+            deadlines.append(time.time() + budget_ms / 1000.0)
+        return min(deadlines) if deadlines else None
+
+    def _schedule_refresh(self) -> None:
+        """Start a background full community pass unless one is running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.gs.refresh_communities())
+            self._refresh_task.add_done_callback(_log_task_failure)
+
+    @property
+    def background_tasks(self) -> list[asyncio.Future]:
+        """
+        Work still running after its request returned: analysis runs
+        answered early (deadline overruns, early visits) and a background
+        community refresh.
+        """
+        tasks = [run for run in self._inflight.values() if not run.done()]
+        if self._refresh_task is not None and not self._refresh_task.done():
+            tasks.append(self._refresh_task)
+        return tasks
+
     @property
     def pipeline_events(self) -> list[dict]:
         """Return all tracked pipeline runs (most recent first)."""
@@ -192,14 +277,27 @@ class NodeSenseWorkflows:
         """Node 1: Use pre-extracted Nano keywords or fall back to heuristic."""
         step = self._start_step("extract_entities", "Entity Extraction")
 
+        # Coalesced visits get the same treatment as the primary one
+        batch = []
+        for visit in state.get("batch", []):
+            if not visit.get("keywords"):
+                visit = {**visit, "keywords": await llm_service.extract_entities(
+                    content=visit.get("content", ""),
+                    title=visit.get("title", ""),
+                    url=visit.get("url", ""),
+                )}
+            batch.append(visit)
+        batch_preview = {"batch_size": len(batch) + 1} if batch else {}
+
         existing = state.get("keywords")
         if existing and len(existing) > 0:
             self._complete_step(step, {
                 "source": "nano_pre_extracted",
                 "keywords": existing,
                 "count": len(existing),
+                **batch_preview,
             }, status="completed")
-            return {"keywords": existing}
+            return {"keywords": existing, "batch": batch}
 
         keywords = await llm_service.extract_entities(
             content=state.get("content", ""),
@@ -210,18 +308,30 @@ class NodeSenseWorkflows:
             "source": "heuristic_fallback",
             "keywords": keywords,
             "count": len(keywords),
+            **batch_preview,
         })
-        return {"keywords": keywords}
+        return {"keywords": keywords, "batch": batch}
 
     async def _node_generate_summary(self, state: PageAnalysisState) -> dict:
         """Node 2: Generate a page summary from title + content."""
         step = self._start_step("generate_summary", "Summary Generation")
 
+        snippet_len = settings.MAX_CONTEXT_SNIPPET_LENGTH
+        batch = []
+        for visit in state.get("batch", []):
+            visit_content = visit.get("content", "")
+            batch.append({
+                **visit,
+                "summary": visit.get("summary") or llm_service.generate_page_summary(
+                    visit.get("title", ""), visit_content, visit.get("url", "")
+                ),
+                "content_snippet": visit_content[:snippet_len] if visit_content else "",
+            })
+
         existing_summary = state.get("summary", "")
         content = state.get("content", "")
         title = state.get("title", "")
         url = state.get("url", "")
-        snippet_len = settings.MAX_CONTEXT_SNIPPET_LENGTH
 
         if existing_summary:
             self._complete_step(step, {
@@ -232,6 +342,7 @@ class NodeSenseWorkflows:
             return {
                 "summary": existing_summary,
                 "content_snippet": content[:snippet_len] if content else "",
+                "batch": batch,
             }
 
         summary = llm_service.generate_page_summary(title, content, url)
@@ -244,15 +355,35 @@ class NodeSenseWorkflows:
             "snippet_length": len(content_snippet),
         })
 
-        return {"summary": summary, "content_snippet": content_snippet}
+        return {"summary": summary, "content_snippet": content_snippet, "batch": batch}
 
     async def _node_update_graph(self, state: PageAnalysisState) -> dict:
         """Node 3: Add the page visit to the NetworkX knowledge graph."""
         step = self._start_step("update_graph", "Graph Update")
+        preview = await self.gs.run(self._apply_visits, state)
+        self._complete_step(step, preview)
+
+        # Callers that only wait for the graph write get the last context now
+        on_written = self._on_written.pop(state.get("run_id", ""), None)
+        if on_written is not None:
+            on_written(self._early_result(state["run_id"]))
+        return {}
 
+    def _apply_visits(self, state: PageAnalysisState) -> dict:
+        """Graph-worker half of update_graph; returns the step preview."""
         nodes_before = self.gs.graph.number_of_nodes()
         edges_before = self.gs.graph.number_of_edges()
 
+        batch = state.get("batch", [])
+        for visit in batch:
+            self.gs.add_page_visit(
+                url=visit["url"],
+                title=visit["title"],
+                keywords=visit.get("keywords", []),
+                timestamp=visit.get("timestamp", time.time()),
+                summary=visit.get("summary", ""),
+                content_snippet=visit.get("content_snippet", ""),
+            )
         self.gs.add_page_visit(
             url=state["url"],
             title=state["title"],
@@ -261,29 +392,52 @@ class NodeSenseWorkflows:
             summary=state.get("summary", ""),
             content_snippet=state.get("content_snippet", ""),
         )
-        # Apply temporal decay on every update
-        self.gs.apply_temporal_decay()
+        # Lazy decay: drops orphans per batch, bulk-sweeps periodically
+        edges_decayed = self.gs.apply_temporal_decay()
 
         nodes_after = self.gs.graph.number_of_nodes()
         edges_after = self.gs.graph.number_of_edges()
 
-        self._complete_step(step, {
+        return {
             "nodes_before": nodes_before,
             "nodes_after": nodes_after,
             "nodes_added": nodes_after - nodes_before,
             "edges_before": edges_before,
             "edges_after": edges_after,
             "edges_added": edges_after - edges_before,
+            "edges_decayed": edges_decayed,
             "page_node": f"page:{state['url'][:80]}",
             "keyword_nodes": [f"kw:{k}" for k in state.get("keywords", [])[:8]],
-        })
-        return {}
+            "pages_applied": len(batch) + 1,
+        }
 
     async def _node_detect_communities(self, state: PageAnalysisState) -> dict:
-        """Node 4: Run Louvain community detection."""
+        """
+        Node 4: Run (incremental) Louvain community detection. Full passes
+        that fall due (every COMMUNITY_FULL_RECOMPUTE_VISITS visits, or on
+        drift) run in the background instead of on the graph worker. One
+        that could not be deferred but would overrun COMMUNITY_DEADLINE_MS
+        is skipped too, and the step is marked degraded.
+        """
         step = self._start_step("detect_communities", "Community Detection")
+        communities, preview = await self.gs.run(
+            self._detect_communities, state.get("deadline")
+        )
+        if preview.get("degraded"):
+            self._schedule_refresh()
+            self._complete_step(step, preview, status="degraded")
+        else:
+            if preview.get("refresh_due"):
+                self._schedule_refresh()
+            self._complete_step(step, preview)
+        return {"communities": communities}
 
-        communities = self.gs.detect_communities()
+    def _detect_communities(self, run_deadline: float | None = None) -> tuple[list[set], dict]:
+        """Graph-worker half of detect_communities: (communities, step preview)."""
+        communities = self.gs.detect_communities(
+            deadline=self._stage_deadline(run_deadline, settings.COMMUNITY_DEADLINE_MS),
+            defer=True,
+        )
 
         community_info = []
         for i, comm in enumerate(communities):
@@ -296,23 +450,63 @@ class NodeSenseWorkflows:
                 "sample_nodes": [str(n) for n in list(comm)[:5]],
             })
 
-        self._complete_step(step, {
+        return communities, {
             "community_count": len(communities),
+            "mode": self.gs.last_detection.get("mode"),
+            "engine": self.gs.last_detection.get("engine"),
+            "degraded": self.gs.last_detection.get("degraded", False),
+            "refresh_due": self.gs.last_detection.get("refresh_due", False),
+            "modularity": self.gs.last_detection.get("modularity"),
             "communities": community_info,
-        })
-        return {"communities": communities}
+        }
 
     async def _node_infer_task(self, state: PageAnalysisState) -> dict:
         """Node 5: Bayesian inference + rich context assembly."""
         step = self._start_step("infer_task", "Task Inference")
 
-        communities = state.get("communities", [])
-        keywords = state.get("keywords", [])
+        posteriors, active_context, posteriors_preview, stale = await self.gs.run(
+            self._infer_task, state.get("keywords", []), state.get("deadline")
+        )
+
+        # Cache the latest context for chat queries, and push it to listeners
+        self._cached_context = active_context
+        self._publish_context(active_context, state.get("run_id"))
+
+        self._complete_step(step, {
+            "active_task": active_context.get("task_label", "Exploring"),
+            "confidence": round(active_context.get("confidence", 0.0), 4),
+            "posteriors": posteriors_preview,
+            "trajectory_pages": len(active_context.get("trajectory", [])),
+            "bridge_count": len(active_context.get("bridges", [])),
+            **({"stale": stale} if stale else {}),
+        }, status="degraded" if stale else "completed")
+
+        # Mark pipeline run complete
+        self._complete_pipeline_run("completed")
+
+        return {"posteriors": posteriors, "active_context": active_context}
 
+    def _infer_task(
+        self,
+        keywords: list[str],
+        run_deadline: float | None = None,
+    ) -> tuple[dict[int, float], dict[str, Any], dict[str, float], list[str]]:
+        """
+        Graph-worker half of infer_task: (posteriors, context, preview, and
+        the enrichment pieces that came stale from the cache).
+
+        Reads the partition live rather than from the detect step's state:
+        a background refresh or a multi-worker sync may have replaced it
+        since, and it must line up with community_weights and labels.
+        """
+        communities = self.gs.communities
         posteriors = self.inferrer.compute_posteriors(
             current_keywords=keywords,
             communities=communities,
             graph=self.gs.graph,
+            cache_key=(self.gs.version, self.gs.partition_version),
+            community_weights=self.gs.community_weights(),
+            node_community=self.gs.node_community,
         )
 
         active_context = self.inferrer.get_active_context(
@@ -323,10 +517,16 @@ class NodeSenseWorkflows:
         )
 
         # ── Enrich with deep GraphRAG context ──
-        active_context = self._enrich_context(active_context, posteriors)
+        active_context = self._enrich_context(
+            active_context,
+            posteriors,
+            deadline=self._stage_deadline(run_deadline, settings.ENRICH_DEADLINE_MS),
+        )
+        stale = list(self.last_enrichment_stale)
 
-        # Cache the latest context for chat queries
-        self._cached_context = active_context
+        # Share with the other workers (multi-worker mode)
+        if self.gs.shared is not None:
+            self.gs.shared.put_context(active_context)
 
         # Build posteriors summary for visualization
         posteriors_preview = {}
@@ -335,18 +535,7 @@ class NodeSenseWorkflows:
             label = cl.get("label", f"Community {idx}") if isinstance(cl, dict) else (cl or f"Community {idx}")
             posteriors_preview[label] = round(prob, 4)
 
-        self._complete_step(step, {
-            "active_task": active_context.get("task_label", "Exploring"),
-            "confidence": round(active_context.get("confidence", 0.0), 4),
-            "posteriors": posteriors_preview,
-            "trajectory_pages": len(active_context.get("trajectory", [])),
-            "bridge_count": len(active_context.get("bridges", [])),
-        })
-
-        # Mark pipeline run complete
-        self._complete_pipeline_run("completed")
-
-        return {"posteriors": posteriors, "active_context": active_context}
+        return posteriors, active_context, posteriors_preview, stale
 
     # ── Chat Workflow ─────────────────────────────────────────────────────
 
@@ -366,7 +555,7 @@ class NodeSenseWorkflows:
 
     async def _node_retrieve_context(self, state: ChatState) -> dict:
         """Fetch the most recent active context from the cache."""
-        return {"active_context": self._cached_context}
+        return {"active_context": self.current_context}
 
     async def _node_assemble_deep_context(self, state: ChatState) -> dict:
         """Assemble deep GraphRAG context for the chat response.
@@ -384,7 +573,7 @@ class NodeSenseWorkflows:
             for task in context.get("all_tasks", []):
                 idx = task.get("community_idx", 0)
                 posteriors[idx] = task.get("probability", 0)
-            context = self._enrich_context(context, posteriors)
+            context = await self.gs.run(self._enrich_context, context, posteriors)
 
         return {"active_context": context}
 
@@ -404,6 +593,7 @@ class NodeSenseWorkflows:
         self,
         active_context: dict[str, Any],
         posteriors: dict[int, float],
+        deadline: float | None = None,
     ) -> dict[str, Any]:
         """
         Enrich the basic active_context with deep GraphRAG data:
@@ -413,24 +603,74 @@ class NodeSenseWorkflows:
 
         This transforms thin keyword-list context into rich, structured
         context that gives the LLM genuine understanding of user activity.
+
+        Results are cached per graph version and partition version, so chat
+        messages between page visits reuse one enrichment; only the
+        trajectory's minutes_ago is brought up to date.
+
+        Pieces still to be built once ``deadline`` has passed are taken
+        from the previous cache instead (listed in last_enrichment_stale);
+        such a partly stale cache is rebuilt on the next call.
         """
         enriched = dict(active_context)
+        now = time.time()
+        stale: list[str] = []
+
+        def late() -> bool:
+            return deadline is not None and time.time() > deadline
+
+        key = (self.gs.version, self.gs.partition_version)
+        cache = self._enrichment
+        previous: dict[str, Any] = {}
+        if cache is None or cache["key"] != key:
+            previous = cache or {}
+            cache = {"key": key, "built_at": now, "community_context": {}}
+            # 1. Browsing trajectory, 3. cross-community bridges
+            for piece, build in (
+                ("trajectory", self.gs.get_browsing_trajectory),
+                ("bridges", self.gs.get_cross_community_bridges),
+            ):
+                if previous and late():
+                    cache[piece] = previous[piece]
+                    stale.append(piece)
+                else:
+                    cache[piece] = build()
+            if "trajectory" in stale:
+                cache["built_at"] = previous["built_at"]
+            if stale:
+                cache["key"] = None
+            self._enrichment = cache
+            self.enrichment_misses += 1
+        else:
+            self.enrichment_hits += 1
 
-        # 1. Browsing trajectory
-        enriched["trajectory"] = self.gs.get_browsing_trajectory()
+        elapsed_min = (now - cache["built_at"]) / 60.0
+        enriched["trajectory"] = [
+            {**page, "minutes_ago": round(page["minutes_ago"] + elapsed_min, 1)}
+            for page in cache["trajectory"]
+        ]
 
         # 2. Active community deep context
         if posteriors:
             ranked = sorted(posteriors.items(), key=lambda x: x[1], reverse=True)
             top_community_idx = ranked[0][0]
-            enriched["community_context"] = self.gs.get_rich_community_context(
-                community_idx=top_community_idx
-            )
+            community_context = cache["community_context"].get(top_community_idx)
+            if community_context is None and late():
+                community_context = previous.get("community_context", {}).get(
+                    top_community_idx, {}
+                )
+                stale.append("community_context")
+            elif community_context is None:
+                community_context = self.gs.get_rich_community_context(
+                    community_idx=top_community_idx
+                )
+                cache["community_context"][top_community_idx] = community_context
+            enriched["community_context"] = community_context
         else:
             enriched["community_context"] = {}
 
-        # 3. Cross-community bridges
-        enriched["bridges"] = self.gs.get_cross_community_bridges()
+        enriched["bridges"] = cache["bridges"]
+        self.last_enrichment_stale = stale
 
         return enriched
 
@@ -449,28 +689,117 @@ class NodeSenseWorkflows:
         Run the full page-analysis pipeline.
         Returns the final state including active_context.
         """
-        # Start pipeline event tracking
-        self._start_pipeline_run(url, title)
-
-        init_state: dict[str, Any] = {
+        return await self.analyze_batch([{
             "url": url,
             "title": title,
             "content": content,
-            "timestamp": timestamp or time.time(),
-        }
-        if keywords:
-            init_state["keywords"] = keywords
-        if summary:
-            init_state["summary"] = summary
+            "timestamp": timestamp,
+            "keywords": keywords,
+            "summary": summary,
+        }])
 
+    async def analyze_batch(
+        self,
+        visits: list[dict[str, Any]],
+        on_written: Callable[[dict[str, Any]], None] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run the page-analysis pipeline once for several visits.
+
+        Every visit is extracted, summarized and added to the graph (oldest
+        first); decay, community detection and inference then run once,
+        with the most recent visit as the inference evidence. Each visit is
+        a dict of analyze_page's arguments.
+
+        With ANALYZE_DEADLINE_MS set, a run that is not done by then (waiting
+        included) keeps going in the background and the caller gets the last
+        inferred context instead, so the response time is bounded.
+
+        ``on_written`` is called with the same kind of early result as soon
+        as the visits are in the graph, for callers that don't wait for
+        inference. Results carry the ``run_id`` and whether the run is still
+        ``pending``; its context is published to subscribers when it ends.
+        """
+        visits = sorted(
+            ({**v, "timestamp": v.get("timestamp") or time.time()} for v in visits),
+            key=lambda v: v["timestamp"],
+        )
+        *batch, latest = visits
+
+        init_state: dict[str, Any] = {
+            "url": latest["url"],
+            "title": latest["title"],
+            "content": latest.get("content", ""),
+            "timestamp": latest["timestamp"],
+            "batch": batch,
+        }
+        if latest.get("keywords"):
+            init_state["keywords"] = latest["keywords"]
+        if latest.get("summary"):
+            init_state["summary"] = latest["summary"]
+
+        deadline = None
+        if settings.ANALYZE_DEADLINE_MS > 0:
+            deadline = time.time() + settings.ANALYZE_DEADLINE_MS / 1000.0
+            init_state["deadline"] = deadline
+
+        run_id = init_state["run_id"] = self._new_run_id()
+        if on_written is not None:
+            self._on_written[run_id] = on_written
+        run = asyncio.ensure_future(self._run_analysis(init_state, len(visits)))
+        self._inflight[run_id] = run
+        run.add_done_callback(lambda _: self._inflight.pop(run_id, None))
+        if deadline is None:
+            return {**await run, "pending": False}
         try:
-            result = await self.analyze_graph.ainvoke(init_state)
-        except Exception as e:
-            logger.error("Pipeline failed: %s", e)
-            self._complete_pipeline_run("failed")
-            raise
+            result = await asyncio.wait_for(
+                asyncio.shield(run), timeout=max(0.0, deadline - time.time())
+            )
+        except asyncio.TimeoutError:
+            run.add_done_callback(_log_task_failure)
+            logger.warning(
+                "Analysis of %s passed its %.0f ms deadline; answering with the last context",
+                latest["url"],
+                settings.ANALYZE_DEADLINE_MS,
+            )
+            return self._early_result(run_id)
+        return {**result, "pending": False}
 
-        return result
+    def _early_result(self, run_id: str) -> dict[str, Any]:
+        """Result for a caller answered before its run finished."""
+        return {"active_context": self.current_context, "run_id": run_id, "pending": True}
+
+    async def wait_for_run(self, run_id: str, timeout: float) -> bool:
+        """
+        Wait up to ``timeout`` seconds for an analysis run to finish. True
+        if it is done (or unknown here: finished long ago, or another
+        worker's), False on timeout.
+        """
+        run = self._inflight.get(run_id)
+        if run is None:
+            return True
+        done, _ = await asyncio.wait({run}, timeout=timeout)
+        return bool(done)
+
+    async def _run_analysis(self, init_state: dict[str, Any], batch_size: int) -> dict[str, Any]:
+        """Run the analysis workflow once, holding the analysis lock."""
+        async with self._analysis_lock:
+            # Start pipeline event tracking
+            self._start_pipeline_run(
+                init_state["url"],
+                init_state["title"],
+                batch_size=batch_size,
+                deadline=init_state.get("deadline"),
+                run_id=init_state["run_id"],
+            )
+            try:
+                return await self.analyze_graph.ainvoke(init_state)
+            except Exception as e:
+                logger.error("Pipeline failed: %s", e)
+                self._complete_pipeline_run("failed")
+                raise
+            finally:
+                self._on_written.pop(init_state["run_id"], None)
 
     async def chat(self, query: str, session_id: str | None = None) -> dict[str, Any]:
         """
@@ -484,5 +813,45 @@ class NodeSenseWorkflows:
 
     @property
     def current_context(self) -> dict[str, Any]:
-        """Return the cached active context without re-running inference."""
+        """
+        Return the cached active context without re-running inference.
+        In multi-worker mode, the latest one from any worker.
+        """
+        if self.gs.shared is not None:
+            shared = self.gs.shared.get_context()
+            if shared is not None:
+                return shared
         return self._cached_context
+
+    def reset_context(self) -> None:
+        """Forget the cached context and inference state (graph reset)."""
+        self._cached_context = dict(EMPTY_CONTEXT)
+        self.inferrer = BayesianTaskInferrer()
+        if self.gs.shared is not None:
+            self.gs.shared.put_context(self._cached_context)
+        self._publish_context(self._cached_context, None)
+
+    # ── Context Subscriptions ─────────────────────────────────────────────
+
+    # Updates a slow listener may fall behind by; older ones are dropped,
+    # since only the newest context matters
+    SUBSCRIBER_QUEUE_SIZE = 8
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Queue that receives {"type": "context_update", "context", "run_id"}
+        whenever an analysis run (in this process) infers a new context.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _publish_context(self, context: dict[str, Any], run_id: str | None) -> None:
+        message = {"type": "context_update", "context": context, "run_id": run_id}
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
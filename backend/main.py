@@ -5,24 +5,29 @@ Main entry point — CORS, lifespan (graph persistence), REST endpoints, WebSock
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import time
 from contextlib import asynccontextmanager
+from typing import Any
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import orjson
+from fastapi import Depends, FastAPI, Header, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from config import settings
 from schemas import (
     ChatRequest,
     ChatResponse,
     ContextResponse,
-    CommunityInfo,
+    GraphDeltaResponse,
     GraphStatsResponse,
+    PageVisitBatchRequest,
     PageVisitRequest,
 )
-from graph_service import GraphService
-from langgraph_flow import NodeSenseWorkflows
+from tenants import DEFAULT_TENANT, TenantRegistry
 import llm_service
 
 logging.basicConfig(level=logging.INFO)
@@ -30,8 +35,8 @@ logger = logging.getLogger(__name__)
 
 # ── Services (module-level singletons) ────────────────────────────────────────
 
-graph_service = GraphService()
-workflows: NodeSenseWorkflows | None = None
+# Each tenant (session ID) gets its own GraphService, workflows and visit queue
+tenants = TenantRegistry()
 
 
 # ── Lifespan ──────────────────────────────────────────────────────────────────
@@ -39,26 +44,19 @@ workflows: NodeSenseWorkflows | None = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: load graph from disk.  Shutdown: persist graph."""
-    global workflows
-
+    """Startup: load the default tenant's graph.  Shutdown: persist all graphs."""
     logger.info("Loading knowledge graph from %s", settings.GRAPH_PERSIST_PATH)
-    graph_service.load()
-    # Re-run community detection on existing graph
-    if graph_service.graph.number_of_nodes() > 0:
-        graph_service.detect_communities()
-
-    workflows = NodeSenseWorkflows(graph_service)
+    tenant = await tenants.get(DEFAULT_TENANT)
     logger.info(
         "NodeSense backend ready  (%d nodes, %d edges)",
-        graph_service.graph.number_of_nodes(),
-        graph_service.graph.number_of_edges(),
+        tenant.graph_service.graph.number_of_nodes(),
+        tenant.graph_service.graph.number_of_edges(),
     )
 
     yield  # ── app is running ──
 
-    logger.info("Persisting knowledge graph …")
-    graph_service.save()
+    logger.info("Persisting knowledge graphs …")
+    await tenants.close_all()
     logger.info("Shutdown complete.")
 
 
@@ -85,6 +83,77 @@ app.add_middleware(
 )
 
 
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON rendered by orjson, for large payloads the server shaped itself
+    (graph dumps, pipeline events, context). Returning one skips FastAPI's
+    response-model validation and jsonable_encoder pass; the endpoint's
+    response_model still documents the shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+async def tenant_id(
+    x_session_id: str | None = Header(default=None),
+    session_id: str | None = Query(default=None),
+) -> str | None:
+    """Tenant key: the X-Session-Id header, else a session_id query param."""
+    return x_session_id or session_id
+
+
+def _visit_payload(req: PageVisitRequest) -> dict:
+    """Pipeline input for one visit (see NodeSenseWorkflows.analyze_batch)."""
+    return {
+        "url": req.url,
+        "title": req.title,
+        "content": req.content,
+        "timestamp": req.timestamp,
+        "keywords": req.keywords,
+        "summary": req.summary,
+    }
+
+
+def _context_response(ctx: dict, result: dict | None = None) -> dict:
+    """
+    Shape an active_context dict into the ContextResponse layout, with the
+    run ID and pending flag of an analysis ``result`` if given.
+    """
+    all_tasks = ctx.get("all_tasks", [])
+    result = result or {}
+
+    return {
+        "active_task": ctx.get("task_label", "Exploring"),
+        "keywords": list(ctx.get("keywords", [])),
+        "confidence": float(ctx.get("confidence", 0.0)),
+        "communities": [
+            {
+                "label": t.get("label", ""),
+                "keywords": list(t.get("keywords", [])),
+                "size": int(t.get("size", 0)),
+                "probability": float(t.get("probability", 0.0)),
+            }
+            for t in all_tasks
+        ],
+        "run_id": result.get("run_id"),
+        "pending": bool(result.get("pending", False)),
+    }
+
+
 # ── REST Endpoints ────────────────────────────────────────────────────────────
 
 
@@ -94,48 +163,53 @@ async def root():
 
 
 @app.post("/api/analyze", response_model=ContextResponse)
-async def analyze_page(req: PageVisitRequest):
+async def analyze_page(
+    req: PageVisitRequest,
+    run_async: bool = Query(default=False, alias="async"),
+    tid: str | None = Depends(tenant_id),
+):
     """
     Process a page visit:
     extract entities → update graph → detect communities → Bayesian inference.
+    Visits arriving together are coalesced into one pipeline run.
     Returns the inferred active context.
+
+    With ?async=true the response comes as soon as the visit is in the
+    graph: the previous context, pending, plus the run ID. The new context
+    is then pushed to WebSocket clients and served by /api/context?after=.
     """
-    result = await workflows.analyze_page(
-        url=req.url,
-        title=req.title,
-        content=req.content,
-        timestamp=req.timestamp,
-        keywords=req.keywords,
-        summary=req.summary,
-    )
+    async with tenants.use(tid) as t:
+        result = await t.visit_queue.submit(_visit_payload(req), early=run_async)
+    return _context_response(result.get("active_context", {}), result)
 
-    ctx = result.get("active_context", {})
-    all_tasks = ctx.get("all_tasks", [])
 
-    return ContextResponse(
-        active_task=ctx.get("task_label", "Exploring"),
-        keywords=ctx.get("keywords", []),
-        confidence=ctx.get("confidence", 0.0),
-        communities=[
-            CommunityInfo(
-                label=t.get("label", ""),
-                keywords=t.get("keywords", []),
-                size=t.get("size", 0),
-                probability=t.get("probability", 0.0),
-            )
-            for t in all_tasks
-        ],
-    )
+@app.post("/api/analyze/batch", response_model=ContextResponse)
+async def analyze_batch(
+    req: PageVisitBatchRequest,
+    run_async: bool = Query(default=False, alias="async"),
+    tid: str | None = Depends(tenant_id),
+):
+    """
+    Process several page visits with one community detection + inference
+    pass. Returns the active context after all of them are applied
+    (?async=true as for /api/analyze).
+    """
+    async with tenants.use(tid) as t:
+        result = await t.visit_queue.submit_many(
+            [_visit_payload(v) for v in req.visits], early=run_async
+        )
+    return _context_response(result.get("active_context", {}), result)
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest, tid: str | None = Depends(tenant_id)):
     """
     Handle a user chat query.
     Injects the current browsing context into the LLM prompt.
     """
-    result = await workflows.chat(query=req.query, session_id=req.session_id)
-    ctx = workflows.current_context
+    async with tenants.use(tid or req.session_id) as t:
+        result = await t.workflows.chat(query=req.query, session_id=req.session_id)
+        ctx = t.workflows.current_context
 
     return ChatResponse(
         response=result.get("response", ""),
@@ -144,70 +218,146 @@ async def chat(req: ChatRequest):
 
 
 @app.get("/api/context", response_model=ContextResponse)
-async def get_context():
-    """Return the current active context without triggering a new analysis."""
-    ctx = workflows.current_context
-    all_tasks = ctx.get("all_tasks", [])
+async def get_context(
+    after: str | None = Query(default=None, description="run_id of an async analyze"),
+    timeout: float = Query(default=10.0, ge=0, le=60),
+    tid: str | None = Depends(tenant_id),
+):
+    """
+    Return the current active context without triggering a new analysis.
+    With `after`, first wait (up to `timeout` seconds) for that analysis
+    run to finish; `pending` is set if it still hasn't.
+    """
+    async with tenants.use(tid) as t:
+        done = True
+        if after:
+            done = await t.workflows.wait_for_run(after, timeout)
+        result = {"run_id": after, "pending": not done} if after else None
+        return FastJSONResponse(_context_response(t.workflows.current_context, result))
+
+
+async def _off_loop(fn, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a snapshot read (serialization, stats) on a thread pool. These walk
+    the whole published graph, so on the event loop they would stall every
+    other request; snapshots are safe to read from any thread.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
 
-    return ContextResponse(
-        active_task=ctx.get("task_label", "Exploring"),
-        keywords=ctx.get("keywords", []),
-        confidence=ctx.get("confidence", 0.0),
-        communities=[
-            CommunityInfo(
-                label=t.get("label", ""),
-                keywords=t.get("keywords", []),
-                size=t.get("size", 0),
-                probability=t.get("probability", 0.0),
-            )
-            for t in all_tasks
-        ],
-    )
+
+def _csv(value: str | None) -> list[str] | None:
+    """Split a comma-separated query parameter (None when absent)."""
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
 
 
 @app.get("/api/graph", response_model=GraphStatsResponse)
-async def get_graph():
-    """Return graph statistics and serialized node/edge data."""
-    data = graph_service.to_serializable()
-    return GraphStatsResponse(**data)
+async def get_graph(
+    fields: str | None = Query(default=None, description="Node attributes, comma-separated"),
+    edge_fields: str | None = Query(default=None, description="Edge attributes, comma-separated"),
+    types: str | None = Query(default=None, description="Node types, e.g. keyword,page"),
+    community: int | None = Query(default=None, ge=-1),
+    top: int | None = Query(default=None, ge=1, description="Top N nodes by weighted degree"),
+    limit: int | None = Query(default=None, ge=1, description="Nodes per page"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    edges: bool = True,
+    tid: str | None = Depends(tenant_id),
+):
+    """
+    Return graph statistics and serialized node/edge data (latest snapshot).
+    Without parameters this is the whole graph; the parameters project,
+    filter and paginate it (see GraphService.to_serializable).
+    """
+    async with tenants.use(tid) as t:
+        graph_service = t.graph_service
+
+        def _render():
+            # JSONResponse encodes in its constructor, so this runs off-loop too
+            return FastJSONResponse(
+                graph_service.to_serializable(
+                    fields=_csv(fields),
+                    edge_fields=_csv(edge_fields),
+                    node_types=_csv(types),
+                    community=community,
+                    top=top,
+                    limit=limit,
+                    cursor=cursor,
+                    include_edges=edges,
+                )
+            )
+
+        return await _off_loop(_render)
+
+
+@app.get("/api/graph/delta", response_model=GraphDeltaResponse)
+async def get_graph_delta(
+    since: int = Query(..., ge=0),
+    epoch: str | None = None,
+    fields: str | None = Query(default=None, description="Node attributes, comma-separated"),
+    edge_fields: str | None = Query(default=None, description="Edge attributes, comma-separated"),
+    tid: str | None = Depends(tenant_id),
+):
+    """
+    Return only the nodes and edges that changed after graph version `since`
+    (the `version` of an earlier /api/graph or delta response). Falls back to
+    the full graph, with `full` set, when the cursor can't be served.
+    `fields` / `edge_fields` project the nodes and edges as on /api/graph.
+    """
+    async with tenants.use(tid) as t:
+        graph_service = t.graph_service
+        return await _off_loop(
+            lambda: FastJSONResponse(
+                graph_service.graph_delta(
+                    since, epoch, fields=_csv(fields), edge_fields=_csv(edge_fields)
+                )
+            )
+        )
 
 
 @app.post("/api/graph/reset")
-async def reset_graph():
+async def reset_graph(tid: str | None = Depends(tenant_id)):
     """Clear the entire knowledge graph and reset inference state."""
-    graph_service.graph.clear()
-    graph_service._communities = []
-    graph_service._community_labels = []
-    graph_service.save()
-
-    # Reset the workflows' cached context
-    workflows._cached_context = {
-        "task_label": "Exploring",
-        "keywords": [],
-        "confidence": 0.0,
-        "all_tasks": [],
-    }
-    workflows.inferrer = __import__("bayesian").BayesianTaskInferrer()
+    async with tenants.use(tid) as t:
+        graph_service, workflows = t.graph_service, t.workflows
+
+        def _reset():
+            graph_service.reset()
+            graph_service.save()
 
-    logger.info("Knowledge graph reset")
+        await graph_service.run(_reset)
+
+        # Reset the workflows' cached context
+        workflows.reset_context()
+
+    logger.info("Knowledge graph reset (tenant %r)", t.id)
     return {"status": "ok", "message": "Graph cleared"}
 
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(tid: str | None = Depends(tenant_id)):
     """Return diagnostics: graph stats + LLM rate limiter status."""
-    return {
-        "graph": graph_service.get_stats(),
-        "llm": llm_service.get_llm_stats(),
-    }
+    async with tenants.use(tid) as t:
+        return {
+            "graph": await _off_loop(t.graph_service.get_stats),
+            "llm": llm_service.get_llm_stats(),
+            "ingest": t.visit_queue.get_stats(),
+            "enrichment_cache": {
+                "hits": t.workflows.enrichment_hits,
+                "misses": t.workflows.enrichment_misses,
+            },
+            "tenants": tenants.get_stats(),
+        }
 
 
 @app.get("/api/pipeline/events")
-async def get_pipeline_events():
+async def get_pipeline_events(tid: str | None = Depends(tenant_id)):
     """Return recent pipeline execution events for the Visualize tab."""
-    return {
-        "runs": workflows.pipeline_events,
-    }
+    async with tenants.use(tid) as t:
+        return FastJSONResponse({
+            "runs": t.workflows.pipeline_events,
+        })
 
 
 # ── WebSocket (optional real-time channel) ────────────────────────────────────
@@ -220,47 +370,80 @@ async def websocket_endpoint(ws: WebSocket):
     Supports two message types:
       { "type": "page_visit", ... }  → runs analysis pipeline
       { "type": "chat", "query": ... }  → runs chat pipeline
+    Every newly inferred context of the tenant is pushed as
+    { "type": "context_update", "context", "run_id" }, whichever request
+    started the run. A page_visit with "async": true is acknowledged with
+    { "type": "visit_accepted", "run_id", "context" } once the visit is in
+    the graph; its context_update follows.
+    The tenant comes from the X-Session-Id header or session_id query param
+    of the connection request.
     """
     await ws.accept()
+    tid = ws.headers.get("x-session-id") or ws.query_params.get("session_id")
     logger.info("WebSocket client connected")
+    send_lock = asyncio.Lock()
 
-    try:
-        while True:
-            data = await ws.receive_json()
-            msg_type = data.get("type", "")
-
-            if msg_type == "page_visit":
-                result = await workflows.analyze_page(
-                    url=data.get("url", ""),
-                    title=data.get("title", ""),
-                    content=data.get("content", ""),
-                    timestamp=data.get("timestamp", time.time()),
-                    keywords=data.get("keywords"),
-                    summary=data.get("summary"),
-                )
-                ctx = result.get("active_context", {})
-                await ws.send_json({"type": "context_update", "context": ctx})
+    async def send(message: dict) -> None:
+        async with send_lock:
+            await ws.send_json(message)
 
-            elif msg_type == "chat":
-                result = await workflows.chat(
-                    query=data.get("query", ""),
-                    session_id=data.get("session_id"),
-                )
-                await ws.send_json(
-                    {
-                        "type": "chat_response",
-                        "response": result.get("response", ""),
-                        "context": workflows.current_context,
-                    }
-                )
-            else:
-                await ws.send_json({"type": "error", "message": f"Unknown type: {msg_type}"})
-
-    except WebSocketDisconnect:
-        logger.info("WebSocket client disconnected")
-    except Exception as e:
-        logger.error("WebSocket error: %s", e)
-        await ws.close()
+    async def forward(queue: asyncio.Queue) -> None:
+        while True:
+            await send(await queue.get())
+
+    # The connection holds its tenant so the subscription outlives requests
+    async with tenants.use(tid) as tenant:
+        updates = tenant.workflows.subscribe()
+        forwarder = asyncio.create_task(forward(updates))
+        try:
+            while True:
+                data = await ws.receive_json()
+                msg_type = data.get("type", "")
+
+                if msg_type == "page_visit":
+                    run_async = bool(data.get("async", False))
+                    async with tenants.use(tid) as t:
+                        result = await t.visit_queue.submit({
+                            "url": data.get("url", ""),
+                            "title": data.get("title", ""),
+                            "content": data.get("content", ""),
+                            "timestamp": data.get("timestamp", time.time()),
+                            "keywords": data.get("keywords"),
+                            "summary": data.get("summary"),
+                        }, early=run_async)
+                    # A finished run's context_update was already pushed
+                    if result.get("pending"):
+                        await send({
+                            "type": "visit_accepted",
+                            "run_id": result.get("run_id"),
+                            "context": result.get("active_context", {}),
+                        })
+
+                elif msg_type == "chat":
+                    async with tenants.use(tid) as t:
+                        result = await t.workflows.chat(
+                            query=data.get("query", ""),
+                            session_id=data.get("session_id"),
+                        )
+                        ctx = t.workflows.current_context
+                    await send(
+                        {
+                            "type": "chat_response",
+                            "response": result.get("response", ""),
+                            "context": ctx,
+                        }
+                    )
+                else:
+                    await send({"type": "error", "message": f"Unknown type: {msg_type}"})
+
+        except WebSocketDisconnect:
+            logger.info("WebSocket client disconnected")
+        except Exception as e:
+            logger.error("WebSocket error: %s", e)
+            await ws.close()
+        finally:
+            tenant.workflows.unsubscribe(updates)
+            forwarder.cancel()
 
 
 # ── Run ───────────────────────────────────────────────────────────────────────
@@ -268,9 +451,14 @@ async def websocket_endpoint(ws: WebSocket):
 if __name__ == "__main__":
     import uvicorn
 
+    if settings.BACKEND_WORKERS > 1 and settings.STATE_BACKEND != "sqlite":
+        raise SystemExit("BACKEND_WORKERS > 1 requires STATE_BACKEND=sqlite")
+
     uvicorn.run(
         "main:app",
         host=settings.BACKEND_HOST,
         port=settings.BACKEND_PORT,
-        reload=True,
+        workers=settings.BACKEND_WORKERS,
+        # Auto-reload is single-process only (development)
+        reload=settings.BACKEND_WORKERS == 1,
     )
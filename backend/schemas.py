@@ -35,6 +35,12 @@ class PageVisitRequest(BaseModel):
     )
 
 
+class PageVisitBatchRequest(BaseModel):
+    """Several page visits sent at once (e.g. after a session restore)."""
+
+    visits: list[PageVisitRequest] = Field(min_length=1)
+
+
 class ChatRequest(BaseModel):
     """Payload sent when the user submits a chat query in the side panel."""
 
@@ -57,6 +63,13 @@ class ContextResponse(BaseModel):
         default=0.0, ge=0.0, le=1.0, description="Posterior probability"
     )
     communities: list[CommunityInfo] = Field(default_factory=list)
+    run_id: Optional[str] = Field(
+        default=None, description="Analysis run that produced (or will update) this"
+    )
+    pending: bool = Field(
+        default=False,
+        description="Run still in progress; this is the previous context",
+    )
 
 
 class CommunityInfo(BaseModel):
@@ -85,8 +98,25 @@ class GraphStatsResponse(BaseModel):
     edge_count: int = 0
     community_count: int = 0
     top_keywords: list[str] = Field(default_factory=list)
+    version: int = 0
+    partition_version: int = 0
+    epoch: str = ""  # changes on reset / restart; pass back to /api/graph/delta
     nodes: list[dict] = Field(default_factory=list)
     edges: list[dict] = Field(default_factory=list)
+    next_cursor: str | None = None  # set when more pages follow (see limit)
+
+
+class GraphDeltaResponse(GraphStatsResponse):
+    """
+    Changes since a client's graph version. With ``full`` set, nodes/edges
+    are the whole graph (resync); otherwise they are the added or updated
+    ones, and removed edges are [source, target] pairs.
+    """
+
+    full: bool = False
+    since: int = 0
+    removed_nodes: list[str] = Field(default_factory=list)
+    removed_edges: list[list[str]] = Field(default_factory=list)
 
 
 # Rebuild ContextResponse now that CommunityInfo is defined
@@ -0,0 +1,120 @@
+"""
+NodeSense Shared Graph State
+Lets several worker processes serve one knowledge graph.
+
+Each worker keeps its own in-memory replica of the graph. The source of
+truth is an ordered log of graph mutations (page visits, resets) in a
+SQLite database in WAL mode, next to the graph snapshot. A worker appends
+its mutation, applies any earlier entries it hasn't seen yet, then applies
+its own, so every replica sees the same sequence. Before serving a request a
+worker checks ``PRAGMA data_version``: a constant-time check that changes
+whenever another process commits. That check is the change notification
+that keeps each worker's communities and cached context current.
+
+The latest inferred active context is stored here too, so /api/context and
+chat see the newest analysis no matter which worker ran it.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any
+
+
+class SharedVisitLog:
+    """SQLite-backed mutation log + latest context, shared across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
+        self._data_version: int | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS log ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " record TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS context ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " updated REAL NOT NULL,"
+                " context TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    # ── Mutation log ──────────────────────────────────────────────────────
+
+    def append(self, record: dict[str, Any]) -> int:
+        """Append a mutation record; returns its sequence number."""
+        with self._lock:
+            db = self._db()
+            cur = db.execute(
+                "INSERT INTO log (record) VALUES (?)",
+                (json.dumps(record, separators=(",", ":")),),
+            )
+            db.commit()
+            return cur.lastrowid
+
+    def read_since(self, seq: int, upto: int | None = None) -> list[tuple[int, dict]]:
+        """Records with sequence number > seq (and ≤ upto), in order."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT seq, record FROM log WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (seq, upto if upto is not None else 2**63 - 1),
+            ).fetchall()
+        return [(s, json.loads(r)) for s, r in rows]
+
+    def first_seq(self) -> int | None:
+        """Oldest sequence number still in the log (None if empty)."""
+        with self._lock:
+            row = self._db().execute("SELECT MIN(seq) FROM log").fetchone()
+        return row[0]
+
+    def truncate(self, upto: int) -> None:
+        """Drop records with sequence number ≤ upto (covered by a snapshot)."""
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM log WHERE seq <= ?", (upto,))
+            db.commit()
+
+    def changed(self) -> bool:
+        """True if another process committed since the last call."""
+        with self._lock:
+            version = self._db().execute("PRAGMA data_version").fetchone()[0]
+            changed = version != self._data_version
+            self._data_version = version
+            return changed
+
+    # ── Latest context ────────────────────────────────────────────────────
+
+    def put_context(self, context: dict[str, Any]) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO context (id, updated, context) VALUES (0, ?, ?)",
+                (time.time(), json.dumps(context, default=str)),
+            )
+            db.commit()
+
+    def get_context(self) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT context FROM context WHERE id = 0"
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,243 @@
+"""
+NodeSense Tenant Registry
+One knowledge graph, workflow set and visit queue per tenant (user/session).
+
+Tenants are created on first use from their own persistence paths and kept
+in memory while active. Beyond MAX_TENANTS, or after TENANT_IDLE_TIMEOUT
+seconds without a request, the least recently used idle tenant is saved to
+disk and dropped, so memory stays bounded however many tenants connect.
+The default tenant keeps the single-user paths (GRAPH_PERSIST_PATH,
+CONTENT_STORE_PATH), so existing deployments see no change.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from config import settings
+from graph_service import GraphService
+from langgraph_flow import NodeSenseWorkflows
+from visit_queue import VisitCoalescer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def tenant_dir_name(tenant_id: str) -> str:
+    """Filesystem-safe directory name for a tenant ID."""
+    if _SAFE_ID.match(tenant_id):
+        return tenant_id
+    return hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()[:32]
+
+
+class Tenant:
+    """A tenant's live services."""
+
+    def __init__(self, tenant_id: str, graph_service: GraphService):
+        self.id = tenant_id
+        self.graph_service = graph_service
+        self.workflows = NodeSenseWorkflows(graph_service)
+        self.visit_queue = VisitCoalescer(self.workflows.analyze_batch)
+        self.last_used = time.time()
+        self.active = 0  # requests currently using this tenant
+
+    @property
+    def busy(self) -> bool:
+        """In use by a request, or still running work a request started."""
+        return (
+            self.active > 0
+            or self.visit_queue.busy
+            or bool(self.workflows.background_tasks)
+        )
+
+    async def settle(self) -> None:
+        """Wait for queued visits and background runs to finish."""
+        while self.visit_queue.busy or self.workflows.background_tasks:
+            await self.visit_queue.join()
+            tasks = self.workflows.background_tasks
+            if tasks:
+                await asyncio.wait(tasks)
+
+
+class TenantRegistry:
+    """
+    LRU map of tenant ID → Tenant, loading and evicting on demand.
+
+    The lock only guards the map. Loading a tenant (snapshot read, community
+    detection) and saving an evicted one run outside it, so one tenant's
+    disk I/O never holds up requests for the others.
+    """
+
+    def __init__(
+        self,
+        max_tenants: int | None = None,
+        idle_timeout: float | None = None,
+        data_dir: str | None = None,
+    ):
+        self.max_tenants = max(1, max_tenants or settings.MAX_TENANTS)
+        self.idle_timeout = (
+            idle_timeout if idle_timeout is not None else settings.TENANT_IDLE_TIMEOUT
+        )
+        self.data_dir = data_dir or settings.TENANT_DATA_DIR
+        self._tenants: OrderedDict[str, Tenant] = OrderedDict()
+        self._lock = asyncio.Lock()
+        # Tenants being loaded / saved and closed, by ID: concurrent
+        # requests for a loading tenant share one load, and a tenant is not
+        # reloaded until its eviction has been saved
+        self._loading: dict[str, asyncio.Task] = {}
+        self._closing: dict[str, asyncio.Task] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def paths(self, tenant_id: str) -> tuple[str, str]:
+        """(graph persist path, content store path) for a tenant."""
+        if tenant_id == DEFAULT_TENANT:
+            return settings.GRAPH_PERSIST_PATH, settings.CONTENT_STORE_PATH
+        root = os.path.join(self.data_dir, tenant_dir_name(tenant_id))
+        return (
+            os.path.join(root, os.path.basename(settings.GRAPH_PERSIST_PATH)),
+            os.path.join(root, os.path.basename(settings.CONTENT_STORE_PATH)),
+        )
+
+    @asynccontextmanager
+    async def use(self, tenant_id: str | None) -> AsyncIterator[Tenant]:
+        """
+        Borrow a tenant for the duration of a request, synced with other
+        workers first in multi-worker mode. A borrowed tenant is never
+        evicted; it becomes the most recently used when returned.
+        """
+        tenant = await self._acquire(tenant_id)
+        try:
+            # Another worker process changed the shared graph: catch up
+            gs = tenant.graph_service
+            if gs.shared is not None and gs.shared.changed():
+                await gs.run(gs.sync)
+            yield tenant
+        finally:
+            tenant.active -= 1
+            tenant.last_used = time.time()
+
+    async def get(self, tenant_id: str | None) -> Tenant:
+        """Return a tenant's services, loading them from disk if needed."""
+        tenant = await self._acquire(tenant_id)
+        tenant.active -= 1
+        return tenant
+
+    async def _acquire(self, tenant_id: str | None) -> Tenant:
+        """Return a tenant marked active, loading it first if needed."""
+        tenant_id = tenant_id or DEFAULT_TENANT
+        while True:
+            async with self._lock:
+                tenant = self._tenants.get(tenant_id)
+                if tenant is not None:
+                    self._tenants.move_to_end(tenant_id)
+                    tenant.last_used = time.time()
+                    tenant.active += 1
+                    self._evict()
+                    return tenant
+                loading = self._loading.get(tenant_id)
+                if loading is None:
+                    loading = self._loading[tenant_id] = asyncio.create_task(
+                        self._load(tenant_id)
+                    )
+                    loading.add_done_callback(
+                        lambda _: self._loading.pop(tenant_id, None)
+                    )
+            # Shielded: one caller giving up must not cancel the others' load
+            await asyncio.shield(loading)
+
+    async def _load(self, tenant_id: str) -> None:
+        # An evicted tenant is reloaded only once its save has finished
+        closing = self._closing.get(tenant_id)
+        if closing is not None:
+            await asyncio.wait({closing})
+
+        graph_path, content_path = self.paths(tenant_id)
+        os.makedirs(os.path.dirname(graph_path) or ".", exist_ok=True)
+        gs = GraphService(persist_path=graph_path, content_path=content_path)
+
+        def _open():
+            gs.load()
+            # A columnar snapshot restores the last partition, so this is an
+            # incremental pass rather than a full Louvain run.
+            if gs.graph.number_of_nodes() > 0:
+                gs.detect_communities()
+
+        try:
+            await gs.run(_open)
+        except BaseException:
+            await gs.aclose()
+            raise
+        self.loads += 1
+        logger.info(
+            "Loaded tenant %r from %s (%d nodes, %d edges)",
+            tenant_id,
+            graph_path,
+            gs.graph.number_of_nodes(),
+            gs.graph.number_of_edges(),
+        )
+        async with self._lock:
+            self._tenants[tenant_id] = Tenant(tenant_id, gs)
+
+    def _evict(self) -> None:
+        """
+        Drop idle tenants over the size or idle-time limit (caller holds the
+        lock); each is saved and closed in the background.
+        """
+        now = time.time()
+        for tenant_id, tenant in list(self._tenants.items()):
+            over_capacity = len(self._tenants) > self.max_tenants
+            expired = self.idle_timeout > 0 and now - tenant.last_used > self.idle_timeout
+            if not (over_capacity or expired):
+                break  # LRU order: everything after is newer
+            if tenant.busy:  # includes the caller's own tenant
+                continue
+            del self._tenants[tenant_id]
+            task = self._closing[tenant_id] = asyncio.create_task(self._close(tenant))
+            task.add_done_callback(
+                lambda _, tenant_id=tenant_id: self._closing.pop(tenant_id, None)
+            )
+            self.evictions += 1
+            logger.info("Evicting idle tenant %r to disk", tenant_id)
+
+    @staticmethod
+    async def _close(tenant: Tenant) -> None:
+        try:
+            await tenant.graph_service.run(tenant.graph_service.save)
+        except Exception:
+            logger.warning("Saving tenant %r failed", tenant.id, exc_info=True)
+        finally:
+            await tenant.graph_service.aclose()
+
+    async def close_all(self) -> None:
+        """Persist every loaded tenant once its running work is done (shutdown)."""
+        if self._loading:
+            await asyncio.wait(set(self._loading.values()))
+        async with self._lock:
+            tenants = list(self._tenants.values())
+            self._tenants.clear()
+        for tenant in tenants:
+            await tenant.settle()
+            await self._close(tenant)
+        if self._closing:
+            await asyncio.wait(set(self._closing.values()))
+
+    def get_stats(self) -> dict:
+        return {
+            "loaded": len(self._tenants),
+            "loading": len(self._loading),
+            "max_tenants": self.max_tenants,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,52 @@
+"""ArrayGraph frozen views (the snapshots of GRAPH_ENGINE=arrays)."""
+
+import random
+
+import networkx as nx
+import pytest
+
+from array_graph import ArrayGraph
+
+
+def _dump(graph: nx.Graph) -> tuple[dict, dict]:
+    return (
+        {n: dict(d) for n, d in graph.nodes(data=True)},
+        {tuple(sorted((u, v))): dict(d) for u, v, d in graph.edges(data=True)},
+    )
+
+
+def test_views_keep_their_values():
+    rng = random.Random(5)
+    graph = ArrayGraph()
+    views = []
+    view = None
+    for step in range(300):
+        changed = set()
+        for _ in range(5):
+            u, v = rng.sample(range(40), 2)
+            if rng.random() < 0.2 and graph.has_edge(u, v):
+                graph.remove_edge(u, v)
+            else:
+                graph.add_edge(u, v, weight=rng.random(), last_active=float(step))
+                graph.nodes[u]["seen"] = step
+            changed |= {u, v}
+        if step % 50 == 0:
+            graph.remove_nodes_from(rng.sample(list(graph), 3))
+            view = None  # removals above are not tracked in ``changed``
+        view = graph.frozen_view(view, changed)
+        assert _dump(view) == _dump(graph)
+        if step % 30 == 0:
+            views.append((view, _dump(view)))
+
+    for view, dumped in views:
+        assert _dump(view) == dumped
+
+
+def test_view_is_read_only():
+    graph = ArrayGraph()
+    graph.add_edge("a", "b", weight=1.0)
+    view = graph.frozen_view()
+    with pytest.raises(nx.NetworkXError):
+        view["a"]["b"]["weight"] = 2.0
+    graph["a"]["b"]["weight"] = 3.0
+    assert view["a"]["b"]["weight"] == 1.0
@@ -0,0 +1,61 @@
+"""Background community refresh (GraphService.refresh_communities)."""
+
+import asyncio
+import random
+
+from config import settings
+from graph_service import GraphService
+
+
+def _service(tmp_path) -> GraphService:
+    gs = GraphService(
+        persist_path=str(tmp_path / "graph.pkl"),
+        content_path=str(tmp_path / "content.db"),
+    )
+    rng = random.Random(3)
+    topics = [[f"t{t}_{j}" for j in range(20)] for t in range(8)]
+    for i in range(300):
+        gs.add_page_visit(f"http://p{i}", "t", rng.sample(topics[i % 8], 5))
+    gs.detect_communities(full=True)
+    return gs
+
+
+def test_refresh_relabels_adopted_partition(tmp_path):
+    gs = _service(tmp_path)
+    before = len(gs.communities)
+    detect = gs.community_engine.detect
+
+    def reordered(graph, resolution, seed):
+        # Same clusters, different indices, two of them merged
+        communities = list(reversed(detect(graph, resolution, seed)))
+        return [communities[0] | communities[1]] + communities[2:]
+
+    gs.community_engine.detect = reordered
+    try:
+        assert asyncio.run(gs.refresh_communities())
+    finally:
+        gs.community_engine.detect = detect
+        gs.close()
+
+    assert len(gs.communities) == before - 1
+    assert gs.community_labels == gs._label_communities(gs.communities)
+    assert gs.snapshot.community_labels == tuple(gs.community_labels)
+
+
+def test_scheduled_full_pass_is_deferred(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "COMMUNITY_FULL_RECOMPUTE_VISITS", 10)
+    gs = _service(tmp_path)
+    for i in range(10):
+        gs.add_page_visit(f"http://q{i}", "t", [f"t{i % 8}_1", f"t{i % 8}_2", "new"])
+
+    gs.detect_communities(defer=True)
+    assert gs.last_detection["mode"] == "incremental"
+    assert gs.last_detection["refresh_due"]
+    assert not gs.last_detection.get("degraded")
+
+    try:
+        assert asyncio.run(gs.refresh_communities())
+    finally:
+        gs.close()
+    assert gs.last_detection["mode"] == "background"
+    assert "refresh_due" not in gs.last_detection
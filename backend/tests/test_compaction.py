@@ -0,0 +1,44 @@
+"""Background WAL compaction (GraphService._compact)."""
+
+import threading
+
+from config import settings
+from graph_service import GraphService
+
+
+def _dump(graph) -> tuple[dict, dict]:
+    return (
+        {n: dict(d) for n, d in graph.nodes(data=True)},
+        {tuple(sorted((u, v))): dict(d) for u, v, d in graph.edges(data=True)},
+    )
+
+
+def test_visits_continue_during_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "GRAPH_SNAPSHOT_INTERVAL", 20)
+    persist = str(tmp_path / "graph.pkl")
+    gs = GraphService(persist_path=persist, content_path=str(tmp_path / "a.db"))
+
+    release = threading.Event()
+    write = gs._write_snapshot
+
+    def slow_write(*args):
+        release.wait(10)
+        write(*args)
+
+    gs._write_snapshot = slow_write
+    for i in range(50):
+        gs.add_page_visit(f"http://p{i}", "t", [f"k{i % 7}", f"k{i % 5}"])
+    assert not gs._compaction.done()
+
+    # A crash now: the old snapshot plus both WAL files hold every visit
+    crashed = GraphService(persist_path=persist, content_path=str(tmp_path / "b.db"))
+    crashed.load()
+    assert _dump(crashed.graph) == _dump(gs.graph)
+
+    release.set()
+    gs._compaction.result()
+    restarted = GraphService(persist_path=persist, content_path=str(tmp_path / "c.db"))
+    restarted.load()
+    assert _dump(restarted.graph) == _dump(gs.graph)
+    for service in (gs, crashed, restarted):
+        service.close()
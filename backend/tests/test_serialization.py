@@ -0,0 +1,51 @@
+"""Graph serialization reads page text in batches (to_serializable, graph_delta)."""
+
+from graph_service import GraphService
+
+
+def _service(tmp_path) -> GraphService:
+    gs = GraphService(
+        persist_path=str(tmp_path / "graph.pkl"), content_path=str(tmp_path / "c.db")
+    )
+    for i in range(30):
+        gs.add_page_visit(f"http://p{i}", "t", [f"k{i % 4}"], summary=f"s{i}")
+    gs.detect_communities()
+    gs.content._cache.clear()
+    return gs
+
+
+def _count_selects(gs: GraphService) -> list[str]:
+    queries: list[str] = []
+    gs.content._db().set_trace_callback(
+        lambda sql: queries.append(sql) if sql.startswith("SELECT") else None
+    )
+    return queries
+
+
+def test_page_text_is_one_query(tmp_path):
+    gs = _service(tmp_path)
+    queries = _count_selects(gs)
+    nodes = {n["id"]: n for n in gs.to_serializable()["nodes"]}
+    assert len(queries) == 1
+    assert nodes["page:http://p7"]["summary"] == "s7"
+
+    projected = gs.to_serializable(fields=["label", "type"])
+    assert len(queries) == 1
+    assert all("summary" not in n for n in projected["nodes"])
+    gs.close()
+
+
+def test_delta_is_projected(tmp_path):
+    gs = _service(tmp_path)
+    since = gs.to_serializable()["version"]
+    gs.add_page_visit("http://p3", "t", ["k9"], summary="again")
+    gs.detect_communities()
+
+    queries = _count_selects(gs)
+    delta = gs.graph_delta(since, fields=["type", "summary"], edge_fields=["weight"])
+    assert not delta["full"]
+    assert len(queries) <= 1
+    page = next(n for n in delta["nodes"] if n["id"] == "page:http://p3")
+    assert page == {"id": "page:http://p3", "type": "page", "summary": "again"}
+    assert all(set(e) == {"source", "target", "weight"} for e in delta["edges"])
+    gs.close()
@@ -0,0 +1,48 @@
+"""Multi-worker mode (STATE_BACKEND=sqlite): replicas over one shared log."""
+
+import random
+import time
+
+import pytest
+
+from config import settings
+from graph_service import GraphService
+
+
+@pytest.fixture
+def replicas(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STATE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "GRAPH_WAL_ENABLED", False)
+    monkeypatch.setattr(settings, "GRAPH_SNAPSHOT_INTERVAL", 1000)
+    monkeypatch.setattr(settings, "MAX_GRAPH_NODES", 120)
+    path, content = str(tmp_path / "graph.pkl"), str(tmp_path / "content.db")
+    workers = [GraphService(persist_path=path, content_path=content) for _ in range(2)]
+    for gs in workers:
+        gs.load()
+    yield workers
+    for gs in workers:
+        gs.close()
+
+
+def test_replicas_sweep_and_prune_alike(replicas):
+    a, b = replicas
+    rng = random.Random(1)
+    for i in range(300):
+        worker = rng.choice(replicas)
+        # Old enough that a sweep drops some of the edges
+        ts = time.time() - rng.random() * 3600 * 800
+        keywords = [f"k{rng.randrange(60)}" for _ in range(4)]
+        worker.add_page_visit(f"u{i}", "t", keywords, timestamp=ts, summary=f"s{i}")
+        if i % 50 == 49:
+            (b if worker is a else a).apply_temporal_decay(force=True)
+        if i % 37 == 0:
+            a.sync()
+            b.sync()
+    a.sync()
+    b.sync()
+
+    assert sorted(a.graph.nodes) == sorted(b.graph.nodes)
+    assert sorted(map(sorted, a.graph.edges)) == sorted(map(sorted, b.graph.edges))
+    # Nobody deleted text for a page another replica still holds
+    pages = [d["url"] for _, d in a.graph.nodes(data=True) if d.get("type") == "page"]
+    assert all(a.content.get(url)["summary"] for url in pages)
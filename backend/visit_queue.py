@@ -0,0 +1,134 @@
+"""
+NodeSense Visit Coalescing Queue
+Merges page visits that arrive close together into a single pipeline run.
+
+Every visit still gets its own keyword extraction and graph update, but
+decay, community detection and Bayesian inference run once per batch.
+This matters for bursts like a session restore that opens dozens of tabs
+at once. Each caller whose visit lands in a batch gets that batch's result;
+callers that asked to be released early get the one reported as soon as
+the batch is written to the graph.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# run_batch(visits, on_written): on_written(result) is called, at most once,
+# as soon as the visits are in the graph, before inference finishes
+OnWritten = Callable[[dict[str, Any]], None]
+RunBatch = Callable[[list[dict[str, Any]], Optional[OnWritten]], Awaitable[dict[str, Any]]]
+
+
+class VisitCoalescer:
+    """
+    Collects visits for up to `window` seconds (or until `max_batch` are
+    waiting), then hands them to `run_batch` together. Batches run one at
+    a time, so visits that arrive while a batch is running simply queue up
+    for the next one.
+    """
+
+    def __init__(
+        self,
+        run_batch: RunBatch,
+        window: float | None = None,
+        max_batch: int | None = None,
+    ):
+        self._run_batch = run_batch
+        self.window = (
+            window if window is not None else settings.ANALYZE_BATCH_WINDOW_MS / 1000.0
+        )
+        self.max_batch = max(1, max_batch or settings.ANALYZE_BATCH_MAX)
+        self._pending: list[tuple[dict[str, Any], asyncio.Future, bool]] = []
+        self._worker: asyncio.Task | None = None
+
+        # Diagnostics
+        self.batches_run = 0
+        self.visits_run = 0
+
+    async def submit(self, visit: dict[str, Any], early: bool = False) -> dict[str, Any]:
+        """
+        Queue one visit and wait for the result of the batch it joins, or
+        with ``early`` only until the batch is written to the graph.
+        """
+        return await self.submit_many([visit], early=early)
+
+    async def submit_many(
+        self, visits: list[dict[str, Any]], early: bool = False
+    ) -> dict[str, Any]:
+        """
+        Queue several visits. If they span more than one batch, the result
+        of the last batch (which saw all of them) is returned.
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for visit in visits:
+            fut = loop.create_future()
+            self._pending.append((visit, fut, early))
+            futures.append(fut)
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+
+        results = await asyncio.gather(*futures)
+        return results[-1]
+
+    async def _drain(self) -> None:
+        """Run batches until the queue is empty."""
+        # Give a burst one window to gather. Visits that queue up while a
+        # batch runs have waited at least that long, so later batches
+        # start straight away.
+        if self.window > 0 and len(self._pending) < self.max_batch:
+            await asyncio.sleep(self.window)
+        while self._pending:
+            batch = self._pending[: self.max_batch]
+            self._pending = self._pending[self.max_batch :]
+            # Callers that gave up (e.g. disconnected) need no work done
+            batch = [(v, fut, early) for v, fut, early in batch if not fut.done()]
+            if not batch:
+                continue
+
+            def on_written(result: dict[str, Any], batch=batch) -> None:
+                for _, fut, early in batch:
+                    if early and not fut.done():
+                        fut.set_result(result)
+
+            if len(batch) > 1:
+                logger.info("Coalesced %d page visits into one pipeline run", len(batch))
+            try:
+                result = await self._run_batch([v for v, _, _ in batch], on_written)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                self.batches_run += 1
+                self.visits_run += len(batch)
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_result(result)
+
+    @property
+    def busy(self) -> bool:
+        """True while visits are queued or a batch is running."""
+        return bool(self._pending) or (self._worker is not None and not self._worker.done())
+
+    async def join(self) -> None:
+        """Wait until every queued visit has been run."""
+        while self._worker is not None and not self._worker.done():
+            await asyncio.wait({self._worker})
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "batches_run": self.batches_run,
+            "visits_run": self.visits_run,
+            "window_ms": round(self.window * 1000, 1),
+            "max_batch": self.max_batch,
+        }
@@ -333,35 +333,19 @@ async function processPageVisit(pageData) {
     has_content: !!(payload.content && payload.content.length > 0),
   });
 
-  // Step 4: Await backend response (backend-side steps are tracked there)
+  // Step 4: Backend graph write. With ?async=true the backend answers as
+  // soon as the visit is in the graph; community detection and inference
+  // finish in the background (see finishBackendRun).
   const backendStep = addFlowStep(flowRun, "backend_processing", "Backend Pipeline");
-  const result = await backendPost("/api/analyze", payload);
+  const result = await backendPost("/api/analyze?async=true", payload);
 
   if (result) {
-    completeFlowStep(backendStep, {
-      active_task: result.active_task || "Exploring",
-      confidence: result.confidence,
-      keyword_count: (result.keywords || []).length,
-      community_count: (result.communities || []).length,
-    });
-
-    // Fetch detailed backend pipeline events for this run
-    try {
-      const pipelineData = await backendGet("/api/pipeline/events");
-      if (pipelineData && pipelineData.runs && pipelineData.runs.length > 0) {
-        flowRun.backend_steps = pipelineData.runs[0].steps || [];
-        flowRun.backend_run = pipelineData.runs[0];
-      }
-    } catch (e) {
-      console.warn("[NodeSense] Could not fetch pipeline events:", e);
+    if (result.pending && result.run_id) {
+      // Don't hold up the next page visit on inference
+      finishBackendRun(flowRun, backendStep, result.run_id);
+    } else {
+      await completeBackendRun(flowRun, backendStep, result);
     }
-
-    completeFlowRun(flowRun, "completed");
-
-    await chrome.storage.session.set({ latestContext: result });
-    broadcastToSidePanel({ type: "CONTEXT_UPDATE", context: result });
-    // Broadcast pipeline update to any listening panels
-    broadcastToSidePanel({ type: "PIPELINE_UPDATE", run: flowRun });
   } else {
     completeFlowStep(backendStep, { error: "Backend unreachable" }, "failed");
     completeFlowRun(flowRun, "failed");
@@ -369,10 +353,123 @@ async function processPageVisit(pageData) {
   }
 }
 
+async function finishBackendRun(flowRun, backendStep, runId) {
+  // Long-poll until the run has inferred its context
+  const context = await backendGet(`/api/context?after=${encodeURIComponent(runId)}`);
+  if (context) {
+    await completeBackendRun(flowRun, backendStep, context);
+  } else {
+    completeFlowStep(backendStep, { run_id: runId, error: "Backend unreachable" }, "failed");
+    completeFlowRun(flowRun, "failed");
+    broadcastToSidePanel({ type: "PIPELINE_UPDATE", run: flowRun });
+  }
+}
+
+async function completeBackendRun(flowRun, backendStep, result) {
+  completeFlowStep(backendStep, {
+    run_id: result.run_id || null,
+    pending: !!result.pending,
+    active_task: result.active_task || "Exploring",
+    confidence: result.confidence,
+    keyword_count: (result.keywords || []).length,
+    community_count: (result.communities || []).length,
+  });
+
+  // Fetch detailed backend pipeline events for this run
+  try {
+    const pipelineData = await backendGet("/api/pipeline/events");
+    const runs = (pipelineData && pipelineData.runs) || [];
+    const run = runs.find((r) => r.id === result.run_id) || runs[0];
+    if (run) {
+      flowRun.backend_steps = run.steps || [];
+      flowRun.backend_run = run;
+    }
+  } catch (e) {
+    console.warn("[NodeSense] Could not fetch pipeline events:", e);
+  }
+
+  completeFlowRun(flowRun, "completed");
+
+  await chrome.storage.session.set({ latestContext: result });
+  broadcastToSidePanel({ type: "CONTEXT_UPDATE", context: result });
+  // Broadcast pipeline update to any listening panels
+  broadcastToSidePanel({ type: "PIPELINE_UPDATE", run: flowRun });
+}
+
 function sleep(ms) {
   return new Promise((resolve) => setTimeout(resolve, ms));
 }
 
+// ── Graph Cache (Incremental Updates) ────────────────────────────────────────
+
+// Last graph sent to the side panel, keyed for merging. GET_GRAPH asks
+// /api/graph/delta for what changed since its version rather than downloading
+// the whole graph on every poll. Lost when Chrome stops the service worker;
+// the next request then fetches the graph in full.
+let graphCache = null;  // { meta: stats + version + epoch, nodes: Map, edges: Map }
+
+// Only the attributes GraphView renders; timestamps and the like stay home
+const GRAPH_FIELDS =
+  "fields=label,title,type,community,frequency,visit_count,url,page_refs,summary,content_snippet" +
+  "&edge_fields=weight,base_weight";
+
+function edgeKey(source, target) {
+  return source < target ? `${source}\n${target}` : `${target}\n${source}`;
+}
+
+function cacheGraph(graph) {
+  const { nodes, edges, full, since, removed_nodes, removed_edges, next_cursor, ...meta } = graph;
+  graphCache = {
+    meta,
+    nodes: new Map(nodes.map((n) => [n.id, n])),
+    edges: new Map(edges.map((e) => [edgeKey(e.source, e.target), e])),
+  };
+}
+
+function applyGraphDelta(delta) {
+  const { nodes, edges, full, since, removed_nodes, removed_edges, ...meta } = delta;
+  for (const id of removed_nodes) graphCache.nodes.delete(id);
+  for (const [source, target] of removed_edges) {
+    graphCache.edges.delete(edgeKey(source, target));
+  }
+  if (removed_nodes.length > 0) {
+    for (const [key, e] of graphCache.edges) {
+      if (!graphCache.nodes.has(e.source) || !graphCache.nodes.has(e.target)) {
+        graphCache.edges.delete(key);
+      }
+    }
+  }
+  for (const n of nodes) graphCache.nodes.set(n.id, n);
+  for (const e of edges) graphCache.edges.set(edgeKey(e.source, e.target), e);
+  graphCache.meta = meta;
+}
+
+/**
+ * The current graph: a delta merged into the cached copy, or the full graph
+ * when there is no copy yet or the server asks for a resync (reset, restart,
+ * or a version older than its change history). Null if the backend is down.
+ */
+async function fetchGraph() {
+  if (graphCache) {
+    const { version, epoch } = graphCache.meta;
+    const delta = await backendGet(
+      `/api/graph/delta?since=${version}&epoch=${encodeURIComponent(epoch)}&${GRAPH_FIELDS}`
+    );
+    if (!delta) return null;
+    if (delta.full) cacheGraph(delta);
+    else applyGraphDelta(delta);
+  } else {
+    const graph = await backendGet(`/api/graph?${GRAPH_FIELDS}`);
+    if (!graph) return null;
+    cacheGraph(graph);
+  }
+  return {
+    ...graphCache.meta,
+    nodes: [...graphCache.nodes.values()],
+    edges: [...graphCache.edges.values()],
+  };
+}
+
 // ── Side Panel Communication ─────────────────────────────────────────────────
 
 const sidePanelPorts = new Set();
@@ -434,7 +531,7 @@ async function handleSidePanelMessage(msg, port) {
     }
 
     case "GET_GRAPH": {
-      const graph = await backendGet("/api/graph");
+      const graph = await fetchGraph();
       port.postMessage({ type: "GRAPH_DATA", graph });
       break;
     }
@@ -447,7 +544,8 @@ async function handleSidePanelMessage(msg, port) {
         // Notify all panels
         broadcastToSidePanel({ type: "CONTEXT_UPDATE", context: null });
         // Send fresh (empty) graph data back
-        const graph = await backendGet("/api/graph");
+        graphCache = null;
+        const graph = await fetchGraph();
         port.postMessage({ type: "GRAPH_DATA", graph });
         port.postMessage({ type: "GRAPH_RESET", success: true });
       } else {
@@ -171,6 +171,7 @@ function StepCard({ step, index, isLast, animDelay }) {
     step.status === "completed" ? "dfv-step--completed" :
     step.status === "running" ? "dfv-step--running" :
     step.status === "skipped" ? "dfv-step--skipped" :
+    step.status === "degraded" ? "dfv-step--degraded" :
     step.status === "failed" ? "dfv-step--failed" : "";
 
   return (